@@ -17,6 +17,7 @@ from app.models.associations import asistentes_evento, asistentes_sesion
 from app.models.eventos import eventos_table
 from app.models.sesiones import sesiones_table
 from app.models.usuarios import usuarios_table
+from app.models.tokens import tokens_revocados
 from app.models.shared import metadata as target_metadata
 
 # Obtener configuración de Alembic
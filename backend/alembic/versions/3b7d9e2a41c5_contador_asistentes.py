@@ -0,0 +1,42 @@
+"""contador asistentes_actuales en eventos y sesiones
+
+Revision ID: 3b7d9e2a41c5
+Revises: cf820500d23a
+Create Date: 2025-05-20 10:12:03.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9e2a41c5'
+down_revision: Union[str, None] = 'cf820500d23a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('eventos', sa.Column('asistentes_actuales', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('sesiones', sa.Column('asistentes_actuales', sa.Integer(), nullable=False, server_default='0'))
+
+    # Inicializar los contadores con los registros existentes
+    op.execute("""
+        UPDATE eventos SET asistentes_actuales = (
+            SELECT COUNT(*) FROM asistentes_evento WHERE asistentes_evento.evento_id = eventos.id
+        )
+    """)
+    op.execute("""
+        UPDATE sesiones SET asistentes_actuales = (
+            SELECT COUNT(*) FROM asistentes_sesion WHERE asistentes_sesion.sesion_id = sesiones.id
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sesiones', 'asistentes_actuales')
+    op.drop_column('eventos', 'asistentes_actuales')
@@ -0,0 +1,28 @@
+"""indice sesiones.evento_id
+
+Revision ID: 5c2e8a9f1d34
+Revises: 8f41c2d0b6e7
+Create Date: 2025-05-24 11:05:27.663049
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a9f1d34'
+down_revision: Union[str, None] = '8f41c2d0b6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_sesiones_evento_id'), 'sesiones', ['evento_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sesiones_evento_id'), table_name='sesiones')
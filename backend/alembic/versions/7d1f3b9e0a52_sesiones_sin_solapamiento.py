@@ -0,0 +1,66 @@
+"""sesiones sin solapamiento: indice (evento_id, fecha_inicio) y restriccion de exclusion
+
+Revision ID: 7d1f3b9e0a52
+Revises: e2b7c4a9f013
+Create Date: 2025-06-02 10:41:53.208417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1f3b9e0a52'
+down_revision: Union[str, None] = 'e2b7c4a9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def comprobar_sesiones_validas(bind) -> None:
+    """Aborta con un mensaje claro si hay sesiones con el fin antes del inicio o solapadas.
+
+    Sin esta comprobación la restricción falla con un DataError de tsrange o un error de
+    exclusión genérico. Las filas listadas deben corregirse antes de repetir la migración.
+    """
+    invertidas = bind.execute(sa.text(
+        "SELECT id FROM sesiones WHERE fecha_fin < fecha_inicio ORDER BY id LIMIT 50"
+    )).scalars().all()
+    if invertidas:
+        raise RuntimeError(f"Sesiones con fecha_fin anterior a fecha_inicio (ids): {invertidas}")
+    solapadas = bind.execute(sa.text(
+        "SELECT a.evento_id, a.id, b.id FROM sesiones a JOIN sesiones b "
+        "ON a.evento_id = b.evento_id AND a.id < b.id "
+        "AND a.fecha_inicio < b.fecha_fin AND b.fecha_inicio < a.fecha_fin "
+        "AND a.fecha_inicio < a.fecha_fin AND b.fecha_inicio < b.fecha_fin "
+        "ORDER BY a.evento_id, a.id, b.id LIMIT 50"
+    )).fetchall()
+    if solapadas:
+        pares = ", ".join(f"evento {evento}: {a} y {b}" for evento, a, b in solapadas)
+        raise RuntimeError(f"Hay sesiones solapadas; corríjalas antes de migrar ({pares})")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # El índice compuesto sustituye al de evento_id (es su prefijo)
+    op.drop_index(op.f('ix_sesiones_evento_id'), table_name='sesiones')
+    op.create_index('ix_sesiones_evento_id_fecha_inicio', 'sesiones', ['evento_id', 'fecha_inicio'], unique=False)
+    # Solo Postgres: la base de datos rechaza sesiones solapadas aunque lleguen en paralelo.
+    # tsrange es semiabierto [inicio, fin), así que las sesiones que solo se tocan son válidas.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    comprobar_sesiones_validas(op.get_bind())
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        "ALTER TABLE sesiones ADD CONSTRAINT ex_sesiones_sin_solapamiento "
+        "EXCLUDE USING gist (evento_id WITH =, tsrange(fecha_inicio, fecha_fin) WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE sesiones DROP CONSTRAINT IF EXISTS ex_sesiones_sin_solapamiento")
+    op.drop_index('ix_sesiones_evento_id_fecha_inicio', table_name='sesiones')
+    op.create_index(op.f('ix_sesiones_evento_id'), 'sesiones', ['evento_id'], unique=False)
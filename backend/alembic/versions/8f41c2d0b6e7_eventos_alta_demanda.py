@@ -0,0 +1,28 @@
+"""modo alta_demanda en eventos
+
+Revision ID: 8f41c2d0b6e7
+Revises: 3b7d9e2a41c5
+Create Date: 2025-05-22 16:40:51.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41c2d0b6e7'
+down_revision: Union[str, None] = '3b7d9e2a41c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('eventos', sa.Column('alta_demanda', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('eventos', 'alta_demanda')
@@ -0,0 +1,28 @@
+"""indice eventos (fecha_inicio, id) para paginacion por cursor
+
+Revision ID: a6d3f0b8c217
+Revises: 5c2e8a9f1d34
+Create Date: 2025-05-26 09:31:44.120587
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f0b8c217'
+down_revision: Union[str, None] = '5c2e8a9f1d34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_eventos_fecha_inicio_id', 'eventos', ['fecha_inicio', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_eventos_fecha_inicio_id', table_name='eventos')
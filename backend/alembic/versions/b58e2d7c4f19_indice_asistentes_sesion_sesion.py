@@ -0,0 +1,28 @@
+"""indice asistentes_sesion.sesion_id
+
+Revision ID: b58e2d7c4f19
+Revises: 7d1f3b9e0a52
+Create Date: 2025-06-03 16:27:40.915382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e2d7c4f19'
+down_revision: Union[str, None] = '7d1f3b9e0a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_asistentes_sesion_sesion_id', 'asistentes_sesion', ['sesion_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asistentes_sesion_sesion_id', table_name='asistentes_sesion')
@@ -0,0 +1,38 @@
+"""tabla tokens_revocados
+
+Revision ID: c3e9a7f21d64
+Revises: b58e2d7c4f19
+Create Date: 2025-06-04 10:12:05.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e9a7f21d64'
+down_revision: Union[str, None] = 'b58e2d7c4f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tokens_revocados',
+    sa.Column('jti', sa.String(length=36), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('expira', sa.DateTime(), nullable=False),
+    sa.Column('revocado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_tokens_revocados_expira'), 'tokens_revocados', ['expira'], unique=False)
+    op.create_index(op.f('ix_tokens_revocados_revocado_en'), 'tokens_revocados', ['revocado_en'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_tokens_revocados_revocado_en'), table_name='tokens_revocados')
+    op.drop_index(op.f('ix_tokens_revocados_expira'), table_name='tokens_revocados')
+    op.drop_table('tokens_revocados')
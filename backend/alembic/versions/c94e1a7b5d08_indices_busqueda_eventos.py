@@ -0,0 +1,45 @@
+"""indices de busqueda (trigramas y tsvector) en eventos
+
+Revision ID: c94e1a7b5d08
+Revises: a6d3f0b8c217
+Create Date: 2025-05-28 18:12:09.537731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c94e1a7b5d08'
+down_revision: Union[str, None] = 'a6d3f0b8c217'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Solo Postgres: en SQLite la búsqueda usa LIKE sin índices
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Trigramas: aceleran ILIKE '%termino%' y similarity()
+    op.create_index('ix_eventos_nombre_trgm', 'eventos', ['nombre'],
+                    postgresql_using='gin', postgresql_ops={'nombre': 'gin_trgm_ops'})
+    op.create_index('ix_eventos_descripcion_trgm', 'eventos', ['descripcion'],
+                    postgresql_using='gin', postgresql_ops={'descripcion': 'gin_trgm_ops'})
+    # Texto completo: debe coincidir con TSVECTOR_EVENTOS de app/services/busqueda.py
+    op.execute(
+        "CREATE INDEX ix_eventos_busqueda_tsv ON eventos USING gin "
+        "(to_tsvector('spanish', coalesce(nombre, '') || ' ' || coalesce(descripcion, '')))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_eventos_busqueda_tsv")
+    op.drop_index('ix_eventos_descripcion_trgm', table_name='eventos')
+    op.drop_index('ix_eventos_nombre_trgm', table_name='eventos')
@@ -0,0 +1,36 @@
+"""restriccion CHECK fecha_fin >= fecha_inicio en sesiones
+
+Revision ID: d7a4e1c09b36
+Revises: c3e9a7f21d64
+Create Date: 2025-06-05 09:02:47.611930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a4e1c09b36'
+down_revision: Union[str, None] = 'c3e9a7f21d64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    invertidas = op.get_bind().execute(sa.text(
+        "SELECT id FROM sesiones WHERE fecha_fin < fecha_inicio ORDER BY id LIMIT 50"
+    )).scalars().all()
+    if invertidas:
+        raise RuntimeError(f"Sesiones con fecha_fin anterior a fecha_inicio (ids): {invertidas}")
+    # batch_alter_table: SQLite no admite ALTER TABLE ... ADD CONSTRAINT
+    with op.batch_alter_table('sesiones') as batch_op:
+        batch_op.create_check_constraint('ck_sesiones_fechas', 'fecha_fin >= fecha_inicio')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sesiones') as batch_op:
+        batch_op.drop_constraint('ck_sesiones_fechas', type_='check')
@@ -0,0 +1,30 @@
+"""version de fila en eventos y sesiones (ETag)
+
+Revision ID: e2b7c4a9f013
+Revises: c94e1a7b5d08
+Create Date: 2025-05-30 11:05:37.214508
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c4a9f013'
+down_revision: Union[str, None] = 'c94e1a7b5d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('eventos', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('sesiones', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sesiones', 'version')
+    op.drop_column('eventos', 'version')
@@ -3,7 +3,6 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_restx import Api
 from flask_cors import CORS  # Añadir import
 from dotenv import load_dotenv
-import os
 
 # Cargar las variables del archivo .env
 load_dotenv()
@@ -14,8 +13,11 @@ db = SQLAlchemy()
 def create_app():
     app = Flask(__name__)
     
-    # Configuración de la base de datos (PostgreSQL)
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
+    # Configuración de la base de datos (PostgreSQL): un único engine con el pool de Settings
+    from app.core.config import settings
+    from app.core.pool import opciones_engine
+    app.config['SQLALCHEMY_DATABASE_URI'] = settings.SQLALCHEMY_DATABASE_URI
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones_engine(settings.SQLALCHEMY_DATABASE_URI)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     # Habilitar CORS
@@ -32,6 +34,10 @@ def create_app():
         doc="/docs"  # Ruta donde estará la documentación Swagger
     )
 
+    # JSON rápido (orjson si está instalado) y compresión gzip/br de las respuestas grandes
+    from app.core.representaciones import registrar_representaciones
+    registrar_representaciones(api)
+
     # Registrar namespaces
     from app.routes.eventos import evento_ns
     from app.routes.auth import auth_ns
@@ -40,4 +46,17 @@ def create_app():
     api.add_namespace(auth_ns, path="/api/auth")
     api.add_namespace(sesion_ns, path="/api/sesiones")
 
+    # Rechazar en token_required los tokens revocados (cierre de sesión, rotación de refresco)
+    from app.core.auth import registrar_revocacion
+    from app.services.revocaciones import token_revocado
+    registrar_revocacion(token_revocado)
+
+    # Comandos de mantenimiento (flask reconciliar-contadores, ...)
+    from app.cli import register_commands
+    register_commands(app)
+
+    # Volcado periódico de los registros aceptados en modo de alta demanda
+    from app.services.alta_demanda import iniciar_volcado_periodico
+    iniciar_volcado_periodico(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,78 @@
+import click
+
+def register_commands(app):
+    """Registra los comandos de mantenimiento en ``flask <comando>``."""
+
+    @app.cli.command("reconciliar-contadores")
+    @click.option("--reparar", is_flag=True, help="Corregir los contadores desviados")
+    def reconciliar_contadores(reparar):
+        """Compara asistentes_actuales con los registros reales de eventos y sesiones."""
+        from app.services.contadores import reconciliar_contadores_service
+
+        resultado = reconciliar_contadores_service(reparar=reparar)
+        for nombre, desviaciones in resultado.items():
+            for d in desviaciones:
+                click.echo(
+                    f"{nombre} {d['id']}: contador={d['asistentes_actuales']} real={d['asistentes_reales']}"
+                )
+            estado = "corregidos" if reparar else "con desviación"
+            click.echo(f"{nombre}: {len(desviaciones)} {estado}")
+
+    @app.cli.command("volcar-registros")
+    def volcar_registros():
+        """Vuelca a la base de datos los registros pendientes del modo de alta demanda."""
+        from app.services.alta_demanda import volcar_registros as volcar_registros_service
+
+        click.echo(f"{volcar_registros_service()} registros volcados")
+
+    @app.cli.command("purgar-tokens-revocados")
+    def purgar_tokens_revocados():
+        """Borra las revocaciones de tokens que ya han expirado."""
+        from app.services.revocaciones import purgar_tokens_revocados as purgar_tokens_revocados_service
+
+        click.echo(f"{purgar_tokens_revocados_service()} revocaciones purgadas")
+
+    @app.cli.command("importar-usuarios")
+    @click.argument("archivo", type=click.File("r", encoding="utf-8"))
+    @click.option("--procesos", type=int, default=None, help="Procesos para calcular los hashes (por defecto PASSWORD_HASH_PROCESOS)")
+    def importar_usuarios(archivo, procesos):
+        """Importa usuarios desde un CSV con cabecera email,password o un JSON (lista de usuarios)."""
+        import json
+        from app.core.config import settings
+        from app.services.auth import BLOQUE_IMPORTACION_USUARIOS, importar_usuarios_service
+        from app.services.lotes import leer_filas_csv
+
+        if procesos is not None:
+            settings.PASSWORD_HASH_PROCESOS = procesos
+        contenido = archivo.read()
+        usuarios = json.loads(contenido) if archivo.name.endswith(".json") else leer_filas_csv(contenido)
+        creados = 0
+        # Un bloque por transacción: si se interrumpe, repetir el comando continúa donde quedó
+        for inicio in range(0, len(usuarios), BLOQUE_IMPORTACION_USUARIOS):
+            bloque = usuarios[inicio:inicio + BLOQUE_IMPORTACION_USUARIOS]
+            resultado, _ = importar_usuarios_service({"usuarios": bloque}, max_usuarios=None)
+            for error in resultado.get("errores", []):
+                click.echo(f"fila {inicio + error['fila']}: {error.get('message') or error.get('errors')}")
+            creados += resultado.get("creados", 0)
+            click.echo(f"{min(inicio + BLOQUE_IMPORTACION_USUARIOS, len(usuarios))}/{len(usuarios)} filas procesadas")
+        click.echo(f"{creados} usuarios creados")
+
+    @app.cli.command("importar-sesiones")
+    @click.argument("evento_id", type=int)
+    @click.argument("archivo", type=click.File("r", encoding="utf-8"))
+    @click.option("--todo-o-nada", is_flag=True, help="No importar nada si alguna fila tiene errores")
+    def importar_sesiones(evento_id, archivo, todo_o_nada):
+        """Importa las sesiones de un evento desde un CSV con cabecera o un JSON (lista de sesiones)."""
+        import json
+        from app.services.sesiones import importar_sesiones_service, leer_sesiones_csv
+
+        contenido = archivo.read()
+        if archivo.name.endswith(".json"):
+            sesiones = json.loads(contenido)
+        else:
+            sesiones = leer_sesiones_csv(contenido)
+        resultado, _ = importar_sesiones_service(evento_id, {"sesiones": sesiones, "todo_o_nada": todo_o_nada})
+        for error in resultado.get("errores", []):
+            click.echo(f"fila {error['fila']}: {error.get('message') or error.get('errors')}")
+        click.echo(resultado.get("message") or resultado.get("errors"))
+        click.echo(f"{resultado.get('creadas', 0)} sesiones creadas")
@@ -0,0 +1,182 @@
+import threading
+from collections import deque
+from app.core.config import settings
+
+# Resultados de una reserva (mismos valores que los REGISTRO_* de app.services.eventos)
+RESERVA_OK = "ok"
+RESERVA_DUPLICADO = "duplicado"
+RESERVA_LLENO = "lleno"
+
+MENSAJE_ASIENTOS_NO_COMPARTIDOS = (
+    "El modo de alta demanda con varios workers (WEB_CONCURRENCY > 1) necesita ASIENTOS_BACKEND=redis"
+)
+
+
+class MemoriaAsientosStore:
+    """Asignador de cupos en memoria del proceso.
+
+    Válido para un único proceso o como sustituto local del almacén compartido en
+    desarrollo y pruebas. Con varios workers de gunicorn debe usarse ``RedisAsientosStore``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._disponibles = {}
+        self._registrados = {}
+        self._pendientes = deque()
+
+    def cargado(self, evento_id):
+        return evento_id in self._disponibles
+
+    def cargar(self, evento_id, disponibles, registrados):
+        with self._lock:
+            if evento_id not in self._disponibles:
+                self._disponibles[evento_id] = disponibles
+                self._registrados[evento_id] = set(registrados)
+
+    def descargar(self, evento_id):
+        with self._lock:
+            self._disponibles.pop(evento_id, None)
+            self._registrados.pop(evento_id, None)
+
+    def disponibles(self, evento_id):
+        return self._disponibles.get(evento_id)
+
+    def reservar(self, evento_id, usuario_id):
+        """Reserva un cupo y encola el registro. Devuelve None si el evento no está cargado."""
+        with self._lock:
+            disponibles = self._disponibles.get(evento_id)
+            if disponibles is None:
+                return None
+            registrados = self._registrados[evento_id]
+            if usuario_id in registrados:
+                return RESERVA_DUPLICADO
+            if disponibles <= 0:
+                return RESERVA_LLENO
+            self._disponibles[evento_id] = disponibles - 1
+            registrados.add(usuario_id)
+            self._pendientes.append((evento_id, usuario_id))
+            return RESERVA_OK
+
+    def liberar(self, evento_id, usuario_id):
+        with self._lock:
+            registrados = self._registrados.get(evento_id)
+            if registrados is not None and usuario_id in registrados:
+                registrados.discard(usuario_id)
+                self._disponibles[evento_id] += 1
+
+    def pendientes(self):
+        return len(self._pendientes)
+
+    def extraer_pendientes(self, limite):
+        with self._lock:
+            return [self._pendientes.popleft() for _ in range(min(limite, len(self._pendientes)))]
+
+    def reencolar(self, registros):
+        with self._lock:
+            self._pendientes.extendleft(reversed(registros))
+
+
+# Reserva atómica en Redis: verifica duplicado y cupo, descuenta y encola en un solo paso
+_RESERVAR_LUA = """
+local disponibles = redis.call('GET', KEYS[1])
+if not disponibles then return -1 end
+if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then return 1 end
+if tonumber(disponibles) <= 0 then return 2 end
+redis.call('DECR', KEYS[1])
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('RPUSH', KEYS[3], ARGV[2])
+return 0
+"""
+
+_LIBERAR_LUA = """
+if redis.call('SREM', KEYS[2], ARGV[1]) == 1 then redis.call('INCR', KEYS[1]) end
+return 0
+"""
+
+# Carga atómica: el contador y el conjunto de registrados aparecen a la vez para los demás
+# clientes. SET NX conserva el estado si otro worker ya cargó el evento; SADD por tramos para
+# no superar el límite de argumentos de unpack.
+_CARGAR_LUA = """
+if not redis.call('SET', KEYS[1], ARGV[1], 'NX') then return 0 end
+redis.call('DEL', KEYS[2])
+for i = 2, #ARGV, 5000 do
+    redis.call('SADD', KEYS[2], unpack(ARGV, i, math.min(i + 4999, #ARGV)))
+end
+return 1
+"""
+
+_RESULTADOS_LUA = {-1: None, 0: RESERVA_OK, 1: RESERVA_DUPLICADO, 2: RESERVA_LLENO}
+
+
+class RedisAsientosStore:
+    """Asignador de cupos compartido entre workers, respaldado por Redis (dependencia opcional)."""
+
+    def __init__(self, url, prefijo="asientos"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefijo = prefijo
+        self._cola = f"{prefijo}:pendientes"
+        self._cargar = self._redis.register_script(_CARGAR_LUA)
+        self._reservar = self._redis.register_script(_RESERVAR_LUA)
+        self._liberar = self._redis.register_script(_LIBERAR_LUA)
+
+    def _claves(self, evento_id):
+        return f"{self._prefijo}:{evento_id}:disponibles", f"{self._prefijo}:{evento_id}:registrados"
+
+    def cargado(self, evento_id):
+        return self._redis.exists(self._claves(evento_id)[0]) == 1
+
+    def cargar(self, evento_id, disponibles, registrados):
+        self._cargar(keys=list(self._claves(evento_id)), args=[disponibles, *registrados])
+
+    def descargar(self, evento_id):
+        self._redis.delete(*self._claves(evento_id))
+
+    def disponibles(self, evento_id):
+        valor = self._redis.get(self._claves(evento_id)[0])
+        return int(valor) if valor is not None else None
+
+    def reservar(self, evento_id, usuario_id):
+        resultado = self._reservar(
+            keys=[*self._claves(evento_id), self._cola],
+            args=[usuario_id, f"{evento_id}:{usuario_id}"],
+        )
+        return _RESULTADOS_LUA[int(resultado)]
+
+    def liberar(self, evento_id, usuario_id):
+        self._liberar(keys=list(self._claves(evento_id)), args=[usuario_id])
+
+    def pendientes(self):
+        return self._redis.llen(self._cola)
+
+    def extraer_pendientes(self, limite):
+        valores = self._redis.lpop(self._cola, limite) or []
+        return [tuple(int(parte) for parte in valor.split(b":")) for valor in valores]
+
+    def reencolar(self, registros):
+        if registros:
+            self._redis.lpush(self._cola, *[f"{e}:{u}" for e, u in reversed(registros)])
+
+
+def asientos_compartidos():
+    """True si el asignador configurado es único para toda la aplicación.
+
+    El asignador en memoria es de cada proceso: con varios workers cada uno cargaría el cupo
+    libre completo y el evento admitiría tantas veces su capacidad como workers haya.
+    """
+    return settings.ASIENTOS_BACKEND == "redis" or settings.WORKERS <= 1
+
+
+_store = None
+
+def get_asientos_store():
+    """Devuelve el asignador configurado en ``settings.ASIENTOS_BACKEND`` (instancia única por proceso)."""
+    global _store
+    if _store is None:
+        if settings.ASIENTOS_BACKEND == "redis":
+            _store = RedisAsientosStore(settings.REDIS_URL)
+        else:
+            _store = MemoriaAsientosStore()
+    return _store
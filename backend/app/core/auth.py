@@ -1,5 +1,9 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from flask import request
+from flask import request, g
 import jwt
 from app.core.config import settings
 
@@ -11,6 +15,103 @@ def decode_jwt(token):
     except jwt.InvalidTokenError:
         raise ValueError("Invalid token")
 
+
+class TokenCache:
+    """Tokens ya verificados del proceso, por hash SHA-256, hasta su ``exp`` y con desalojo LRU.
+
+    Evita repetir la verificación de la firma en cada petición del mismo cliente. Solo se
+    guardan tokens con ``exp``; los tokens en claro no se conservan en memoria.
+    """
+
+    def __init__(self, max_entradas=10000):
+        self._lock = threading.Lock()
+        self._max_entradas = max_entradas
+        self._entradas = OrderedDict()  # hash -> (exp, claims)
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def obtener(self, token):
+        clave = self.clave(token)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > time.time():
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            if entrada is not None:
+                del self._entradas[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, token, claims):
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        clave = self.clave(token)
+        with self._lock:
+            self._entradas[clave] = (exp, claims)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self._max_entradas:
+                self._entradas.popitem(last=False)
+
+    def olvidar(self, token):
+        with self._lock:
+            self._entradas.pop(self.clave(token), None)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            "entradas": len(self._entradas),
+        }
+
+
+_token_cache = None
+
+def get_token_cache():
+    """Caché de tokens verificados del proceso (instancia única)."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache(settings.JWT_CACHE_MAX_ENTRADAS)
+    return _token_cache
+
+# Comprobaciones de revocación: funciones claims -> bool, consultadas en cada petición
+_comprobaciones_revocacion = []
+
+def registrar_revocacion(comprobacion):
+    """Registra ``comprobacion(claims)``; si devuelve True el token se rechaza aunque esté en caché.
+
+    Se llama en cada petición autenticada, así que debe ser barata (sin consultas a la base de
+    datos en el caso habitual). Registrar la misma función varias veces no tiene efecto.
+    """
+    if comprobacion not in _comprobaciones_revocacion:
+        _comprobaciones_revocacion.append(comprobacion)
+    return comprobacion
+
+def olvidar_token(token):
+    """Quita el token de la caché: la próxima petición vuelve a verificarlo."""
+    get_token_cache().olvidar(token)
+
+def verificar_token(token):
+    """Claims del token, verificando la firma solo si no está en la caché; ValueError si no es válido."""
+    if settings.JWT_CACHE_MAX_ENTRADAS > 0:
+        cache = get_token_cache()
+        claims = cache.obtener(token)
+        if claims is None:
+            claims = decode_jwt(token)
+            cache.guardar(token, claims)
+    else:
+        claims = decode_jwt(token)
+    if any(comprobacion(claims) for comprobacion in _comprobaciones_revocacion):
+        raise ValueError("Token has been revoked")
+    return claims
+
 def token_required(f):
     @wraps(f)
     def decorator(*args, **kwargs):
@@ -23,7 +124,9 @@ def token_required(f):
             return {"message": "Authentication token is missing!"}, 403
 
         try:
-            data = decode_jwt(token)
+            data = verificar_token(token)
+            if data.get("tipo") == "refresh":
+                return {"message": "Invalid token: refresh tokens cannot be used for authentication"}, 403
             sub = data.get("sub")
             if not sub:
                 return {"message": "Invalid token: missing user ID"}, 403
@@ -32,6 +135,7 @@ def token_required(f):
             except (ValueError, TypeError):
                 return {"message": "Invalid token: user ID must be an integer"}, 403
             current_user = {"id": user_id}
+            g.claims_token = data  # Para las rutas que necesitan el jti (cerrar sesión)
         except ValueError as e:
             return {"message": str(e)}, 403
         except Exception:
@@ -39,4 +143,13 @@ def token_required(f):
 
         kwargs['current_user'] = current_user
         return f(*args, **kwargs)
-    return decorator
\ No newline at end of file
+    return decorator
+
+def admin_required(f):
+    """Restringe la ruta a los usuarios de ``settings.ADMIN_USUARIOS``; se aplica después de token_required."""
+    @wraps(f)
+    def decorator(*args, **kwargs):
+        if kwargs['current_user']['id'] not in settings.ADMIN_USUARIOS:
+            return {"message": "Admin privileges required"}, 403
+        return f(*args, **kwargs)
+    return decorator
@@ -0,0 +1,29 @@
+import hashlib
+import math
+
+
+class FiltroBloom:
+    """Conjunto aproximado de cadenas: sin falsos negativos y con falsos positivos acotados.
+
+    Dimensionado para ``capacidad`` elementos con una tasa de falsos positivos ``tasa_fp``;
+    con 100 000 elementos y 0,1 % ocupa unos 180 KB. No admite borrados.
+    """
+
+    def __init__(self, capacidad, tasa_fp=0.001):
+        self._bits_totales = max(8, math.ceil(-capacidad * math.log(tasa_fp) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._bits_totales / capacidad * math.log(2)))
+        self._bits = bytearray((self._bits_totales + 7) // 8)
+
+    def _posiciones(self, valor):
+        # Doble hash (Kirsch-Mitzenmacher): k posiciones a partir de un único blake2b
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self._bits_totales for i in range(self._hashes))
+
+    def agregar(self, valor):
+        for posicion in self._posiciones(valor):
+            self._bits[posicion >> 3] |= 1 << (posicion & 7)
+
+    def __contains__(self, valor):
+        return all(self._bits[posicion >> 3] & (1 << (posicion & 7)) for posicion in self._posiciones(valor))
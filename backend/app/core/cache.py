@@ -0,0 +1,145 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import settings
+from app.core.representaciones import codificar_json
+
+# Caché de lectura para los servicios GET. Las claves se versionan por grupo
+# ("eventos", "evento:5", "sesiones", ...): invalidar un grupo incrementa su versión,
+# de modo que las entradas anteriores dejan de leerse y expiran por TTL o LRU.
+
+
+class _Estadisticas:
+    """Contadores de aciertos y fallos del proceso."""
+
+    def __init__(self):
+        self.aciertos = 0
+        self.fallos = 0
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+        }
+
+
+class MemoriaCache(_Estadisticas):
+    """Caché en memoria del proceso con TTL por entrada y desalojo LRU.
+
+    Sirve para un único proceso y como sustituto local del almacén compartido en
+    desarrollo y pruebas. Los valores se guardan por referencia y no deben modificarse.
+    """
+
+    def __init__(self, max_entradas=1024):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._max_entradas = max_entradas
+        self._entradas = OrderedDict()  # clave -> (expira, valor)
+        self._versiones = {}
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            if entrada is not None:
+                del self._entradas[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor, ttl):
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self._max_entradas:
+                self._entradas.popitem(last=False)
+
+    def versiones(self, grupos):
+        return [self._versiones.get(grupo, 0) for grupo in grupos]
+
+    def invalidar(self, *grupos):
+        with self._lock:
+            for grupo in grupos:
+                self._versiones[grupo] = self._versiones.get(grupo, 0) + 1
+
+    def estadisticas(self):
+        return {**super().estadisticas(), "entradas": len(self._entradas)}
+
+
+class RedisCache(_Estadisticas):
+    """Caché compartida entre workers, respaldada por Redis (dependencia opcional).
+
+    El TTL se aplica con SETEX; el límite de memoria y el desalojo LRU los da el propio
+    Redis (``maxmemory`` con ``maxmemory-policy allkeys-lru``). Las versiones de grupo
+    son contadores sin expiración.
+    """
+
+    def __init__(self, url, prefijo="cache"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefijo = prefijo
+
+    def obtener(self, clave):
+        valor = self._redis.get(f"{self._prefijo}:{clave}")
+        if valor is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return json.loads(valor)
+
+    def guardar(self, clave, valor, ttl):
+        self._redis.setex(f"{self._prefijo}:{clave}", max(int(ttl), 1), codificar_json(valor))
+
+    def versiones(self, grupos):
+        valores = self._redis.mget([f"{self._prefijo}:version:{grupo}" for grupo in grupos])
+        return [int(valor) if valor is not None else 0 for valor in valores]
+
+    def invalidar(self, *grupos):
+        with self._redis.pipeline(transaction=False) as pipe:
+            for grupo in grupos:
+                pipe.incr(f"{self._prefijo}:version:{grupo}")
+            pipe.execute()
+
+
+_cache = None
+
+def get_cache():
+    """Devuelve la caché configurada en ``settings.CACHE_BACKEND`` (instancia única por proceso)."""
+    global _cache
+    if _cache is None:
+        if settings.CACHE_BACKEND == "redis":
+            _cache = RedisCache(settings.REDIS_URL)
+        else:
+            _cache = MemoriaCache(settings.CACHE_MAX_ENTRADAS)
+    return _cache
+
+def cacheado(grupos, clave, calcular, ttl=None):
+    """Lectura a través de la caché para servicios que devuelven ``(respuesta, status)``.
+
+    ``grupos`` son los grupos de invalidación de los que depende la respuesta y ``clave``
+    la distingue dentro de ellos. Solo se guardan las respuestas 200. Las versiones se leen
+    antes de consultar la base de datos: si una escritura invalida el grupo mientras tanto,
+    la respuesta queda guardada bajo la versión anterior y ningún lector la verá.
+    """
+    cache = get_cache()
+    if settings.CACHE_TTL <= 0:
+        return calcular()
+    versiones = cache.versiones(grupos)
+    clave_versionada = ":".join(f"{g}@{v}" for g, v in zip(grupos, versiones)) + f":{clave}"
+    respuesta = cache.obtener(clave_versionada)
+    if respuesta is not None:
+        return respuesta, 200
+    respuesta, status_code = calcular()
+    if status_code == 200:
+        cache.guardar(clave_versionada, respuesta, settings.CACHE_TTL if ttl is None else ttl)
+    return respuesta, status_code
+
+def invalidar_cache(*grupos):
+    """Invalida los grupos indicados; llamar después del commit de la escritura."""
+    get_cache().invalidar(*grupos)
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -8,5 +9,58 @@ class Settings:
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     DEBUG = os.getenv("DEBUG", True)
     ALGORITHM = "HS256"
+    JWT_CACHE_MAX_ENTRADAS = int(os.getenv("JWT_CACHE_MAX_ENTRADAS", 10000))  # tokens verificados en memoria; 0 desactiva la caché
+    ACCESS_TOKEN_MINUTOS = int(os.getenv("ACCESS_TOKEN_MINUTOS", 15))
+    REFRESH_TOKEN_DIAS = int(os.getenv("REFRESH_TOKEN_DIAS", 30))
+    ADMIN_USUARIOS = {int(i) for i in os.getenv("ADMIN_USUARIOS", "").split(",") if i.strip()}  # ids con permisos de administración
+
+    # Tokens revocados: filtro de Bloom por proceso sincronizado con la tabla tokens_revocados
+    REVOCACION_CAPACIDAD = int(os.getenv("REVOCACION_CAPACIDAD", 100000))  # revocaciones vigentes previstas
+    REVOCACION_TASA_FP = float(os.getenv("REVOCACION_TASA_FP", 0.001))  # falsos positivos (se confirman en la base de datos)
+    REVOCACION_REFRESCO = float(os.getenv("REVOCACION_REFRESCO", 5))  # segundos entre sincronizaciones con otros workers
+
+    # Contraseñas: método de werkzeug completo (los hashes con otro método se actualizan al iniciar sesión)
+    PASSWORD_HASH_METODO = os.getenv("PASSWORD_HASH_METODO", "scrypt:32768:8:1")  # p. ej. "pbkdf2:sha256:600000"
+    PASSWORD_HASH_PROCESOS = int(os.getenv("PASSWORD_HASH_PROCESOS", 2))  # procesos por worker; 0 calcula en el propio worker
+
+    # Límites de peticiones por ruta: criterio ("ip", "email", "usuario") -> "cantidad/periodo" (segundo, minuto, hora o segundos)
+    LIMITES_ACTIVOS = os.getenv("LIMITES_ACTIVOS", "true").lower() == "true"
+    LIMITES_BACKEND = os.getenv("LIMITES_BACKEND", "memoria")  # "memoria" o "redis"
+    LIMITES_MAX_CLAVES = int(os.getenv("LIMITES_MAX_CLAVES", 100000))  # solo limitador en memoria
+    LIMITES_PETICIONES = json.loads(os.getenv("LIMITES_PETICIONES", "null")) or {
+        "auth.login": {"ip": "20/minuto", "email": "5/minuto"},
+        "auth.register": {"ip": "5/minuto"},
+        "auth.importar_usuarios": {"usuario": "6/minuto"},
+    }
+
+    # Pool de conexiones por worker: (DB_POOL_SIZE + DB_MAX_OVERFLOW) x workers debe caber en max_connections
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))  # segundos (enteros) esperando una conexión libre
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # segundos; renueva conexiones antiguas
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))  # solo Postgres; 0 lo desactiva
+
+    # Tamaño máximo de página aceptado en los listados
+    MAX_PER_PAGE = int(os.getenv("MAX_PER_PAGE", 100))
+
+    # Almacén compartido (Redis) para los componentes que lo soportan
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Modo de alta demanda: asignación de cupos en memoria y volcado por lotes
+    ASIENTOS_BACKEND = os.getenv("ASIENTOS_BACKEND", "memoria")  # "memoria" o "redis" (obligatorio con varios workers)
+    WORKERS = int(os.getenv("WEB_CONCURRENCY", 1))  # procesos de la aplicación; gunicorn lee la misma variable
+    ALTA_DEMANDA_LOTE = int(os.getenv("ALTA_DEMANDA_LOTE", 500))
+    ALTA_DEMANDA_INTERVALO = float(os.getenv("ALTA_DEMANDA_INTERVALO", 1.0))  # segundos; 0 desactiva el volcado periódico
+
+    # Caché de lectura de eventos y sesiones
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")  # "memoria" o "redis"
+    CACHE_TTL = float(os.getenv("CACHE_TTL", 30))  # segundos; 0 desactiva la caché
+    CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", 1024))  # solo caché en memoria
+    AGENDA_CACHE_TTL = float(os.getenv("AGENDA_CACHE_TTL", 0))  # segundos; agenda precalculada por usuario, 0 la desactiva
+
+    # Respuestas JSON de la API
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")  # "orjson" o "stdlib"; sin orjson instalado se usa stdlib
+    COMPRESION_UMBRAL = int(os.getenv("COMPRESION_UMBRAL", 1024))  # bytes; 0 desactiva gzip/br
 
 settings = Settings()
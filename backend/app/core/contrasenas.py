@@ -0,0 +1,73 @@
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.core.config import settings
+
+# Hash y verificación de contraseñas fuera del worker que atiende la petición.
+# El trabajo de CPU (scrypt/PBKDF2) se ejecuta en un pool de procesos acotado: mientras
+# tanto el hilo de la petición solo espera, suelta el GIL y las peticiones ligeras del
+# mismo worker siguen atendiéndose.
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Pool de procesos del worker actual, o None si ``settings.PASSWORD_HASH_PROCESOS`` es 0.
+
+    Se crea bajo demanda y de nuevo tras un fork (cada worker de gunicorn tiene el suyo). Los
+    procesos se arrancan con "spawn" para no heredar hilos ni conexiones del worker.
+    """
+    global _pool, _pool_pid
+    if settings.PASSWORD_HASH_PROCESOS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_PROCESOS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+def cerrar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown()
+        _pool = None
+
+def _ejecutar(funcion, *args):
+    pool = get_pool()
+    if pool is None:
+        return funcion(*args)
+    return pool.submit(funcion, *args).result()
+
+def hashear(password):
+    """Hash de la contraseña con el método de ``settings.PASSWORD_HASH_METODO``."""
+    return _ejecutar(generate_password_hash, password, settings.PASSWORD_HASH_METODO)
+
+def hashear_varios(passwords):
+    """Hashes de varias contraseñas, en el mismo orden, repartidos entre todos los procesos del pool."""
+    metodo = settings.PASSWORD_HASH_METODO
+    pool = get_pool()
+    if pool is None:
+        return [generate_password_hash(password, metodo) for password in passwords]
+    # Trozos de varias contraseñas por tarea para no pagar el envío entre procesos en cada una
+    chunksize = max(1, len(passwords) // (settings.PASSWORD_HASH_PROCESOS * 4))
+    return list(pool.map(generate_password_hash, passwords, itertools.repeat(metodo), chunksize=chunksize))
+
+def verificar(password_hash, password):
+    """True si la contraseña coincide con el hash almacenado."""
+    return _ejecutar(check_password_hash, password_hash, password)
+
+def necesita_rehash(password_hash):
+    """True si el hash se generó con parámetros distintos de los configurados.
+
+    Solo reconoce hashes de werkzeug (``metodo$sal$hash``); cualquier otro formato se deja igual.
+    """
+    metodo, separador, _ = password_hash.partition("$")
+    return bool(separador) and metodo != settings.PASSWORD_HASH_METODO
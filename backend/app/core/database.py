@@ -1,17 +0,0 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import settings
-
-SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
-
-
-# Crear el motor de la base de datos
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-
-# Crear la sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Base para todos los modelos
-Base = declarative_base()
-
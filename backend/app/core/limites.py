@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from functools import lru_cache, wraps
+from flask import g, request
+from app.core.config import settings
+
+# Limitación de peticiones con ventanas deslizantes por clave ("auth.login:ip:1.2.3.4",
+# "auth.login:email:ana@example.com", ...). Cada clave guarda las marcas de tiempo de sus
+# peticiones aceptadas dentro de la ventana, así que el límite es exacto.
+
+_UNIDADES = {"segundo": 1, "minuto": 60, "hora": 3600}
+
+@lru_cache(maxsize=None)
+def parsear_limite(limite):
+    """``"5/minuto"`` -> (5, 60.0). También admite segundos: ``"5/30"``."""
+    cantidad, _, periodo = limite.partition("/")
+    segundos = _UNIDADES.get(periodo.strip())
+    return int(cantidad), float(segundos if segundos is not None else periodo)
+
+
+class MemoriaLimitador:
+    """Ventanas deslizantes en memoria del proceso.
+
+    Sirve para un único proceso y como sustituto local del almacén compartido en desarrollo
+    y pruebas; con varios workers los límites se multiplican por el número de procesos, así que
+    debe usarse ``RedisLimitador``. Conserva como mucho ``max_claves`` claves (LRU).
+    """
+
+    def __init__(self, max_claves=100000):
+        self._lock = threading.Lock()
+        self._max_claves = max_claves
+        self._claves = OrderedDict()  # clave -> deque de marcas de tiempo
+
+    def consumir(self, clave, limite, ventana):
+        """Registra una petición; devuelve None si se acepta o los segundos hasta poder reintentar."""
+        ahora = time.monotonic()
+        with self._lock:
+            marcas = self._claves.get(clave)
+            if marcas is None:
+                marcas = self._claves[clave] = deque()
+                while len(self._claves) > self._max_claves:
+                    self._claves.popitem(last=False)
+            else:
+                self._claves.move_to_end(clave)
+            while marcas and marcas[0] <= ahora - ventana:
+                marcas.popleft()
+            if len(marcas) >= limite:
+                return marcas[0] + ventana - ahora
+            marcas.append(ahora)
+            return None
+
+    def reiniciar(self, clave):
+        with self._lock:
+            self._claves.pop(clave, None)
+
+
+# Consumo atómico en Redis con un conjunto ordenado por clave (puntuación = marca de tiempo en ms)
+_CONSUMIR_LUA = """
+local ahora = tonumber(ARGV[1])
+local ventana = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ahora - ventana)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local primera = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return tonumber(primera[2]) + ventana - ahora
+end
+redis.call('ZADD', KEYS[1], ahora, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], ventana)
+return -1
+"""
+
+
+class RedisLimitador:
+    """Ventanas deslizantes compartidas entre workers, respaldadas por Redis (dependencia opcional)."""
+
+    def __init__(self, url, prefijo="limites"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefijo = prefijo
+        self._consumir = self._redis.register_script(_CONSUMIR_LUA)
+
+    def consumir(self, clave, limite, ventana):
+        ventana_ms = int(ventana * 1000)
+        ahora_ms = int(time.time() * 1000)
+        espera = self._consumir(
+            keys=[f"{self._prefijo}:{clave}"],
+            args=[ahora_ms, ventana_ms, limite, f"{ahora_ms}:{uuid.uuid4().hex}"],
+        )
+        return None if int(espera) < 0 else int(espera) / 1000
+
+    def reiniciar(self, clave):
+        self._redis.delete(f"{self._prefijo}:{clave}")
+
+
+_limitador = None
+
+def get_limitador():
+    """Devuelve el limitador configurado en ``settings.LIMITES_BACKEND`` (instancia única por proceso)."""
+    global _limitador
+    if _limitador is None:
+        if settings.LIMITES_BACKEND == "redis":
+            _limitador = RedisLimitador(settings.REDIS_URL)
+        else:
+            _limitador = MemoriaLimitador(settings.LIMITES_MAX_CLAVES)
+    return _limitador
+
+def _valor_criterio(criterio):
+    if criterio == "ip":
+        return request.remote_addr
+    if criterio == "email":
+        datos = request.get_json(silent=True)
+        email = datos.get("email") if isinstance(datos, dict) else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+    if criterio == "usuario":
+        # Solo en rutas con token_required aplicado antes que limitar
+        claims = g.get("claims_token")
+        return claims.get("sub") if claims else None
+    raise ValueError(f"Criterio de límite desconocido: {criterio}")
+
+def limitar(nombre):
+    """Aplica los límites de ``settings.LIMITES_PETICIONES[nombre]`` antes de ejecutar la ruta.
+
+    La configuración es un diccionario criterio -> límite, p. ej. ``{"ip": "20/minuto",
+    "email": "5/minuto"}``. Si se supera alguno responde 429 con ``Retry-After`` sin llegar
+    a ejecutar la ruta (ni validaciones, ni consultas, ni hash de contraseñas).
+    """
+    def decorador(f):
+        @wraps(f)
+        def envoltura(*args, **kwargs):
+            configuracion = settings.LIMITES_PETICIONES.get(nombre) if settings.LIMITES_ACTIVOS else None
+            if configuracion:
+                limitador = get_limitador()
+                for criterio, limite in configuracion.items():
+                    valor = _valor_criterio(criterio)
+                    if valor is None:
+                        continue
+                    espera = limitador.consumir(f"{nombre}:{criterio}:{valor}", *parsear_limite(limite))
+                    if espera is not None:
+                        return (
+                            {"message": "Demasiadas peticiones, inténtelo más tarde"},
+                            429,
+                            {"Retry-After": str(max(1, math.ceil(espera)))}
+                        )
+            return f(*args, **kwargs)
+        return envoltura
+    return decorador
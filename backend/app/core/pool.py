@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+
+# Pool de conexiones de la aplicación: opciones del engine a partir de Settings y métricas
+# de espera al obtener una conexión, para dimensionar workers frente al max_connections de Postgres.
+
+
+class MetricasPool:
+    """Esperas al obtener conexiones del pool en este proceso.
+
+    Guarda contadores totales y las últimas ``muestras`` esperas para calcular percentiles.
+    """
+
+    def __init__(self, muestras=1024):
+        self._lock = threading.Lock()
+        self._esperas = deque(maxlen=muestras)
+        self.obtenidas = 0
+        self.agotadas = 0  # Esperas que acabaron en TimeoutError (pool_timeout)
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def registrar(self, espera, agotada=False):
+        with self._lock:
+            self._esperas.append(espera)
+            if agotada:
+                self.agotadas += 1
+            else:
+                self.obtenidas += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+
+    def estadisticas(self):
+        with self._lock:
+            esperas = sorted(self._esperas)
+            total = self.obtenidas + self.agotadas
+
+        def percentil(p):
+            return round(esperas[min(len(esperas) - 1, int(p * len(esperas)))] * 1000, 3) if esperas else 0.0
+
+        return {
+            "obtenidas": self.obtenidas,
+            "agotadas": self.agotadas,
+            "espera_media_ms": round(self.espera_total / total * 1000, 3) if total else 0.0,
+            "espera_p50_ms": percentil(0.5),
+            "espera_p99_ms": percentil(0.99),
+            "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+        }
+
+
+_metricas = MetricasPool()
+
+def get_metricas_pool():
+    """Métricas del pool del proceso (instancia única)."""
+    return _metricas
+
+
+class QueuePoolMedido(QueuePool):
+    """QueuePool que mide cuánto espera cada petición de conexión (incluido el agotamiento)."""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except PoolTimeoutError:
+            _metricas.registrar(time.perf_counter() - inicio, agotada=True)
+            raise
+        _metricas.registrar(time.perf_counter() - inicio)
+        return conexion
+
+
+def opciones_engine(url):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` para ``url`` según ``settings.DB_*``."""
+    opciones = {
+        "poolclass": QueuePoolMedido,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    url = url or ""
+    if url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        # Tiempo máximo por sentencia en el servidor (cancela consultas desbocadas)
+        opciones["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    elif url.startswith("sqlite"):
+        opciones["connect_args"] = {"check_same_thread": False}
+    return opciones
+
+def estadisticas_pool(pool):
+    """Estado actual de ``pool`` (conexiones en uso, saturación) junto con las métricas de espera."""
+    estado = {**get_metricas_pool().estadisticas()}
+    if isinstance(pool, QueuePool):
+        capacidad = pool.size() + max(pool._max_overflow, 0)
+        estado.update({
+            "tamano": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "en_uso": pool.checkedout(),
+            "disponibles": pool.checkedin(),
+            "saturacion": round(pool.checkedout() / capacidad, 4) if capacidad else 0.0,
+        })
+    return estado
@@ -0,0 +1,68 @@
+import gzip
+import json
+from datetime import date, time
+from decimal import Decimal
+from uuid import UUID
+from flask import make_response, request
+from app.core.config import settings
+
+# Dependencias opcionales: orjson para codificar y brotli para comprimir
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+
+def _por_defecto(valor):
+    # datetime es subclase de date: ambos salen en ISO 8601, igual que con .isoformat()
+    if isinstance(valor, (date, time)):
+        return valor.isoformat()
+    if isinstance(valor, (Decimal, UUID)):
+        return str(valor)
+    raise TypeError(f"Objeto de tipo {type(valor).__name__} no serializable a JSON")
+
+def codificar_json(datos):
+    """Codifica ``datos`` como JSON compacto en UTF-8 (bytes), con fechas en ISO 8601.
+
+    Usa orjson si está instalado y ``settings.JSON_BACKEND`` es "orjson"; si no, el módulo
+    ``json`` de la biblioteca estándar con una salida equivalente.
+    """
+    if orjson is not None and settings.JSON_BACKEND == "orjson":
+        return orjson.dumps(datos, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(datos, default=_por_defecto, ensure_ascii=False, separators=(",", ":")).encode()
+
+def comprimir(respuesta):
+    """Comprime con br o gzip las respuestas de al menos ``settings.COMPRESION_UMBRAL`` bytes."""
+    umbral = settings.COMPRESION_UMBRAL
+    if umbral <= 0 or respuesta.content_length is None or respuesta.content_length < umbral:
+        return respuesta
+    if "Content-Encoding" in respuesta.headers:
+        return respuesta
+
+    respuesta.vary.add("Accept-Encoding")
+    datos = respuesta.get_data()
+    if brotli is not None and request.accept_encodings["br"]:
+        codificacion, datos = "br", brotli.compress(datos, quality=5)
+    elif request.accept_encodings["gzip"]:
+        codificacion, datos = "gzip", gzip.compress(datos, compresslevel=6)
+    else:
+        return respuesta
+    respuesta.set_data(datos)
+    respuesta.headers["Content-Encoding"] = codificacion
+    return respuesta
+
+def output_json(data, code, headers=None):
+    """Representación ``application/json`` de la API (reemplaza la de flask-restx)."""
+    respuesta = make_response(codificar_json(data) + b"\n", code)
+    respuesta.headers.extend(headers or {})
+    respuesta.mimetype = "application/json"
+    return comprimir(respuesta)
+
+def registrar_representaciones(api):
+    """Registra la representación JSON rápida en una ``flask_restx.Api``."""
+    api.representation("application/json")(output_json)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 from app.models.shared import metadata  # Importa el metadata compartido
 
 # Tabla de asociación para relacionar usuarios con eventos
@@ -11,5 +11,6 @@ asistentes_evento = Table(
 asistentes_sesion = Table(
     'asistentes_sesion', metadata,
     Column('usuario_id', Integer, ForeignKey('usuarios.id', ondelete="CASCADE"), primary_key=True),
-    Column('sesion_id', Integer, ForeignKey('sesiones.id', ondelete="CASCADE"), primary_key=True)
+    Column('sesion_id', Integer, ForeignKey('sesiones.id', ondelete="CASCADE"), primary_key=True),
+    Index('ix_asistentes_sesion_sesion_id', 'sesion_id')  # Inscritos de una sesión; la clave primaria empieza por usuario_id
 )
\ No newline at end of file
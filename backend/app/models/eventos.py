@@ -1,6 +1,5 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, DateTime, Boolean, Index, false, literal_column
 from app.models.shared import metadata  # Importa el metadata compartido
-from app.models.associations import asistentes_evento  # Importa la tabla de asociación
 
 # Definición de la tabla eventos
 eventos_table = Table(
@@ -11,5 +10,9 @@ eventos_table = Table(
     Column('fecha_inicio', DateTime, nullable=False),
     Column('fecha_fin', DateTime, nullable=False),
     Column('capacidad_maxima', Integer, nullable=False),
-    Column('estado', String(50), default="activo")
+    Column('estado', String(50), default="activo"),
+    Column('asistentes_actuales', Integer, nullable=False, default=0, server_default="0"),  # Contador mantenido en cada registro
+    Column('alta_demanda', Boolean, nullable=False, default=False, server_default=false()),  # Registro por asignador en memoria
+    Column('version', Integer, nullable=False, default=0, server_default="0", onupdate=literal_column('version') + 1),  # ETag: cambia en cada UPDATE
+    Index('ix_eventos_fecha_inicio_id', 'fecha_inicio', 'id')  # Paginación por cursor
 )
\ No newline at end of file
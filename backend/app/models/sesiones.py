@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, DateTime, ForeignKey, Index, CheckConstraint, literal_column
 from app.models.shared import metadata
 
 # Definición de la tabla sesiones
@@ -11,5 +11,9 @@ sesiones_table = Table(
     Column('fecha_inicio', DateTime, nullable=False),
     Column('fecha_fin', DateTime, nullable=False),
     Column('capacidad_maxima', Integer, nullable=False),
-    Column('ponente', String(100), nullable=False)  # Nuevo campo para el ponente
+    Column('ponente', String(100), nullable=False),  # Nuevo campo para el ponente
+    Column('asistentes_actuales', Integer, nullable=False, default=0, server_default="0"),  # Contador mantenido en cada registro
+    Column('version', Integer, nullable=False, default=0, server_default="0", onupdate=literal_column('version') + 1),  # ETag: cambia en cada UPDATE
+    Index('ix_sesiones_evento_id_fecha_inicio', 'evento_id', 'fecha_inicio'),  # Solapamientos y listados por evento
+    CheckConstraint('fecha_fin >= fecha_inicio', name='ck_sesiones_fechas')  # tsrange falla con rangos invertidos
 )
\ No newline at end of file
@@ -0,0 +1,11 @@
+from sqlalchemy import Table, Column, Integer, String, DateTime
+from app.models.shared import metadata
+
+# Identificadores (jti) de tokens revocados; se conservan hasta que el token expira
+tokens_revocados = Table(
+    'tokens_revocados', metadata,
+    Column('jti', String(36), primary_key=True),
+    Column('usuario_id', Integer, nullable=False),
+    Column('expira', DateTime, nullable=False, index=True),  # Purga de los ya expirados
+    Column('revocado_en', DateTime, nullable=False, index=True)  # Sincronización incremental entre workers
+)
@@ -1,6 +1,6 @@
 from sqlalchemy import Table, Column, Integer, String
-from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.shared import metadata
+from app.core.contrasenas import hashear, verificar
 
 # Definición de la tabla usuarios
 usuarios_table = Table(
@@ -11,10 +11,11 @@ usuarios_table = Table(
 )
 
 # Funciones auxiliares para manejar contraseñas
+# (se calculan en el pool de procesos de app.core.contrasenas)
 def set_password(password):
     """Genera un hash de la contraseña."""
-    return generate_password_hash(password)
+    return hashear(password)
 
 def check_password(hashed_password, password):
     """Verifica si la contraseña proporcionada coincide con el hash almacenado."""
-    return check_password_hash(hashed_password, password)
+    return verificar(hashed_password, password)
@@ -1,7 +1,17 @@
 from flask_restx import Namespace, Resource, fields
 from marshmallow import ValidationError
 from app.schemas.usuarios import UsuarioCreateSchema
-from app.services.auth import register_user_service, login_user_service
+from flask import g, request
+from app.services.auth import (
+    register_user_service,
+    login_user_service,
+    importar_usuarios_service,
+    refrescar_tokens_service,
+    cerrar_sesion_service,
+)
+from app.services.lotes import leer_filas_csv
+from app.core.auth import admin_required, get_token_cache, token_required
+from app.core.limites import limitar
 
 # Crear un namespace para las rutas de autenticación
 auth_ns = Namespace("auth", description="Operaciones relacionadas con la autenticación")
@@ -12,6 +22,16 @@ register_model = auth_ns.model("Register", {
     "password": fields.String(required=True, description="Contraseña del usuario")
 })
 
+# Modelo de entrada para importar varios usuarios
+importacion_usuarios_model = auth_ns.model("ImportacionUsuarios", {
+    "usuarios": fields.List(fields.Nested(register_model), required=True, description="Usuarios con email y contraseña")
+})
+
+# Modelo de entrada con un token de refresco
+refresh_model = auth_ns.model("Refresh", {
+    "refresh_token": fields.String(required=True, description="Token de refresco obtenido al iniciar sesión")
+})
+
 # Modelo de entrada para iniciar sesión
 login_model = auth_ns.model("Login", {
     "email": fields.String(required=True, description="Correo electrónico del usuario"),
@@ -24,29 +44,48 @@ class RegisterUser(Resource):
     @auth_ns.expect(register_model)
     @auth_ns.response(201, "Usuario registrado exitosamente")
     @auth_ns.response(400, "Error en los datos proporcionados")
+    @auth_ns.response(429, "Demasiadas peticiones (ver Retry-After)")
+    @limitar("auth.register")
     def post(self):
         """Registrar un nuevo usuario"""
         json_data = auth_ns.payload  # Obtiene los datos enviados en el cuerpo de la solicitud
 
-        # Validar los datos de entrada con el esquema
-        try:
-            data = UsuarioCreateSchema().load(json_data)
-        except ValidationError as err:
-            return {"errors": err.messages}, 400
+        # El servicio valida los datos con UsuarioCreateSchema
+        return register_user_service(json_data)
+
 
-        # Pasar los datos validados al servicio
-        return register_user_service(data)
+@auth_ns.route("/importar-usuarios")
+class ImportarUsuarios(Resource):
+    @auth_ns.doc(security="Bearer Auth")
+    @token_required
+    @admin_required
+    @auth_ns.expect(importacion_usuarios_model)
+    @auth_ns.response(201, "Usuarios importados; errores por fila de los rechazados")
+    @auth_ns.response(400, "Ningún usuario importado, errores por fila o más usuarios de los permitidos")
+    @auth_ns.response(403, "Solo para administradores")
+    @auth_ns.response(429, "Demasiadas peticiones (ver Retry-After)")
+    @limitar("auth.importar_usuarios")
+    def post(self, current_user):
+        """Importar hasta 50 usuarios desde JSON o CSV (text/csv con cabecera email,password); solo administradores"""
+        if request.mimetype == "text/csv":
+            json_data = {"usuarios": leer_filas_csv(request.get_data(as_text=True))}
+        else:
+            json_data = request.get_json()
+        return importar_usuarios_service(json_data)
 
 
 @auth_ns.route("/login")
 class LoginUser(Resource):
     @auth_ns.expect(login_model)
     @auth_ns.response(200, "Inicio de sesión exitoso", model=auth_ns.model("LoginResponse", {
-        "token": fields.String(description="Token JWT generado"),
+        "token": fields.String(description="Token JWT de acceso (corta duración)"),
+        "refresh_token": fields.String(description="Token para obtener nuevos tokens en /refresh"),
         "user": fields.Raw(description="Información del usuario autenticado")
     }))
     @auth_ns.response(400, "Error en los datos proporcionados")
     @auth_ns.response(401, "Credenciales inválidas")
+    @auth_ns.response(429, "Demasiadas peticiones (ver Retry-After)")
+    @limitar("auth.login")
     def post(self):
         """Iniciar sesión de un usuario"""
         json_data = auth_ns.payload
@@ -54,4 +93,39 @@ class LoginUser(Resource):
             data = UsuarioCreateSchema().load(json_data)
         except ValidationError as err:
             return {"errors": err.messages}, 400
-        return login_user_service(data)
\ No newline at end of file
+        return login_user_service(data)
+
+
+@auth_ns.route("/refresh")
+class RefrescarTokens(Resource):
+    @auth_ns.expect(refresh_model)
+    @auth_ns.response(200, "Nuevo token de acceso y nuevo token de refresco")
+    @auth_ns.response(400, "Error en los datos proporcionados")
+    @auth_ns.response(401, "Token de refresco inválido, expirado o ya usado")
+    def post(self):
+        """Obtener nuevos tokens con un token de refresco (el usado queda revocado)"""
+        return refrescar_tokens_service(auth_ns.payload)
+
+
+@auth_ns.route("/logout")
+class CerrarSesion(Resource):
+    @auth_ns.doc(security="Bearer Auth")
+    @auth_ns.expect(auth_ns.model("Logout", {
+        "refresh_token": fields.String(required=False, description="Token de refresco a revocar también")
+    }))
+    @token_required
+    @auth_ns.response(200, "Sesión cerrada: los tokens quedan revocados")
+    @auth_ns.response(400, "Token de refresco inválido")
+    def post(self, current_user):
+        """Cerrar sesión revocando el token de acceso y, opcionalmente, el de refresco"""
+        return cerrar_sesion_service(g.claims_token, request.get_json(silent=True))  # El cuerpo es opcional
+
+
+@auth_ns.route("/tokens/estadisticas")
+class EstadisticasTokens(Resource):
+    @auth_ns.doc(security="Bearer Auth")
+    @token_required
+    @auth_ns.response(200, "Aciertos y fallos de la caché de tokens verificados en este proceso")
+    def get(self, current_user):
+        """Obtener los contadores de la caché de tokens"""
+        return get_token_cache().estadisticas(), 200
@@ -9,9 +9,17 @@ from app.services.eventos import (
     buscar_eventos_service,
     registrarse_evento_service,
     validar_capacidad_evento_service,
-    obtener_mis_eventos_service,eliminar_registro_evento_service
+    obtener_mis_eventos_service,eliminar_registro_evento_service,
+    registrar_lote_evento_service,
+    version_evento,
+    obtener_eventos_por_ids_service,
+    validar_capacidad_eventos_service
 )
+from app.services.etags import respuesta_condicional, respuesta_condicional_por_contenido
 from app.core.auth import token_required
+from app.core.cache import get_cache
+from app.core.pool import estadisticas_pool
+from app import db
 
 # Crear un namespace para las rutas de eventos
 evento_ns = Namespace(
@@ -37,7 +45,13 @@ evento_model = evento_ns.model("Evento", {
     "fecha_inicio": fields.String(required=True, description="Fecha de inicio del evento (YYYY-MM-DD HH:MM:SS)"),
     "fecha_fin": fields.String(required=True, description="Fecha de fin del evento (YYYY-MM-DD HH:MM:SS)"),
     "capacidad_maxima": fields.Integer(required=True, description="Capacidad máxima del evento"),
-    "estado": fields.String(description="Estado del evento (activo/inactivo)", default="activo")
+    "estado": fields.String(description="Estado del evento (activo/inactivo)", default="activo"),
+    "alta_demanda": fields.Boolean(description="Registro en modo de alta demanda (cupos asignados en memoria)", default=False)
+})
+
+# Modelo de entrada para el registro masivo de usuarios
+registro_lote_model = evento_ns.model("RegistroLote", {
+    "usuario_ids": fields.List(fields.Integer, required=True, description="IDs de los usuarios a registrar")
 })
 
 
@@ -49,14 +63,19 @@ class ObtenerEventos(Resource):
             .add_argument('nombre', type=str, default='', help='Nombre del evento para filtrar')
             .add_argument('page', type=int, default=1, help='Número de página')
             .add_argument('per_page', type=int, default=10, help='Eventos por página')
+            .add_argument('cursor', type=str, help='Paginación por cursor: vacío para la primera página, luego next_cursor')
+            .add_argument('total', type=str, choices=('exacto', 'aproximado'), help='Incluir el total en modo cursor')
+            .add_argument('fields', type=str, help='Campos a devolver separados por comas (p. ej. id,nombre,fecha_inicio)')
+            .add_argument('include', type=str, help='Relaciones a incluir: sesiones')
     )
     @evento_ns.response(200, "Lista de eventos obtenida exitosamente")
+    @evento_ns.response(304, "La lista no cambió desde el ETag enviado en If-None-Match")
     @evento_ns.response(500, "Error interno del servidor")
     @token_required
     def get(self, current_user):
         """Obtener la lista de eventos con filtro opcional por nombre"""
-        response, status_code = obtener_eventos_service(current_user)
-        return response, status_code
+        # El ETag sale del listado (servido de la caché), sin volver a contar ni paginar en la base de datos
+        return respuesta_condicional_por_contenido(lambda: obtener_eventos_service(current_user))
 
 
 @evento_ns.route("/crear")
@@ -78,12 +97,38 @@ class CrearEvento(Resource):
 class ObtenerEvento(Resource):
     @evento_ns.doc(security="Bearer Auth")
     @token_required
+    @evento_ns.expect(
+        evento_ns.parser()
+            .add_argument('fields', type=str, help='Campos a devolver separados por comas (p. ej. id,nombre,fecha_inicio)')
+            .add_argument('include', type=str, help='Relaciones a incluir: sesiones')
+    )
     @evento_ns.response(200, "Evento obtenido exitosamente")
+    @evento_ns.response(304, "El evento no cambió desde el ETag enviado en If-None-Match")
+    @evento_ns.response(400, "Campos o relaciones no válidos")
     @evento_ns.response(404, "Evento no encontrado")
     def get(self, current_user, id):
         """Obtener un evento por ID"""
-        response, status_code = obtener_evento_service(id)
-        return response, status_code
+        fields = request.args.get("fields")
+        include = request.args.get("include")
+        return respuesta_condicional(
+            version_evento(id, include), lambda: obtener_evento_service(id, fields, include)
+        )
+
+
+@evento_ns.route("/lote")
+class ObtenerEventosPorIds(Resource):
+    @evento_ns.doc(security="Bearer Auth")
+    @token_required
+    @evento_ns.expect(
+        evento_ns.parser()
+            .add_argument('ids', type=str, required=True, help='IDs de los eventos separados por comas')
+            .add_argument('fields', type=str, help='Campos a devolver separados por comas')
+    )
+    @evento_ns.response(200, "Eventos encontrados e IDs no encontrados")
+    @evento_ns.response(400, "Parámetros inválidos")
+    def get(self, current_user):
+        """Obtener varios eventos por ID en una sola petición"""
+        return obtener_eventos_por_ids_service(request.args.get("ids"), request.args.get("fields"))
 
 
 @evento_ns.route("/<int:id>/actualizar")
@@ -117,13 +162,17 @@ class EliminarEvento(Resource):
 @evento_ns.route("/buscar")
 class BuscarEventos(Resource):
     @evento_ns.doc(security="Bearer Auth")
-    @evento_ns.param("nombre", "Nombre del evento a buscar", type="string", required=False)
+    @evento_ns.param("nombre", "Texto a buscar en el nombre y la descripción", type="string", required=False)
+    @evento_ns.param("page", "Número de página", type="integer", required=False)
+    @evento_ns.param("per_page", "Resultados por página", type="integer", required=False)
     @token_required
     @evento_ns.response(200, "Eventos encontrados exitosamente")
     def get(self, current_user):
-        """Buscar eventos por nombre"""
+        """Buscar eventos por nombre o descripción, ordenados por relevancia"""
         nombre = request.args.get("nombre", "")
-        response, status_code = buscar_eventos_service(nombre)
+        page = request.args.get("page", 1, type=int)
+        per_page = request.args.get("per_page", type=int)
+        response, status_code = buscar_eventos_service(nombre, page, per_page)
         return response, status_code
 
 
@@ -138,6 +187,21 @@ class RegistrarseEvento(Resource):
         """Registrar un usuario en un evento"""
         response, status_code = registrarse_evento_service(current_user, id)
         return response, status_code
+
+@evento_ns.route("/<int:id>/registrar-lote")
+class RegistrarLoteEvento(Resource):
+    @evento_ns.doc(security="Bearer Auth")
+    @token_required
+    @evento_ns.expect(registro_lote_model)
+    @evento_ns.response(200, "Informe de registro por usuario")
+    @evento_ns.response(404, "Evento no encontrado")
+    @evento_ns.response(400, "Datos inválidos")
+    def post(self, current_user, id):
+        """Registrar una lista de usuarios en un evento"""
+        json_data = request.get_json()
+        response, status_code = registrar_lote_evento_service(id, json_data)
+        return response, status_code
+
 @evento_ns.route("/<int:id>/eliminar-registro")
 class EliminarRegistroEvento(Resource):
     @evento_ns.doc(security="Bearer Auth")
@@ -162,6 +226,18 @@ class ValidarCapacidadEvento(Resource):
         return response, status_code
 
 
+@evento_ns.route("/validar-capacidad")
+class ValidarCapacidadEventos(Resource):
+    @evento_ns.doc(security="Bearer Auth")
+    @token_required
+    @evento_ns.param("ids", "IDs de los eventos separados por comas", type="string", required=True)
+    @evento_ns.response(200, "Capacidades encontradas e IDs no encontrados")
+    @evento_ns.response(400, "Parámetros inválidos")
+    def get(self, current_user):
+        """Validar la capacidad de varios eventos en una sola petición"""
+        return validar_capacidad_eventos_service(request.args.get("ids"))
+
+
 @evento_ns.route("/mis-eventos")
 class MisEventos(Resource):
     @evento_ns.doc(security="Bearer Auth")
@@ -171,8 +247,30 @@ class MisEventos(Resource):
         evento_ns.parser()
             .add_argument('page', type=int, default=1, help='Número de página')
             .add_argument('per_page', type=int, default=10, help='Eventos por página')
+            .add_argument('cursor', type=str, help='Paginación por cursor: vacío para la primera página, luego next_cursor')
+            .add_argument('total', type=str, choices=('exacto', 'aproximado'), help='Incluir el total en modo cursor')
     )
     def get(self, current_user):
         """Obtener los eventos en los que el usuario está registrado"""
         response, status_code = obtener_mis_eventos_service(current_user)
-        return response, status_code
\ No newline at end of file
+        return response, status_code
+
+
+@evento_ns.route("/cache/estadisticas")
+class EstadisticasCache(Resource):
+    @evento_ns.doc(security="Bearer Auth")
+    @token_required
+    @evento_ns.response(200, "Aciertos y fallos de la caché de lectura en este proceso")
+    def get(self, current_user):
+        """Obtener los contadores de la caché de eventos y sesiones"""
+        return get_cache().estadisticas(), 200
+
+
+@evento_ns.route("/pool/estadisticas")
+class EstadisticasPool(Resource):
+    @evento_ns.doc(security="Bearer Auth")
+    @token_required
+    @evento_ns.response(200, "Conexiones en uso, saturación y esperas del pool de base de datos en este proceso")
+    def get(self, current_user):
+        """Obtener las métricas del pool de conexiones"""
+        return estadisticas_pool(db.engine.pool), 200
@@ -5,8 +5,16 @@ from app.services.sesiones import (
     actualizar_sesion_service,
     eliminar_sesion_service,
     validar_capacidad_sesion_service,
-    registrar_asistente_service,listar_sesiones_service, listar_asistencias_service,asignar_ponente_service,obtener_sesiones_evento_service
+    registrar_asistente_service,registrar_asistentes_lote_service,listar_sesiones_service, listar_asistencias_service,exportar_asistencias_service,asignar_ponente_service,obtener_sesiones_evento_service,
+    version_sesiones_evento,
+    obtener_sesiones_por_ids_service,
+    validar_capacidad_sesiones_service,
+    mis_sesiones_service,
+    importar_sesiones_service,
+    leer_sesiones_csv,
+    sesiones_disponibles_service
 )
+from app.services.etags import respuesta_condicional
 from app.core.auth import token_required
 
 sesion_ns = Namespace(
@@ -35,18 +43,27 @@ sesion_model = sesion_ns.model("Sesion", {
     "capacidad_maxima": fields.Integer(required=True, description="Capacidad máxima de la sesión"),
     "ponente": fields.String(required=True, description="Nombre del ponente de la sesión")
 })
+# Modelo de entrada para importar varias sesiones de un evento
+importacion_model = sesion_ns.model("ImportacionSesiones", {
+    "sesiones": fields.List(fields.Raw, required=True, description="Sesiones con los campos de Sesion, sin evento_id"),
+    "todo_o_nada": fields.Boolean(default=False, description="Cancelar la importación si alguna fila tiene errores")
+})
 asistencia_output_model = sesion_ns.model("AsistenciaOutput", {
     "usuario_id": fields.Integer,
     "email": fields.String,
     "sesion_id": fields.Integer,
     "nombre_sesion": fields.String,
-    "fecha_inicio": fields.String
+    "fecha_inicio": fields.DateTime
 })
 
 # Modelo de entrada para registrar un asistente
 asistente_model = sesion_ns.model("Asistente", {
     "usuario_id": fields.Integer(required=True, description="ID del usuario que se registrará en la sesión")
 })
+# Modelo de entrada para registrar varios asistentes a la vez
+asistentes_lote_model = sesion_ns.model("AsistentesLote", {
+    "usuario_ids": fields.List(fields.Integer, required=True, description="IDs de los usuarios a registrar en la sesión")
+})
 ponente_model = sesion_ns.model("PonenteInput", {
     "ponente": fields.String(required=True, description="Nombre del ponente")
 })
@@ -62,15 +79,46 @@ class CrearSesion(Resource):
         """Crear una nueva sesión"""
         json_data = request.get_json()
         return crear_sesion_service(json_data)
+# Ruta para importar varias sesiones de un evento
+@sesion_ns.route("/importar/<int:evento_id>")
+class ImportarSesiones(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.expect(importacion_model)
+    @sesion_ns.param("todo_o_nada", "Con cuerpo CSV: 'true' cancela la importación ante cualquier error", type="string")
+    @sesion_ns.response(201, "Sesiones importadas; errores por fila de las rechazadas")
+    @sesion_ns.response(400, "Ninguna sesión importada; errores por fila")
+    @sesion_ns.response(404, "Evento no encontrado")
+    def post(self, current_user, evento_id):
+        """Importar sesiones desde JSON o CSV (text/csv con cabecera)"""
+        if request.mimetype == "text/csv":
+            json_data = {
+                "sesiones": leer_sesiones_csv(request.get_data(as_text=True)),
+                "todo_o_nada": request.args.get("todo_o_nada", "false")
+            }
+        else:
+            json_data = request.get_json()
+        return importar_sesiones_service(evento_id, json_data)
+
 # Ruta para listar todas las sesiones
 @sesion_ns.route("/sesiones")
 class ListarSesiones(Resource):
     @sesion_ns.doc(security="Bearer Auth")
     @token_required
+    @sesion_ns.expect(
+        sesion_ns.parser()
+            .add_argument('evento_id', type=int, help='Filtrar por evento')
+            .add_argument('page', type=int, help='Número de página (opcional)')
+            .add_argument('per_page', type=int, help='Sesiones por página (opcional)')
+    )
     @sesion_ns.response(200, "Lista de sesiones obtenida correctamente")
     def get(self, current_user): 
         """ Lista todas las sesiones disponibles con su capacidad actual y ponente.  """      
-        return listar_sesiones_service()
+        return listar_sesiones_service(
+            evento_id=request.args.get('evento_id', type=int),
+            page=request.args.get('page', type=int),
+            per_page=request.args.get('per_page', type=int)
+        )
 
 # Ruta para actualizar una sesión
 @sesion_ns.route("/actualizar/<int:id>")
@@ -104,6 +152,53 @@ class ValidarCapacidadSesion(Resource):
         """Validar la capacidad de una sesión"""
         return validar_capacidad_sesion_service(id)
 
+# Rutas de consulta de varias sesiones por ID
+@sesion_ns.route("/lote")
+class ObtenerSesionesPorIds(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.param("ids", "IDs de las sesiones separados por comas", type="string", required=True)
+    @sesion_ns.response(200, "Sesiones encontradas e IDs no encontrados")
+    @sesion_ns.response(400, "Parámetros inválidos")
+    def get(self, current_user):
+        """Obtener varias sesiones con su capacidad actual"""
+        return obtener_sesiones_por_ids_service(request.args.get("ids"))
+
+@sesion_ns.route("/validar_capacidad")
+class ValidarCapacidadSesiones(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.param("ids", "IDs de las sesiones separados por comas", type="string", required=True)
+    @sesion_ns.response(200, "Capacidades encontradas e IDs no encontrados")
+    @sesion_ns.response(400, "Parámetros inválidos")
+    def get(self, current_user):
+        """Validar la capacidad de varias sesiones en una sola petición"""
+        return validar_capacidad_sesiones_service(request.args.get("ids"))
+
+# Ruta para la agenda del usuario autenticado
+@sesion_ns.route("/mis-sesiones")
+class MisSesiones(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.expect(
+        sesion_ns.parser()
+            .add_argument('desde', type=str, help='Solo sesiones que terminan después de esta fecha (ISO 8601)')
+            .add_argument('hasta', type=str, help='Solo sesiones que empiezan antes de esta fecha (ISO 8601)')
+            .add_argument('page', type=int, default=1, help='Número de página')
+            .add_argument('per_page', type=int, default=10, help='Sesiones por página')
+    )
+    @sesion_ns.response(200, "Sesiones del usuario en orden cronológico")
+    @sesion_ns.response(400, "Parámetros inválidos")
+    def get(self, current_user):
+        """Obtener las sesiones en las que el usuario está registrado, de todos sus eventos"""
+        return mis_sesiones_service(
+            current_user["id"],
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+            page=request.args.get('page', type=int),
+            per_page=request.args.get('per_page', type=int)
+        )
+
 # Ruta para registrar un asistente en una sesión
 @sesion_ns.route("/registrar_asistente/<int:sesion_id>")
 class RegistrarAsistente(Resource):
@@ -111,23 +206,58 @@ class RegistrarAsistente(Resource):
     @token_required
     @sesion_ns.expect(asistente_model)
     @sesion_ns.response(201, "Asistente registrado exitosamente")
+    @sesion_ns.response(400, "Sin cupo, ya registrado o con conflicto de horario (incluye sesiones_en_conflicto)")
     def post(self, current_user, sesion_id):
         """Registrar un asistente en una sesión"""
         json_data = request.get_json()
         return registrar_asistente_service(sesion_id, json_data)
+
+# Ruta para registrar varios asistentes en una sesión
+@sesion_ns.route("/registrar_asistentes/<int:sesion_id>")
+class RegistrarAsistentesLote(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.expect(asistentes_lote_model)
+    @sesion_ns.response(200, "Informe de registro por usuario")
+    @sesion_ns.response(404, "Sesión no encontrada")
+    def post(self, current_user, sesion_id):
+        """Registrar una lista de asistentes en una sesión"""
+        json_data = request.get_json()
+        return registrar_asistentes_lote_service(sesion_id, json_data)
     
 @sesion_ns.route("/asistencias")
 class ListarAsistencias(Resource):
     @sesion_ns.doc(security="Bearer Auth")
     @token_required
-    @sesion_ns.response(200, "Lista de asistencias obtenida correctamente")
-    @sesion_ns.marshal_with(sesion_ns.model("AsistenciaList", {
+    # Solo documenta la respuesta: el servicio ya devuelve estos campos y la
+    # representación JSON codifica las fechas, sin una pasada extra de marshal
+    @sesion_ns.response(200, "Lista de asistencias obtenida correctamente", sesion_ns.model("AsistenciaList", {
         "asistencias": fields.List(fields.Nested(asistencia_output_model))
     }))
     def get(self, current_user):
         """Listar todas las asistencias a sesiones"""
         return listar_asistencias_service()
     
+@sesion_ns.route("/asistencias/exportar")
+class ExportarAsistencias(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.expect(
+        sesion_ns.parser()
+            .add_argument('formato', type=str, default='ndjson', choices=('ndjson', 'csv'), help='Formato de salida')
+            .add_argument('sesion_id', type=int, help='Filtrar por sesión')
+            .add_argument('evento_id', type=int, help='Filtrar por evento')
+    )
+    @sesion_ns.response(200, "Asistencias exportadas en streaming")
+    @sesion_ns.response(400, "Formato no soportado")
+    def get(self, current_user):
+        """Exportar las asistencias a sesiones como NDJSON o CSV"""
+        return exportar_asistencias_service(
+            formato=request.args.get('formato', 'ndjson'),
+            sesion_id=request.args.get('sesion_id', type=int),
+            evento_id=request.args.get('evento_id', type=int)
+        )
+    
 @sesion_ns.route("/asignar_ponente/<int:sesion_id>")
 class AsignarPonente(Resource):
     @sesion_ns.doc(security="Bearer Auth")
@@ -146,7 +276,20 @@ class AsignarPonente(Resource):
 class SesionesEvento(Resource):
     @sesion_ns.doc(security="Bearer Auth")
     @sesion_ns.response(200, "Lista de sesiones obtenida exitosamente")
+    @sesion_ns.response(304, "Las sesiones no cambiaron desde el ETag enviado en If-None-Match")
     def get(self, evento_id):
         """Obtener las sesiones de un evento"""
-        response, status_code = obtener_sesiones_evento_service(evento_id)
-        return response, status_code
\ No newline at end of file
+        return respuesta_condicional(
+            version_sesiones_evento(evento_id), lambda: obtener_sesiones_evento_service(evento_id)
+        )
+
+@sesion_ns.route("/<int:evento_id>/disponibles")
+class SesionesDisponibles(Resource):
+    @sesion_ns.doc(security="Bearer Auth")
+    @token_required
+    @sesion_ns.response(200, "Sesiones en las que el usuario puede registrarse y sus huecos libres en el evento")
+    @sesion_ns.response(400, "El usuario no está registrado en el evento")
+    @sesion_ns.response(404, "Evento no encontrado")
+    def get(self, current_user, evento_id):
+        """Sesiones del evento con cupo, sin conflicto de horario y sin registrar, para el usuario autenticado"""
+        return sesiones_disponibles_service(current_user["id"], evento_id)
@@ -0,0 +1,60 @@
+from functools import lru_cache
+from marshmallow import fields, missing, utils
+
+# Serializadores compilados a partir de los esquemas de marshmallow: para cada esquema y
+# forma de fila (columnas del resultado) se genera una única función que construye el
+# dict de salida leyendo directamente de ``row._mapping``, sin instanciar el esquema ni
+# copiar la fila. La salida es idéntica a ``Schema().dump(dict(row._mapping))``.
+
+def _expresion(campo, atributo):
+    """Expresión Python que serializa ``m[atributo]`` como lo haría ``campo``, o None si no hay atajo."""
+    valor = f"m[{atributo!r}]"
+    tipo = type(campo)
+    if tipo is fields.Integer and not campo.as_string:
+        return f"(None if (v := {valor}) is None else int(v))"
+    if tipo is fields.String:
+        return f"(v if (v := {valor}) is None or type(v) is str else _texto(v))"
+    if tipo is fields.DateTime and (campo.format or campo.DEFAULT_FORMAT) in ("iso", "iso8601"):
+        return f"(None if (v := {valor}) is None else v.isoformat())"
+    if tipo in (fields.Boolean, fields.Raw):
+        return valor
+    return None
+
+@lru_cache(maxsize=None)
+def serializador(schema_cls, columnas):
+    """Función ``mapping -> dict`` equivalente a ``schema_cls().dump`` para filas con ``columnas``."""
+    schema = schema_cls()
+    if any(schema._hooks.get(hook) for hook in ("pre_dump", "post_dump")):
+        return lambda m: schema.dump(dict(m))
+
+    entorno = {"_texto": utils.ensure_text_type}
+    partes = []
+    for nombre, campo in schema.dump_fields.items():
+        clave = campo.data_key if campo.data_key is not None else nombre
+        atributo = campo.attribute or nombre
+        expresion = _expresion(campo, atributo) if atributo in columnas and "." not in atributo else None
+        if expresion is None:
+            if atributo not in columnas and campo.dump_default is missing:
+                continue  # marshmallow omite los campos sin valor
+            # Sin atajo: se delega en el propio campo
+            entorno[f"_campo_{len(partes)}"] = campo
+            expresion = f"_campo_{len(partes)}.serialize({nombre!r}, m)"
+        partes.append(f"{clave!r}: {expresion}")
+
+    codigo = "def _serializar(m):\n    return {" + ", ".join(partes) + "}\n"
+    exec(compile(codigo, f"<serializador {schema_cls.__name__}>", "exec"), entorno)
+    return entorno["_serializar"]
+
+def dump_filas(schema_cls, filas, campos=None):
+    """Equivalente rápido de ``schema_cls(many=True).dump([dict(f._mapping) for f in filas])``.
+
+    Con ``campos`` solo se serializan esas columnas aunque la fila traiga otras.
+    """
+    if not filas:
+        return []
+    serializar = serializador(schema_cls, tuple(campos if campos is not None else filas[0]._mapping.keys()))
+    return [serializar(fila._mapping) for fila in filas]
+
+def dump_fila(schema_cls, fila):
+    """Equivalente rápido de ``schema_cls().dump(dict(fila._mapping))``."""
+    return serializador(schema_cls, tuple(fila._mapping.keys()))(fila._mapping)
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, ValidationError, fields, post_load, validates
+from app.core.asientos import MENSAJE_ASIENTOS_NO_COMPARTIDOS, asientos_compartidos
+from app.schemas.fechas import a_utc
 
 class EventoSchema(Schema):
     id = fields.Int()
@@ -8,6 +10,7 @@ class EventoSchema(Schema):
     fecha_fin = fields.DateTime()
     capacidad_maxima = fields.Int()
     estado = fields.Str()
+    alta_demanda = fields.Bool()
 
 class EventoCreateSchema(Schema):
     nombre = fields.Str(required=True)
@@ -16,5 +19,17 @@ class EventoCreateSchema(Schema):
     fecha_fin = fields.DateTime(required=True)
     capacidad_maxima = fields.Int(required=True)
     estado = fields.Str(load_default="activo")
+    alta_demanda = fields.Bool(load_default=False)
 
+    @validates("alta_demanda")
+    def validar_alta_demanda(self, value, **kwargs):
+        if value and not asientos_compartidos():
+            raise ValidationError(MENSAJE_ASIENTOS_NO_COMPARTIDOS)
 
+    @post_load
+    def normalizar_fechas(self, data, **kwargs):
+        # Las fechas se guardan en UTC sin zona horaria
+        for campo in ("fecha_inicio", "fecha_fin"):
+            if campo in data:
+                data[campo] = a_utc(data[campo])
+        return data
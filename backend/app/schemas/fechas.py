@@ -0,0 +1,10 @@
+from datetime import timezone
+
+def a_utc(fecha):
+    """Fecha en UTC sin zona horaria, como se guardan en la base de datos.
+
+    Las fechas con zona se convierten a UTC; las que no la traen ya se consideran UTC.
+    """
+    if fecha is not None and fecha.tzinfo is not None:
+        return fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
@@ -0,0 +1,12 @@
+from marshmallow import Schema, fields, validate
+
+# Máximo de usuarios por solicitud de registro masivo
+MAX_USUARIOS_LOTE = 50000
+
+class RegistroLoteSchema(Schema):
+    usuario_ids = fields.List(
+        fields.Int(strict=True),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_USUARIOS_LOTE),
+        error_messages={"required": "La lista usuario_ids es obligatoria"}
+    )
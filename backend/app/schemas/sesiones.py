@@ -1,5 +1,5 @@
-from marshmallow import Schema, fields, post_load
-from datetime import datetime, timezone
+from marshmallow import Schema, fields, post_load, validate
+from app.schemas.fechas import a_utc
 
 class SesionSchema(Schema):
     id = fields.Int()
@@ -21,10 +21,21 @@ class SesionCreateSchema(Schema):
     ponente = fields.Str(required=True)
 
     @post_load
-    def make_timezone_aware(self, data, **kwargs):
-        # Asegurarse de que las fechas sean timezone-aware (UTC)
-        if "fecha_inicio" in data and data["fecha_inicio"].tzinfo is None:
-            data["fecha_inicio"] = data["fecha_inicio"].replace(tzinfo=timezone.utc)
-        if "fecha_fin" in data and data["fecha_fin"].tzinfo is None:
-            data["fecha_fin"] = data["fecha_fin"].replace(tzinfo=timezone.utc)
-        return data
\ No newline at end of file
+    def normalizar_fechas(self, data, **kwargs):
+        # Las fechas se guardan en UTC sin zona horaria
+        for campo in ("fecha_inicio", "fecha_fin"):
+            if campo in data:
+                data[campo] = a_utc(data[campo])
+        return data
+
+# Máximo de sesiones por importación (un INSERT multi-fila dentro del límite de parámetros de SQLite)
+MAX_SESIONES_IMPORTACION = 2000
+
+class ImportacionSesionesSchema(Schema):
+    sesiones = fields.List(
+        fields.Dict(),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_SESIONES_IMPORTACION),
+        error_messages={"required": "La lista sesiones es obligatoria"}
+    )
+    todo_o_nada = fields.Bool(load_default=False)
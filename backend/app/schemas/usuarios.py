@@ -14,4 +14,19 @@ class UsuarioCreateSchema(Schema):
         error_messages={
             "required": "La contraseña es obligatoria"
         }
-    )
\ No newline at end of file
+    )
+
+class RefreshTokenSchema(Schema):
+    refresh_token = fields.Str(required=True, error_messages={"required": "El token de refresco es obligatorio"})
+
+# Máximo de usuarios por petición HTTP de importación: sus hashes deben calcularse dentro del
+# tiempo de una petición. Las importaciones grandes se hacen con flask importar-usuarios.
+MAX_USUARIOS_IMPORTACION = 50
+
+class ImportacionUsuariosSchema(Schema):
+    usuarios = fields.List(
+        fields.Dict(),
+        required=True,
+        validate=validate.Length(min=1),
+        error_messages={"required": "La lista usuarios es obligatoria"}
+    )
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import Counter
+from sqlalchemy import select, insert, update
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.models.eventos import eventos_table
+from app.models.usuarios import usuarios_table
+from app.models.associations import asistentes_evento
+from app.core.asientos import MENSAJE_ASIENTOS_NO_COMPARTIDOS, asientos_compartidos, get_asientos_store
+from app.core.config import settings
+from app import db
+
+# Modo de alta demanda: los cupos se asignan desde el asignador (memoria o Redis) sin
+# tocar la base de datos, y los registros aceptados se vuelcan por lotes a
+# asistentes_evento. Tras el volcado la base de datos sigue siendo la fuente de verdad.
+
+def cargar_evento_alta_demanda(evento_id):
+    """Inicializa el asignador con el cupo libre y los usuarios ya registrados del evento.
+
+    Lanza RuntimeError si el asignador no es compartido por todos los workers.
+    """
+    if not asientos_compartidos():
+        raise RuntimeError(MENSAJE_ASIENTOS_NO_COMPARTIDOS)
+    stmt_evento = select(eventos_table.c.capacidad_maxima, eventos_table.c.asistentes_actuales).where(
+        eventos_table.c.id == evento_id
+    )
+    evento = db.session.execute(stmt_evento).fetchone()
+    if evento is None:
+        return
+    stmt_registrados = select(asistentes_evento.c.usuario_id).where(asistentes_evento.c.evento_id == evento_id)
+    registrados = db.session.execute(stmt_registrados).scalars().all()
+    get_asientos_store().cargar(evento_id, evento.capacidad_maxima - evento.asistentes_actuales, registrados)
+
+def registrarse_alta_demanda(usuario_id, evento_id):
+    """Reserva un cupo en el asignador. Devuelve None si el evento no está cargado en él."""
+    store = get_asientos_store()
+    resultado = store.reservar(evento_id, usuario_id)
+    if resultado is not None and store.pendientes() >= settings.ALTA_DEMANDA_LOTE:
+        volcar_tras_aceptar()
+    return resultado
+
+def volcar_tras_aceptar():
+    """Vuelca lo pendiente justo después de aceptar reservas, sin propagar los fallos.
+
+    Las reservas ya están aceptadas y no deben convertirse en un error: lo no volcado
+    sigue pendiente para el próximo volcado y el fallo queda en el log.
+    """
+    try:
+        volcar_registros()
+    except Exception:
+        current_app.logger.exception("Error al volcar los registros de alta demanda")
+
+def reiniciar_alta_demanda(evento_id):
+    """Vuelca lo pendiente y descarga el evento; se recargará desde la base de datos si sigue en alta demanda."""
+    store = get_asientos_store()
+    if store.cargado(evento_id):
+        volcar_registros()
+        store.descargar(evento_id)
+
+def volcar_registros():
+    """Inserta en asistentes_evento todos los registros pendientes, por lotes. Devuelve cuántos se volcaron."""
+    store = get_asientos_store()
+    total = 0
+    while True:
+        lote = store.extraer_pendientes(settings.ALTA_DEMANDA_LOTE)
+        if not lote:
+            return total
+        try:
+            _insertar_lote(lote)
+        except Exception:
+            db.session.rollback()
+            store.reencolar(lote)
+            raise
+        total += len(lote)
+
+def _insertar_lote(lote):
+    filas = [{"usuario_id": usuario_id, "evento_id": evento_id} for evento_id, usuario_id in lote]
+    try:
+        # executemany: SQLAlchemy lo envía como INSERT multi-fila
+        db.session.execute(insert(asistentes_evento), filas)
+    except IntegrityError:
+        # Algún registro ya existía (p. ej. llegó por la vía normal antes de cargar el evento)
+        # o su evento o su usuario fueron eliminados: descartarlos con tres consultas y reintentar
+        db.session.rollback()
+        eventos_lote = {evento_id for evento_id, _ in lote}
+        usuarios_lote = {usuario_id for _, usuario_id in lote}
+        stmt_existentes = select(asistentes_evento.c.evento_id, asistentes_evento.c.usuario_id).where(
+            asistentes_evento.c.evento_id.in_(eventos_lote) &
+            asistentes_evento.c.usuario_id.in_(usuarios_lote)
+        )
+        existentes = {tuple(row) for row in db.session.execute(stmt_existentes)}
+        stmt_eventos = select(eventos_table.c.id).where(eventos_table.c.id.in_(eventos_lote))
+        eventos_vigentes = set(db.session.execute(stmt_eventos).scalars())
+        stmt_usuarios = select(usuarios_table.c.id).where(usuarios_table.c.id.in_(usuarios_lote))
+        usuarios_vigentes = set(db.session.execute(stmt_usuarios).scalars())
+        descartados = [
+            (f["evento_id"], f["usuario_id"]) for f in filas
+            if f["evento_id"] not in eventos_vigentes or f["usuario_id"] not in usuarios_vigentes
+        ]
+        if descartados:
+            current_app.logger.warning("Registros de alta demanda descartados (evento o usuario eliminado): %s", descartados)
+        filas = [
+            f for f in filas
+            if f["evento_id"] in eventos_vigentes and f["usuario_id"] in usuarios_vigentes
+            and (f["evento_id"], f["usuario_id"]) not in existentes
+        ]
+        if filas:
+            db.session.execute(insert(asistentes_evento), filas)
+
+    insertados = Counter(fila["evento_id"] for fila in filas)
+    for evento_id, cantidad in insertados.items():
+        db.session.execute(
+            update(eventos_table)
+            .where(eventos_table.c.id == evento_id)
+            .values(asistentes_actuales=eventos_table.c.asistentes_actuales + cantidad)
+        )
+    db.session.commit()
+
+def iniciar_volcado_periodico(app):
+    """Lanza un hilo que vuelca los registros pendientes cada ``ALTA_DEMANDA_INTERVALO`` segundos."""
+    intervalo = settings.ALTA_DEMANDA_INTERVALO
+    if intervalo <= 0:
+        return None
+
+    def _bucle():
+        while True:
+            time.sleep(intervalo)
+            try:
+                if get_asientos_store().pendientes():
+                    with app.app_context():
+                        volcar_registros()
+            except Exception:
+                app.logger.exception("Error al volcar los registros de alta demanda")
+
+    hilo = threading.Thread(target=_bucle, name="volcado-alta-demanda", daemon=True)
+    hilo.start()
+    return hilo
@@ -1,32 +1,56 @@
-from sqlalchemy import select, insert
+import uuid
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from app.models.usuarios import usuarios_table, set_password, check_password
+from app.core.contrasenas import hashear_varios, necesita_rehash
+from app.core.auth import decode_jwt
+from app.services.revocaciones import revocar_token
+from app.services.lotes import en_bloques, ids_coincidentes
 from app.schemas.usuarios import UsuarioSchema
 from app import db
 import jwt
 from datetime import datetime, timezone, timedelta
 from app.core.config import settings
 from marshmallow import ValidationError
-from app.schemas.usuarios import UsuarioCreateSchema
+from app.schemas.usuarios import (
+    UsuarioCreateSchema, RefreshTokenSchema, ImportacionUsuariosSchema, MAX_USUARIOS_IMPORTACION
+)
 
 
+# Filas por INSERT en la importación de usuarios
+TAMANO_LOTE_USUARIOS = 1000
+# Usuarios por transacción en el comando flask importar-usuarios
+BLOQUE_IMPORTACION_USUARIOS = 5000
+
+def _insertar_usuarios(filas):
+    """INSERT ... ON CONFLICT (email) DO NOTHING RETURNING email: la restricción única resuelve
+    los duplicados, también los concurrentes, sin un SELECT previo.
+
+    El insert se elige por el dialecto de la conexión de la sesión (la de ``db.engine``), porque
+    ``on_conflict_do_nothing`` es propio de cada dialecto: Postgres en producción, SQLite en pruebas.
+    """
+    dialecto = sqlite if db.session.get_bind().dialect.name == "sqlite" else postgresql
+    stmt = (
+        dialecto.insert(usuarios_table)
+        .values(filas)
+        .on_conflict_do_nothing(index_elements=['email'])
+        .returning(usuarios_table.c.email)
+    )
+    return db.session.execute(stmt).scalars().all()
+
 def register_user_service(data):
     try:
-        # Validar los datos primero
+        # Única validación de la petición (la ruta pasa el cuerpo sin validar)
         validated_data = UsuarioCreateSchema().load(data)
         
         email = validated_data['email']
         password = validated_data['password']
 
-        # Verificar si el usuario ya existe
-        stmt = select(usuarios_table).where(usuarios_table.c.email == email)
-        existing_user = db.session.execute(stmt).fetchone()
-        if existing_user:
-            return {"message": "Email already exists"}, 400
-
-        # Crear un nuevo usuario
+        # Crear el usuario; si el email ya existe no se inserta nada
         hashed_password = set_password(password)
-        stmt = insert(usuarios_table).values(email=email, password_hash=hashed_password)
-        db.session.execute(stmt)
+        if not _insertar_usuarios([{"email": email, "password_hash": hashed_password}]):
+            db.session.rollback()
+            return {"message": "Email already exists"}, 400
         db.session.commit()
 
         return {"message": "User created successfully"}, 201
@@ -36,6 +60,56 @@ def register_user_service(data):
     except Exception as e:
         return {"message": f"Error creating user: {str(e)}"}, 500
 
+def importar_usuarios_service(json_data, max_usuarios=MAX_USUARIOS_IMPORTACION):
+    """Crea varios usuarios con los hashes calculados en paralelo e INSERT de ``TAMANO_LOTE_USUARIOS`` filas.
+
+    Cada fila se valida con UsuarioCreateSchema. Los emails repetidos en la importación y los
+    ya registrados se devuelven como errores por fila sin calcular su hash, así que repetir una
+    importación interrumpida solo hace el trabajo pendiente. ``max_usuarios`` limita las filas
+    de una petición HTTP; el comando de importación lo desactiva con None.
+    """
+    try:
+        data = ImportacionUsuariosSchema().load(json_data or {})
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+    if max_usuarios is not None and len(data["usuarios"]) > max_usuarios:
+        return {"errors": {"usuarios": [
+            f"Como máximo {max_usuarios} usuarios por petición; use flask importar-usuarios para más"
+        ]}}, 400
+
+    schema = UsuarioCreateSchema()
+    errores = []
+    validos = {}  # email -> (fila, contraseña)
+    for fila, valores in enumerate(data["usuarios"]):
+        try:
+            usuario = schema.load(valores)
+        except ValidationError as err:
+            errores.append({"fila": fila, "errors": err.messages})
+            continue
+        if usuario["email"] in validos:
+            errores.append({"fila": fila, "message": "Email repetido en la importación"})
+        else:
+            validos[usuario["email"]] = (fila, usuario["password"])
+
+    for email in ids_coincidentes(select(usuarios_table.c.email), usuarios_table.c.email, list(validos)):
+        errores.append({"fila": validos.pop(email)[0], "message": "Email already exists"})
+
+    emails = list(validos)
+    hashes = hashear_varios([validos[email][1] for email in emails])
+    creados = set()
+    for bloque in en_bloques(list(zip(emails, hashes)), TAMANO_LOTE_USUARIOS):
+        creados.update(_insertar_usuarios([{"email": email, "password_hash": h} for email, h in bloque]))
+    db.session.commit()
+
+    # Registrados por otra petición entre la comprobación y el INSERT
+    for email in validos.keys() - creados:
+        errores.append({"fila": validos[email][0], "message": "Email already exists"})
+    errores.sort(key=lambda error: error["fila"])
+
+    if not creados:
+        return {"message": "Ningún usuario es válido", "creados": 0, "errores": errores}, 400
+    return {"message": "Usuarios importados", "creados": len(creados), "errores": errores}, 201
+
 def login_user_service(data):
     email = data['email']
     password = data['password']
@@ -46,14 +120,75 @@ def login_user_service(data):
     if not user or not check_password(user.password_hash, password):
         return {"message": "Invalid credentials"}, 401
 
-    # Crear un JWT token
-    token = jwt.encode({
-        'sub': str(user.id),
-        'exp': datetime.now(timezone.utc) + timedelta(hours=10)
-    }, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
+    # Actualizar el hash si se creó con otros parámetros; la condición evita pisar un cambio concurrente
+    if necesita_rehash(user.password_hash):
+        stmt_rehash = (
+            update(usuarios_table)
+            .where((usuarios_table.c.id == user.id) & (usuarios_table.c.password_hash == user.password_hash))
+            .values(password_hash=set_password(password))
+        )
+        db.session.execute(stmt_rehash)
+        db.session.commit()
 
     # Serializar los datos del usuario
     usuario_schema = UsuarioSchema()
     usuario_data = usuario_schema.dump(dict(user._mapping))
 
-    return {"token": token, "user": usuario_data}, 200
\ No newline at end of file
+    return {**emitir_tokens(user.id), "user": usuario_data}, 200
+
+def emitir_tokens(usuario_id):
+    """Token de acceso de corta duración y token de refresco, cada uno con su jti para poder revocarlo."""
+    ahora = datetime.now(timezone.utc)
+    token = jwt.encode({
+        'sub': str(usuario_id),
+        'exp': ahora + timedelta(minutes=settings.ACCESS_TOKEN_MINUTOS),
+        'jti': str(uuid.uuid4()),
+        'tipo': 'access'
+    }, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
+    refresh_token = jwt.encode({
+        'sub': str(usuario_id),
+        'exp': ahora + timedelta(days=settings.REFRESH_TOKEN_DIAS),
+        'jti': str(uuid.uuid4()),
+        'tipo': 'refresh'
+    }, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
+    return {"token": token, "refresh_token": refresh_token}
+
+def _claims_refresh(refresh_token):
+    """Claims de un token de refresco válido; ValueError si no lo es."""
+    claims = decode_jwt(refresh_token)
+    if claims.get('tipo') != 'refresh' or not claims.get('jti') or not claims.get('sub'):
+        raise ValueError("Invalid refresh token")
+    return claims
+
+def refrescar_tokens_service(data):
+    """Cambia un token de refresco por un par nuevo; el usado queda revocado (rotación)."""
+    try:
+        refresh_token = RefreshTokenSchema().load(data)['refresh_token']
+        claims = _claims_refresh(refresh_token)
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+    except ValueError as e:
+        return {"message": str(e)}, 401
+
+    # Revocar antes de emitir: si dos peticiones usan el mismo token solo una obtiene tokens nuevos
+    if not revocar_token(claims):
+        return {"message": "Refresh token has been revoked"}, 401
+    return emitir_tokens(claims['sub']), 200
+
+def cerrar_sesion_service(claims, data):
+    """Revoca el token de acceso de la petición y, si se envía, el token de refresco del mismo usuario."""
+    try:
+        refresh_token = RefreshTokenSchema(partial=True).load(data or {}).get('refresh_token')
+        claims_refresh = _claims_refresh(refresh_token) if refresh_token else None
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+    except ValueError as e:
+        return {"message": str(e)}, 400
+    if claims_refresh is not None and claims_refresh['sub'] != claims['sub']:
+        return {"message": "Invalid refresh token"}, 400
+
+    if claims.get('jti'):
+        revocar_token(claims)
+    if claims_refresh is not None:
+        revocar_token(claims_refresh)
+    return {"message": "Logged out successfully"}, 200
\ No newline at end of file
@@ -0,0 +1,48 @@
+from sqlalchemy import select, func, case, literal_column
+from app.models.eventos import eventos_table
+from app import db
+
+# Configuración de texto de Postgres usada por el índice GIN de búsqueda
+IDIOMA_BUSQUEDA = "spanish"
+
+# Debe coincidir literalmente con la expresión del índice ix_eventos_busqueda_tsv para que Postgres lo use
+TSVECTOR_EVENTOS = (
+    f"to_tsvector('{IDIOMA_BUSQUEDA}', "
+    "coalesce(eventos.nombre, '') || ' ' || coalesce(eventos.descripcion, ''))"
+)
+
+def escapar_like(termino):
+    """Escapa los comodines de LIKE (con ``\\`` como carácter de escape)."""
+    return termino.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def consulta_busqueda_eventos(termino):
+    """SELECT de eventos que coinciden con ``termino`` ordenado por relevancia.
+
+    En Postgres combina la búsqueda de texto completo (índice GIN sobre tsvector) con
+    ILIKE acelerado por índices de trigramas, y ordena por ``ts_rank`` + ``similarity``.
+    En otros motores (SQLite en pruebas y desarrollo) usa LIKE con una puntuación simple.
+    """
+    termino = (termino or "").strip()
+    stmt = select(eventos_table)
+    if not termino:
+        return stmt.order_by(eventos_table.c.fecha_inicio, eventos_table.c.id)
+
+    patron = f"%{escapar_like(termino)}%"
+    en_nombre = eventos_table.c.nombre.ilike(patron, escape="\\")
+    en_descripcion = eventos_table.c.descripcion.ilike(patron, escape="\\")
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        documento = literal_column(TSVECTOR_EVENTOS)
+        consulta = func.websearch_to_tsquery(literal_column(f"'{IDIOMA_BUSQUEDA}'"), termino)
+        relevancia = func.ts_rank(documento, consulta) + func.similarity(eventos_table.c.nombre, termino)
+        condicion = documento.op("@@")(consulta) | en_nombre | en_descripcion
+    else:
+        relevancia = case(
+            (func.lower(eventos_table.c.nombre) == termino.lower(), 3),
+            (eventos_table.c.nombre.ilike(f"{escapar_like(termino)}%", escape="\\"), 2),
+            (en_nombre, 1),
+            else_=0.5
+        )
+        condicion = en_nombre | en_descripcion
+
+    return stmt.where(condicion).order_by(relevancia.desc(), eventos_table.c.id)
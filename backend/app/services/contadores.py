@@ -0,0 +1,51 @@
+from sqlalchemy import select, update, func
+from app.models.eventos import eventos_table
+from app.models.sesiones import sesiones_table
+from app.models.associations import asistentes_evento, asistentes_sesion
+from app import db
+
+# (tabla con contador, tabla de asistentes, columna que referencia a la tabla)
+CONTADORES = {
+    "eventos": (eventos_table, asistentes_evento, asistentes_evento.c.evento_id),
+    "sesiones": (sesiones_table, asistentes_sesion, asistentes_sesion.c.sesion_id),
+}
+
+def _conteo_real(tabla, asistentes, columna_fk):
+    return (
+        select(func.count())
+        .select_from(asistentes)
+        .where(columna_fk == tabla.c.id)
+        .scalar_subquery()
+    )
+
+def buscar_desviaciones(nombre):
+    """Devuelve las filas cuyo ``asistentes_actuales`` no coincide con los registros reales."""
+    tabla, asistentes, columna_fk = CONTADORES[nombre]
+    conteo = _conteo_real(tabla, asistentes, columna_fk)
+    stmt = (
+        select(tabla.c.id, tabla.c.asistentes_actuales, conteo.label("asistentes_reales"))
+        .where(tabla.c.asistentes_actuales != conteo)
+        .order_by(tabla.c.id)
+    )
+    return [
+        {"id": row.id, "asistentes_actuales": row.asistentes_actuales, "asistentes_reales": row.asistentes_reales}
+        for row in db.session.execute(stmt).fetchall()
+    ]
+
+def reconciliar_contadores_service(reparar=False):
+    """Detecta (y opcionalmente corrige) contadores desviados en eventos y sesiones."""
+    resultado = {}
+    for nombre, (tabla, asistentes, columna_fk) in CONTADORES.items():
+        desviaciones = buscar_desviaciones(nombre)
+        if reparar and desviaciones:
+            conteo = _conteo_real(tabla, asistentes, columna_fk)
+            stmt = (
+                update(tabla)
+                .where(tabla.c.id.in_([d["id"] for d in desviaciones]))
+                .values(asistentes_actuales=conteo)
+            )
+            db.session.execute(stmt)
+        resultado[nombre] = desviaciones
+    if reparar:
+        db.session.commit()
+    return resultado
@@ -0,0 +1,44 @@
+import hashlib
+from flask import request
+from werkzeug.http import quote_etag
+from app.core.representaciones import codificar_json
+
+def calcular_etag(version):
+    """Huella de la versión de los datos junto con la ruta y los parámetros de la petición."""
+    return hashlib.sha1(repr((request.full_path, version)).encode()).hexdigest()
+
+def respuesta_condicional(version, servicio):
+    """GET condicional: 304 si el ``If-None-Match`` del cliente coincide con ``version``.
+
+    ``version`` es un valor barato de obtener que cambia con los datos (la columna
+    ``version`` de las filas); ``servicio`` solo se ejecuta si hay que enviar la respuesta.
+    Con ``version`` None se responde sin ETag. La versión se lee antes que los datos: si
+    cambian entre ambos pasos el cliente recibe datos más nuevos que su ETag y la siguiente
+    petición obtiene un 200, nunca un 304 obsoleto.
+    """
+    if version is None:
+        return servicio()
+    etag = calcular_etag(version)
+    cabeceras = {"ETag": quote_etag(etag, weak=True)}
+    if request.if_none_match.contains_weak(etag):
+        return None, 304, cabeceras
+    respuesta, status_code = servicio()
+    if status_code != 200:
+        return respuesta, status_code
+    return respuesta, status_code, cabeceras
+
+def respuesta_condicional_por_contenido(servicio):
+    """GET condicional con el ETag calculado a partir del JSON de la respuesta.
+
+    Para respuestas que se sirven de la caché de lectura, donde leer una versión en la base de
+    datos costaría más que obtener la respuesta. El servicio se ejecuta siempre; el 304 ahorra
+    la transferencia, y el ETag queda tan al día como la respuesta que se enviaría.
+    """
+    respuesta, status_code = servicio()
+    if status_code != 200:
+        return respuesta, status_code
+    etag = hashlib.sha1(codificar_json(respuesta)).hexdigest()
+    cabeceras = {"ETag": quote_etag(etag, weak=True)}
+    if request.if_none_match.contains_weak(etag):
+        return None, 304, cabeceras
+    return respuesta, status_code, cabeceras
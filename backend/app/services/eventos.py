@@ -1,38 +1,193 @@
-from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy import select, insert, update, delete, func, text
+from sqlalchemy.exc import IntegrityError
 from app.models.eventos import eventos_table
 from app.models.associations import asistentes_evento
 from app.models.sesiones import sesiones_table
+from app.models.usuarios import usuarios_table
 from app import db
 from app.schemas.eventos import EventoSchema, EventoCreateSchema
+from app.schemas.registros import RegistroLoteSchema
+from app.schemas.compilados import dump_fila, dump_filas
+from app.services.lotes import ids_coincidentes, ids_unicos, parsear_ids
+from app.services.busqueda import consulta_busqueda_eventos
+from app.services.sesiones import (
+    inscritos_en_sesiones,
+    invalidar_agendas,
+    sesiones_por_evento,
+    version_sesiones_eventos,
+)
+from app.services.alta_demanda import (
+    cargar_evento_alta_demanda,
+    registrarse_alta_demanda,
+    reiniciar_alta_demanda,
+    volcar_tras_aceptar,
+    volcar_registros,
+)
+from app.core.asientos import get_asientos_store
+from app.core.cache import cacheado, invalidar_cache
+from app.core.config import settings
 from marshmallow import ValidationError
 from flask import request
 from sqlalchemy.sql import func
+from datetime import datetime
+from urllib.parse import urlencode
+import base64
+import json
 # Utils
-def serialize_result_set(result_set, schema):
-    return schema.dump([dict(row._mapping) for row in result_set])
-
-def get_evento_or_404(id):
-    stmt = select(eventos_table).where(eventos_table.c.id == id)
+def get_evento_or_404(id, columnas=None):
+    stmt = select(*(columnas or [eventos_table])).where(eventos_table.c.id == id)
     evento = db.session.execute(stmt).fetchone()
     if not evento:
         raise ValueError("Evento no encontrado")
     return evento
 
+def limitar_per_page(per_page):
+    """Acota el tamaño de página solicitado por el cliente a ``settings.MAX_PER_PAGE``."""
+    return min(max(per_page, 1), settings.MAX_PER_PAGE)
+
+class CursorInvalido(ValueError):
+    pass
+
+class ParametroInvalido(ValueError):
+    pass
+
+# Campos que admite ?fields= (en el orden de salida de EventoSchema) y relaciones de ?include=
+CAMPOS_EVENTO = tuple(EventoSchema().dump_fields)
+RELACIONES_EVENTO = ("sesiones",)
+
+def parsear_fields(valor):
+    """Campos pedidos en ``?fields=a,b``; None si se piden todos."""
+    pedidos = {campo.strip() for campo in (valor or "").split(",") if campo.strip()}
+    if not pedidos:
+        return None
+    invalidos = pedidos.difference(CAMPOS_EVENTO)
+    if invalidos:
+        raise ParametroInvalido(f"Campos no válidos: {', '.join(sorted(invalidos))}")
+    return tuple(campo for campo in CAMPOS_EVENTO if campo in pedidos)
+
+def parsear_include(valor):
+    """True si ``?include=`` pide las sesiones de cada evento."""
+    pedidas = {relacion.strip() for relacion in (valor or "").split(",") if relacion.strip()}
+    invalidas = pedidas.difference(RELACIONES_EVENTO)
+    if invalidas:
+        raise ParametroInvalido(f"Relaciones no válidas: {', '.join(sorted(invalidas))}")
+    return "sesiones" in pedidas
+
+def columnas_evento(campos, *necesarias):
+    """Columnas a seleccionar: los campos pedidos más las que se necesitan internamente."""
+    if campos is None:
+        return [eventos_table]
+    return [eventos_table.c[nombre] for nombre in dict.fromkeys(campos + necesarias)]
+
+def representar_eventos(filas, campos=None, incluir_sesiones=False):
+    """Serializa los eventos con los campos pedidos y, si se piden, sus sesiones (una consulta IN)."""
+    eventos = dump_filas(EventoSchema, filas, campos)
+    if incluir_sesiones:
+        sesiones = sesiones_por_evento([fila.id for fila in filas])
+        for evento, fila in zip(eventos, filas):
+            evento["sesiones"] = sesiones[fila.id]
+    return eventos
+
+def codificar_cursor(fecha_inicio, id):
+    """Cursor opaco con la clave de ordenación (fecha_inicio, id) del último evento de la página."""
+    crudo = json.dumps([fecha_inicio.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+def decodificar_cursor(cursor):
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fecha_inicio, id = json.loads(crudo)
+        return datetime.fromisoformat(fecha_inicio), int(id)
+    except (ValueError, TypeError):
+        raise CursorInvalido("Cursor inválido")
+
+def total_aproximado(count_stmt, filtrado):
+    """Estimación de filas de ``eventos`` desde pg_class en Postgres; conteo exacto en otro caso."""
+    if not filtrado and db.session.get_bind().dialect.name == "postgresql":
+        estimado = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'eventos'")
+        ).scalar()
+        if estimado is not None and estimado >= 0:
+            return int(estimado)
+    return int(db.session.execute(count_stmt).scalar() or 0)
+
+def paginar_por_cursor(stmt, count_stmt, per_page, filtrado=False, campos=None, incluir_sesiones=False):
+    """Paginación por clave (keyset) sobre (fecha_inicio, id), sin OFFSET.
+
+    Lee ``cursor`` y ``total`` (``exacto``/``aproximado``, opcional) de la query string.
+    """
+    cursor = request.args.get('cursor', '', type=str)
+    stmt = stmt.order_by(eventos_table.c.fecha_inicio, eventos_table.c.id)
+    if cursor:
+        fecha_inicio, ultimo_id = decodificar_cursor(cursor)
+        stmt = stmt.where(
+            (eventos_table.c.fecha_inicio > fecha_inicio) |
+            ((eventos_table.c.fecha_inicio == fecha_inicio) & (eventos_table.c.id > ultimo_id))
+        )
+
+    # Se pide una fila extra para saber si hay página siguiente
+    eventos = db.session.execute(stmt.limit(per_page + 1)).fetchall()
+    next_cursor = None
+    if len(eventos) > per_page:
+        eventos = eventos[:per_page]
+        next_cursor = codificar_cursor(eventos[-1].fecha_inicio, eventos[-1].id)
+
+    respuesta = {
+        "eventos": representar_eventos(eventos, campos, incluir_sesiones),
+        "per_page": per_page,
+        "next_cursor": next_cursor
+    }
+    modo_total = request.args.get('total', '', type=str)
+    if modo_total == "exacto":
+        respuesta["total"] = int(db.session.execute(count_stmt).scalar() or 0)
+    elif modo_total == "aproximado":
+        respuesta["total"] = total_aproximado(count_stmt, filtrado)
+    return respuesta
+
+def consultas_listado_eventos(nombre, columnas=None):
+    """SELECT y COUNT del listado de eventos con el filtro opcional por nombre."""
+    stmt = select(*(columnas or [eventos_table]))
+    count_stmt = select(func.count()).select_from(eventos_table)
+    if nombre:
+        stmt = stmt.where(eventos_table.c.nombre.ilike(f"%{nombre}%"))
+        count_stmt = count_stmt.where(eventos_table.c.nombre.ilike(f"%{nombre}%"))
+    return stmt, count_stmt
+
+def version_evento(id, include=None):
+    """Versión de la fila del evento (y de sus sesiones si se incluyen), o None si no existe."""
+    version = db.session.execute(select(eventos_table.c.version).where(eventos_table.c.id == id)).scalar()
+    if version is not None and "sesiones" in (include or ""):
+        return version, version_sesiones_eventos([id])
+    return version
+
 def obtener_eventos_service(current_user):
+    # El listado no depende del usuario: se cachea por los parámetros de la consulta
+    clave = "listado:" + urlencode(sorted(request.args.items(multi=True)))
+    # Con include=sesiones la respuesta también depende de las sesiones (igual que el detalle)
+    incluye_sesiones = "sesiones" in request.args.get('include', '', type=str)
+    return cacheado(["eventos"] + (["sesiones"] if incluye_sesiones else []), clave, _obtener_eventos)
+
+def _obtener_eventos():
     # Obtener parámetros de paginación y filtro
     nombre = request.args.get('nombre', '', type=str)
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = limitar_per_page(request.args.get('per_page', 10, type=int))
 
     try:
-        # Consulta base
-        stmt = select(eventos_table)
-        count_stmt = select(func.count()).select_from(eventos_table)
+        # Solo se leen las columnas pedidas en ?fields= (más las necesarias para cursor e include)
+        campos = parsear_fields(request.args.get('fields', '', type=str))
+        incluir_sesiones = parsear_include(request.args.get('include', '', type=str))
+        cursor = 'cursor' in request.args
+        necesarias = ("fecha_inicio", "id") if cursor else ("id",) if incluir_sesiones else ()
+
+        # Consulta base con el filtro por nombre si existe
+        stmt, count_stmt = consultas_listado_eventos(nombre, columnas_evento(campos, *necesarias))
 
-        # Aplicar filtro por nombre si existe
-        if nombre:
-            stmt = stmt.where(eventos_table.c.nombre.ilike(f"%{nombre}%"))
-            count_stmt = count_stmt.where(eventos_table.c.nombre.ilike(f"%{nombre}%"))
+        # Paginación por cursor: sin OFFSET y con total opcional
+        if cursor:
+            return paginar_por_cursor(
+                stmt, count_stmt, per_page, filtrado=bool(nombre), campos=campos, incluir_sesiones=incluir_sesiones
+            ), 200
 
         # Contar total de eventos
         total = db.session.execute(count_stmt).scalar()
@@ -47,12 +202,14 @@ def obtener_eventos_service(current_user):
         total_pages = (total + per_page - 1) // per_page if total > 0 else 1
 
         return {
-            "eventos": serialize_result_set(eventos, EventoSchema(many=True)),
+            "eventos": representar_eventos(eventos, campos, incluir_sesiones),
             "total": total,
             "page": page,
             "per_page": per_page,
             "total_pages": total_pages
         }, 200
+    except (CursorInvalido, ParametroInvalido) as pi:
+        return {"message": str(pi)}, 400
     except Exception as e:
         return {"message": f"Error al obtener eventos: {str(e)}"}, 500
 def crear_evento_service(json_data):
@@ -61,21 +218,48 @@ def crear_evento_service(json_data):
         stmt = insert(eventos_table).values(**data).returning(eventos_table)
         evento = db.session.execute(stmt).fetchone()
         db.session.commit()
-        return EventoSchema().dump(dict(evento._mapping)), 201
+        invalidar_cache("eventos")
+        return dump_fila(EventoSchema, evento), 201
     except ValidationError as err:
         return {"errors": err.messages}, 400
     except Exception as e:
         return {"message": f"Error al crear el evento: {str(e)}"}, 500
 
-def obtener_evento_service(id):
+def obtener_evento_service(id, fields=None, include=None):
     try:
-        evento = get_evento_or_404(id)
-        return EventoSchema().dump(dict(evento._mapping)), 200
+        campos = parsear_fields(fields)
+        incluir_sesiones = parsear_include(include)
+    except ParametroInvalido as pi:
+        return {"message": str(pi)}, 400
+    grupos = [f"evento:{id}"] + (["sesiones"] if incluir_sesiones else [])
+    return cacheado(
+        grupos, f"detalle:{campos}:{incluir_sesiones}", lambda: _obtener_evento(id, campos, incluir_sesiones)
+    )
+
+def _obtener_evento(id, campos=None, incluir_sesiones=False):
+    try:
+        necesarias = ("id",) if incluir_sesiones else ()
+        evento = get_evento_or_404(id, columnas_evento(campos, *necesarias))
+        return representar_eventos([evento], campos, incluir_sesiones)[0], 200
     except ValueError as ve:
         return {"message": str(ve)}, 404
     except Exception as e:
         return {"message": f"Error al obtener el evento: {str(e)}"}, 500
 
+def obtener_eventos_por_ids_service(ids, fields=None):
+    """Detalle de varios eventos con un WHERE id IN; los ids inexistentes se informan aparte."""
+    try:
+        evento_ids = parsear_ids(ids)
+        campos = parsear_fields(fields)
+    except ValueError as ve:
+        return {"message": str(ve)}, 400
+    stmt = select(*columnas_evento(campos, "id")).where(eventos_table.c.id.in_(evento_ids))
+    encontrados = {fila.id: fila for fila in db.session.execute(stmt)}
+    return {
+        "eventos": representar_eventos([encontrados[id] for id in evento_ids if id in encontrados], campos),
+        "no_encontrados": [id for id in evento_ids if id not in encontrados]
+    }, 200
+
 def actualizar_evento_service(id, json_data):
     try:
         data = EventoCreateSchema().load(json_data)
@@ -84,6 +268,9 @@ def actualizar_evento_service(id, json_data):
         if result.rowcount == 0:
             return {"message": "Evento no encontrado"}, 404
         db.session.commit()
+        invalidar_cache("eventos", f"evento:{id}")
+        # La capacidad o el modo pudieron cambiar: el asignador se recarga bajo demanda
+        reiniciar_alta_demanda(id)
         return {"message": "Evento actualizado exitosamente"}, 200
     except ValidationError as err:
         return {"errors": err.messages}, 400
@@ -92,72 +279,249 @@ def actualizar_evento_service(id, json_data):
 
 def eliminar_evento_service(id):
     try:
+        # Volcar antes los registros pendientes de alta demanda del evento
+        reiniciar_alta_demanda(id)
         with db.session.begin():
             db.session.execute(delete(asistentes_evento).where(asistentes_evento.c.evento_id == id))
+            inscritos = inscritos_en_sesiones(sesiones_table.c.evento_id == id)
             db.session.execute(delete(sesiones_table).where(sesiones_table.c.evento_id == id))
             result = db.session.execute(delete(eventos_table).where(eventos_table.c.id == id))
             if result.rowcount == 0:
                 raise ValueError("Evento no encontrado")
+        invalidar_cache("eventos", f"evento:{id}", "sesiones")
+        invalidar_agendas(inscritos)
         return {"message": "Evento eliminado exitosamente"}, 204
     except ValueError as ve:
         return {"message": str(ve)}, 404
     except Exception as e:
         return {"message": f"Error al eliminar el evento: {str(e)}"}, 500
 
-def buscar_eventos_service(nombre):
-    stmt = select(eventos_table).where(eventos_table.c.nombre.ilike(f"%{nombre}%"))
+def buscar_eventos_service(nombre, page=1, per_page=None):
+    # Resultados ordenados por relevancia; por defecto se devuelve la página más grande permitida
+    page = max(page or 1, 1)
+    per_page = limitar_per_page(per_page or settings.MAX_PER_PAGE)
+    stmt = consulta_busqueda_eventos(nombre).offset((page - 1) * per_page).limit(per_page)
     eventos = db.session.execute(stmt).fetchall()
-    return serialize_result_set(eventos, EventoSchema(many=True)), 200
+    return dump_filas(EventoSchema, eventos), 200
 
-def registrarse_evento_service(current_user, id):
-    try:
-        evento = get_evento_or_404(id)
+# Resultados posibles de un intento de registro a un evento
+REGISTRO_OK = "ok"
+REGISTRO_NO_ENCONTRADO = "no_encontrado"
+REGISTRO_DUPLICADO = "duplicado"
+REGISTRO_LLENO = "lleno"
+REGISTRO_ALTA_DEMANDA = "alta_demanda"
 
-        stmt_verificar = select(asistentes_evento).where(
-            (asistentes_evento.c.usuario_id == current_user['id']) &
-            (asistentes_evento.c.evento_id == id)
-        )
-        registro_existente = db.session.execute(stmt_verificar).fetchone()
-        if registro_existente:
-            return {"message": "Ya te has registrado a este evento"}, 400
+def registrar_usuario_evento(usuario_id, evento_id):
+    """Registra al usuario en el evento validando la capacidad de forma atómica.
 
-        stmt_asistentes = select(func.count()).select_from(asistentes_evento).where(
-            asistentes_evento.c.evento_id == id
-        )
-        asistentes_count = db.session.execute(stmt_asistentes).scalar()
-        if asistentes_count >= evento.capacidad_maxima:
-            return {"message": "El evento ha alcanzado su capacidad máxima"}, 400
+    Incrementa ``asistentes_actuales`` con un UPDATE condicionado a la capacidad
+    (que bloquea la fila del evento) y luego inserta el registro, de modo que dos
+    registros concurrentes nunca superan ``capacidad_maxima``. La clave primaria de
+    ``asistentes_evento`` detecta los registros duplicados. No hace commit: ante
+    cualquier resultado distinto de ``REGISTRO_OK`` el llamador debe hacer rollback.
 
-        stmt_registro = insert(asistentes_evento).values(
-            usuario_id=current_user['id'], evento_id=id
+    Los eventos en modo de alta demanda no se registran por esta vía y devuelven
+    ``REGISTRO_ALTA_DEMANDA``.
+    """
+    stmt_contador = (
+        update(eventos_table)
+        .where(
+            (eventos_table.c.id == evento_id) &
+            (eventos_table.c.asistentes_actuales < eventos_table.c.capacidad_maxima) &
+            (eventos_table.c.alta_demanda == False)  # noqa: E712
+        )
+        .values(asistentes_actuales=eventos_table.c.asistentes_actuales + 1)
+    )
+    if db.session.execute(stmt_contador).rowcount == 0:
+        # Solo en el camino de error: distinguir evento inexistente, alta demanda, duplicado o lleno
+        registrado = (
+            select(asistentes_evento.c.usuario_id)
+            .where(
+                (asistentes_evento.c.usuario_id == usuario_id) &
+                (asistentes_evento.c.evento_id == evento_id)
+            )
+            .exists()
+        )
+        stmt_estado = select(eventos_table.c.id, registrado, eventos_table.c.alta_demanda).where(
+            eventos_table.c.id == evento_id
         )
+        evento = db.session.execute(stmt_estado).fetchone()
+        if evento is None:
+            return REGISTRO_NO_ENCONTRADO
+        if evento[2]:
+            return REGISTRO_ALTA_DEMANDA
+        return REGISTRO_DUPLICADO if evento[1] else REGISTRO_LLENO
+
+    stmt_registro = insert(asistentes_evento).values(usuario_id=usuario_id, evento_id=evento_id)
+    try:
         db.session.execute(stmt_registro)
+    except IntegrityError:
+        return REGISTRO_DUPLICADO
+    return REGISTRO_OK
+
+def registrarse_evento_service(current_user, id):
+    try:
+        # Eventos en alta demanda ya cargados: el cupo se asigna sin tocar la base de datos
+        resultado = registrarse_alta_demanda(current_user['id'], id)
+        if resultado is None:
+            resultado = registrar_usuario_evento(current_user['id'], id)
+            if resultado == REGISTRO_ALTA_DEMANDA:
+                db.session.rollback()
+                cargar_evento_alta_demanda(id)
+                resultado = registrarse_alta_demanda(current_user['id'], id)
+        if resultado == REGISTRO_NO_ENCONTRADO:
+            db.session.rollback()
+            return {"message": "Evento no encontrado"}, 404
+        if resultado == REGISTRO_DUPLICADO:
+            db.session.rollback()
+            return {"message": "Ya te has registrado a este evento"}, 400
+        if resultado == REGISTRO_LLENO:
+            db.session.rollback()
+            return {"message": "El evento ha alcanzado su capacidad máxima"}, 400
+
         db.session.commit()
         return {"message": "Te has registrado exitosamente al evento"}, 200
 
-    except ValueError as ve:
-        return {"message": str(ve)}, 404
     except Exception as e:
+        db.session.rollback()
         return {"message": f"Error al registrarse al evento: {str(e)}"}, 500
 
+def registrar_lote_evento_service(id, json_data):
+    """Registra una lista de usuarios en el evento con consultas por conjuntos.
+
+    Devuelve un informe por usuario: ``registrado``, ``ya_registrado``, ``lleno`` o
+    ``usuario_no_encontrado``. Los usuarios aceptados se insertan con un INSERT multi-fila.
+    """
+    try:
+        data = RegistroLoteSchema().load(json_data or {})
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+    usuario_ids = ids_unicos(data["usuario_ids"])
+
+    try:
+        # UPDATE sin cambios con RETURNING: bloquea la fila del evento (también en SQLite)
+        # hasta el commit, serializando el lote con los registros individuales. Fijar version
+        # evita su incremento automático: un lote sin aceptados no cambia los ETags del evento
+        stmt_lock = (
+            update(eventos_table)
+            .where(eventos_table.c.id == id)
+            .values(asistentes_actuales=eventos_table.c.asistentes_actuales, version=eventos_table.c.version)
+            .returning(
+                eventos_table.c.capacidad_maxima,
+                eventos_table.c.asistentes_actuales,
+                eventos_table.c.alta_demanda
+            )
+        )
+        evento = db.session.execute(stmt_lock).fetchone()
+        if evento is None:
+            db.session.rollback()
+            return {"message": "Evento no encontrado"}, 404
+
+        existentes = ids_coincidentes(select(usuarios_table.c.id), usuarios_table.c.id, usuario_ids)
+        if evento.alta_demanda:
+            db.session.rollback()
+            return _registrar_lote_alta_demanda(id, usuario_ids, existentes)
+
+        stmt_registrados = select(asistentes_evento.c.usuario_id).where(asistentes_evento.c.evento_id == id)
+        registrados = ids_coincidentes(stmt_registrados, asistentes_evento.c.usuario_id, usuario_ids)
+
+        disponibles = evento.capacidad_maxima - evento.asistentes_actuales
+        resultados = []
+        aceptados = []
+        for usuario_id in usuario_ids:
+            if usuario_id not in existentes:
+                estado = "usuario_no_encontrado"
+            elif usuario_id in registrados:
+                estado = "ya_registrado"
+            elif len(aceptados) >= disponibles:
+                estado = "lleno"
+            else:
+                estado = "registrado"
+                aceptados.append(usuario_id)
+            resultados.append({"usuario_id": usuario_id, "estado": estado})
+
+        if aceptados:
+            db.session.execute(
+                insert(asistentes_evento),
+                [{"usuario_id": usuario_id, "evento_id": id} for usuario_id in aceptados]
+            )
+            db.session.execute(
+                update(eventos_table)
+                .where(eventos_table.c.id == id)
+                .values(asistentes_actuales=eventos_table.c.asistentes_actuales + len(aceptados))
+            )
+        db.session.commit()
+        return {"registrados": len(aceptados), "resultados": resultados}, 200
+
+    except Exception as e:
+        db.session.rollback()
+        return {"message": f"Error al registrar el lote: {str(e)}"}, 500
+
+def _registrar_lote_alta_demanda(id, usuario_ids, existentes):
+    # En alta demanda el lote pasa por el asignador para no competir con él por los cupos
+    store = get_asientos_store()
+    if not store.cargado(id):
+        cargar_evento_alta_demanda(id)
+    estados = {REGISTRO_OK: "registrado", REGISTRO_DUPLICADO: "ya_registrado", REGISTRO_LLENO: "lleno"}
+    resultados = []
+    registrados = 0
+    for usuario_id in usuario_ids:
+        if usuario_id not in existentes:
+            estado = "usuario_no_encontrado"
+        else:
+            estado = estados[store.reservar(id, usuario_id)]
+            registrados += estado == "registrado"
+        resultados.append({"usuario_id": usuario_id, "estado": estado})
+    volcar_tras_aceptar()
+    return {"registrados": registrados, "resultados": resultados}, 200
+
 def validar_capacidad_evento_service(id):
     try:
         evento = get_evento_or_404(id)
-        stmt_asistentes = select(func.count()).select_from(asistentes_evento).where(
-            asistentes_evento.c.evento_id == id
-        )
-        asistentes_count = db.session.execute(stmt_asistentes).scalar()
-        capacidad_disponible = evento.capacidad_maxima - asistentes_count
+        capacidad_disponible = evento.capacidad_maxima - evento.asistentes_actuales
+        if evento.alta_demanda:
+            # El asignador incluye los registros aún no volcados
+            disponibles = get_asientos_store().disponibles(id)
+            if disponibles is not None:
+                capacidad_disponible = disponibles
         return {"capacidad_disponible": capacidad_disponible}, 200
     except ValueError as ve:
         return {"message": str(ve)}, 404
     except Exception as e:
         return {"message": f"Error al validar capacidad: {str(e)}"}, 500
 
+def validar_capacidad_eventos_service(ids):
+    """Capacidad disponible de varios eventos con una sola consulta (contador de cada fila)."""
+    try:
+        evento_ids = parsear_ids(ids)
+    except ValueError as ve:
+        return {"message": str(ve)}, 400
+    stmt = select(
+        eventos_table.c.id, eventos_table.c.capacidad_maxima,
+        eventos_table.c.asistentes_actuales, eventos_table.c.alta_demanda
+    ).where(eventos_table.c.id.in_(evento_ids))
+    encontrados = {fila.id: fila for fila in db.session.execute(stmt)}
+    capacidades = []
+    for id in evento_ids:
+        evento = encontrados.get(id)
+        if evento is None:
+            continue
+        capacidad_disponible = evento.capacidad_maxima - evento.asistentes_actuales
+        if evento.alta_demanda:
+            # El asignador incluye los registros aún no volcados
+            disponibles = get_asientos_store().disponibles(id)
+            if disponibles is not None:
+                capacidad_disponible = disponibles
+        capacidades.append({"id": id, "capacidad_disponible": capacidad_disponible})
+    return {
+        "capacidades": capacidades,
+        "no_encontrados": [id for id in evento_ids if id not in encontrados]
+    }, 200
+
 def obtener_mis_eventos_service(current_user):
     # Obtener parámetros de paginación
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = limitar_per_page(request.args.get('per_page', 10, type=int))
 
     # Consulta base
     stmt = (
@@ -173,6 +537,14 @@ def obtener_mis_eventos_service(current_user):
         .join(asistentes_evento, asistentes_evento.c.evento_id == eventos_table.c.id)
         .where(asistentes_evento.c.usuario_id == current_user['id'])
     )
+
+    # Paginación por cursor: sin OFFSET y con total opcional
+    if 'cursor' in request.args:
+        try:
+            return paginar_por_cursor(stmt, count_stmt, per_page, filtrado=True), 200
+        except CursorInvalido as ci:
+            return {"message": str(ci)}, 400
+
     total = db.session.execute(count_stmt).scalar()
 
     # Aplicar paginación
@@ -181,7 +553,7 @@ def obtener_mis_eventos_service(current_user):
     ).fetchall()
 
     return {
-        "eventos": serialize_result_set(eventos, EventoSchema(many=True)),
+        "eventos": dump_filas(EventoSchema, eventos),
         "total": total
     }, 200
 #eliminar_registro_evento_service
@@ -189,23 +561,30 @@ def eliminar_registro_evento_service(current_user, id):
     try:
         # Verificar si el evento existe
         evento = get_evento_or_404(id)
+        if evento.alta_demanda:
+            # El registro puede estar aún pendiente de volcado
+            volcar_registros()
 
-        # Verificar si el usuario está registrado en el evento
-        stmt_verificar = select(asistentes_evento).where(
+        # Eliminar el registro; si no existía, el usuario no estaba registrado
+        stmt_eliminar = delete(asistentes_evento).where(
             (asistentes_evento.c.usuario_id == current_user['id']) &
             (asistentes_evento.c.evento_id == id)
         )
-        registro_existente = db.session.execute(stmt_verificar).fetchone()
-        if not registro_existente:
+        result = db.session.execute(stmt_eliminar)
+        if result.rowcount == 0:
+            db.session.rollback()
             return {"message": "No estás registrado en este evento"}, 400
 
-        # Eliminar el registro
-        stmt_eliminar = delete(asistentes_evento).where(
-            (asistentes_evento.c.usuario_id == current_user['id']) &
-            (asistentes_evento.c.evento_id == id)
+        # Mantener el contador en la misma transacción
+        stmt_contador = (
+            update(eventos_table)
+            .where(eventos_table.c.id == id)
+            .values(asistentes_actuales=eventos_table.c.asistentes_actuales - 1)
         )
-        db.session.execute(stmt_eliminar)
+        db.session.execute(stmt_contador)
         db.session.commit()
+        if evento.alta_demanda:
+            get_asientos_store().liberar(id, current_user['id'])
         return {"message": "Tu registro al evento ha sido eliminado exitosamente"}, 200
 
     except ValueError as ve:
@@ -0,0 +1,78 @@
+# Operaciones sobre intervalos de tiempo semiabiertos [inicio, fin)
+from bisect import bisect_right
+
+# Dependencia opcional: NumPy vectoriza el barrido en los lotes grandes
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depende del entorno
+    numpy = None
+
+# A partir de este número de intervalos compensa convertir a arrays de NumPy
+UMBRAL_NUMPY = 256
+
+def intervalos_solapados(inicios, fines):
+    """Indica, para cada intervalo, si se solapa con algún otro de la lista.
+
+    Un único barrido tras ordenar por inicio, O(n log n): el intervalo i se solapa con uno
+    anterior si el mayor fin de los anteriores supera su inicio, y con uno posterior si el
+    siguiente empieza antes de su fin. Los intervalos que solo se tocan no se solapan.
+    """
+    if numpy is not None and len(inicios) >= UMBRAL_NUMPY:
+        return _solapados_numpy(inicios, fines)
+    orden = sorted(range(len(inicios)), key=inicios.__getitem__)
+    solapados = [False] * len(inicios)
+    mayor_fin = None
+    for posicion, i in enumerate(orden):
+        if mayor_fin is not None and inicios[i] < mayor_fin:
+            solapados[i] = True
+        if posicion + 1 < len(orden) and inicios[orden[posicion + 1]] < fines[i]:
+            solapados[i] = True
+        if mayor_fin is None or fines[i] > mayor_fin:
+            mayor_fin = fines[i]
+    return solapados
+
+def _solapados_numpy(inicios, fines):
+    inicio = numpy.array(inicios, dtype="datetime64[us]").astype(numpy.int64)
+    fin = numpy.array(fines, dtype="datetime64[us]").astype(numpy.int64)
+    orden = numpy.argsort(inicio, kind="stable")
+    inicio, fin = inicio[orden], fin[orden]
+    mayor_fin = numpy.maximum.accumulate(fin)
+    solapados = numpy.zeros(len(inicio), dtype=bool)
+    solapados[1:] |= inicio[1:] < mayor_fin[:-1]
+    solapados[:-1] |= inicio[1:] < fin[:-1]
+    resultado = numpy.empty_like(solapados)
+    resultado[orden] = solapados
+    return resultado.tolist()
+
+def fusionar_intervalos(intervalos):
+    """Une los intervalos ``(inicio, fin)`` que se solapan o se tocan; devuelve una lista ordenada y disjunta."""
+    fusionados = []
+    for inicio, fin in sorted(intervalos):
+        if fusionados and inicio <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1] = (fusionados[-1][0], fin)
+        else:
+            fusionados.append((inicio, fin))
+    return fusionados
+
+def solapa_fusionados(fusionados, inicio, fin):
+    """True si [inicio, fin) se solapa con algún intervalo de ``fusionados`` (búsqueda binaria)."""
+    # Primer intervalo que termina después de ``inicio``: es el único candidato a solaparse
+    i = bisect_right(fusionados, inicio, key=lambda intervalo: intervalo[1])
+    return i < len(fusionados) and fusionados[i][0] < fin
+
+def huecos_libres(fusionados, inicio, fin):
+    """Tramos de [inicio, fin) que no cubre ningún intervalo de ``fusionados``."""
+    huecos = []
+    cursor = inicio
+    for ocupado_inicio, ocupado_fin in fusionados:
+        if ocupado_fin <= cursor:
+            continue
+        if ocupado_inicio >= fin:
+            break
+        if ocupado_inicio > cursor:
+            huecos.append((cursor, ocupado_inicio))
+        cursor = max(cursor, ocupado_fin)
+    if cursor < fin:
+        huecos.append((cursor, fin))
+    return huecos
@@ -0,0 +1,46 @@
+import csv
+import io
+from app import db
+
+# Tamaño de bloque para las cláusulas IN (por debajo del límite de parámetros de SQLite)
+TAMANO_BLOQUE = 5000
+
+# Máximo de ids aceptados en las consultas ?ids=1,2,3
+MAX_IDS_CONSULTA = 500
+
+def en_bloques(valores, tamano=TAMANO_BLOQUE):
+    for i in range(0, len(valores), tamano):
+        yield valores[i:i + tamano]
+
+def ids_coincidentes(stmt, columna, valores):
+    """Ejecuta ``stmt`` (un SELECT de una columna) filtrando ``columna IN valores`` por bloques.
+
+    Devuelve el conjunto de valores obtenidos: una consulta por cada ``TAMANO_BLOQUE`` valores.
+    """
+    encontrados = set()
+    for bloque in en_bloques(valores):
+        encontrados.update(db.session.execute(stmt.where(columna.in_(bloque))).scalars())
+    return encontrados
+
+def ids_unicos(valores):
+    """Elimina duplicados conservando el orden de aparición."""
+    return list(dict.fromkeys(valores))
+
+def parsear_ids(valor, maximo=MAX_IDS_CONSULTA):
+    """Lista de ids únicos de un parámetro ``ids=1,2,3``; ValueError si no es válido."""
+    try:
+        ids = ids_unicos(int(parte) for parte in (valor or "").split(",") if parte.strip())
+    except ValueError:
+        raise ValueError("El parámetro 'ids' debe ser una lista de enteros separados por comas")
+    if not ids:
+        raise ValueError("El parámetro 'ids' es requerido")
+    if len(ids) > maximo:
+        raise ValueError(f"Se admiten como máximo {maximo} ids por consulta")
+    return ids
+
+def leer_filas_csv(texto):
+    """Filas de un CSV con cabecera como diccionarios; las celdas vacías se omiten."""
+    return [
+        {columna: valor for columna, valor in fila.items() if columna and valor not in (None, "")}
+        for fila in csv.DictReader(io.StringIO(texto))
+    ]
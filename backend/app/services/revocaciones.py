@@ -0,0 +1,138 @@
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import IntegrityError
+from app.models.tokens import tokens_revocados
+from app.core.bloom import FiltroBloom
+from app.core.config import settings
+from app import db
+
+# Revocación de tokens por su jti. La tabla tokens_revocados es la fuente de verdad; cada
+# proceso mantiene un filtro de Bloom con los jti vigentes para que comprobar un token no
+# revocado (el caso habitual) no toque la base de datos. Un acierto del filtro se confirma
+# con una consulta por clave primaria, así que los falsos positivos solo cuestan esa consulta.
+
+# Margen al leer revocaciones de otros workers, por desfase de relojes y transacciones lentas
+_MARGEN_SINCRONIZACION = timedelta(seconds=60)
+
+def _ahora():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RevocacionesTokens:
+    """Filtro de Bloom de jti revocados del proceso, sincronizado periódicamente con la tabla.
+
+    La primera comprobación carga los jti no expirados; después, cada ``refresco`` segundos,
+    solo los revocados desde la sincronización anterior. Las revocaciones de otros workers se
+    aplican, por tanto, con un retraso de como mucho ``refresco`` segundos. Cuando el filtro
+    supera su capacidad se reconstruye, lo que también descarta los tokens ya expirados.
+    """
+
+    def __init__(self, capacidad=100000, tasa_fp=0.001, refresco=5.0):
+        self._lock = threading.Lock()
+        self._capacidad = capacidad
+        self._tasa_fp = tasa_fp
+        self._refresco = refresco
+        self._filtro = None
+        self._elementos = 0
+        self._sincronizado = None
+        self._proxima = 0.0
+
+    def _sincronizar(self, conexion):
+        ahora = _ahora()
+        if self._filtro is None or self._elementos > self._capacidad:
+            jtis = conexion.execute(
+                select(tokens_revocados.c.jti).where(tokens_revocados.c.expira > ahora)
+            ).scalars().all()
+            self._filtro = FiltroBloom(max(self._capacidad, 2 * len(jtis)), self._tasa_fp)
+            self._elementos = 0
+        else:
+            jtis = conexion.execute(
+                select(tokens_revocados.c.jti).where(
+                    tokens_revocados.c.revocado_en >= self._sincronizado - _MARGEN_SINCRONIZACION
+                )
+            ).scalars().all()
+        for jti in jtis:
+            self._agregar(jti)
+        self._sincronizado = ahora
+        self._proxima = time.monotonic() + self._refresco
+
+    def _agregar(self, jti):
+        # El margen de sincronización vuelve a leer revocaciones ya conocidas: solo cuentan las nuevas
+        if jti not in self._filtro:
+            self._filtro.agregar(jti)
+            self._elementos += 1
+
+    def contiene(self, jti):
+        """True si el jti está revocado; solo consulta la base de datos si el filtro lo contiene.
+
+        Las consultas usan una conexión propia y no la sesión de la petición, que así no queda
+        con una transacción abierta antes de que la ruta se ejecute.
+        """
+        with self._lock:
+            if self._filtro is None or time.monotonic() >= self._proxima:
+                with db.engine.connect() as conexion:
+                    self._sincronizar(conexion)
+            if jti not in self._filtro:
+                return False
+        stmt = select(tokens_revocados.c.jti).where(tokens_revocados.c.jti == jti)
+        with db.engine.connect() as conexion:
+            return conexion.execute(stmt).scalar() is not None
+
+    def agregar(self, jti):
+        with self._lock:
+            if self._filtro is not None:
+                self._agregar(jti)
+
+    @property
+    def elementos(self):
+        """Revocaciones distintas añadidas al filtro desde su última reconstrucción (aproximado)."""
+        return self._elementos
+
+
+_revocaciones = None
+
+def get_revocaciones():
+    """Registro de tokens revocados del proceso (instancia única)."""
+    global _revocaciones
+    if _revocaciones is None:
+        _revocaciones = RevocacionesTokens(
+            settings.REVOCACION_CAPACIDAD, settings.REVOCACION_TASA_FP, settings.REVOCACION_REFRESCO
+        )
+    return _revocaciones
+
+def token_revocado(claims):
+    """Comprobación para ``registrar_revocacion``: True si el jti del token está revocado.
+
+    Los tokens sin jti (emitidos antes de existir la revocación) no se pueden revocar.
+    """
+    jti = claims.get("jti")
+    return bool(jti) and get_revocaciones().contiene(jti)
+
+def revocar_token(claims):
+    """Revoca el token hasta su ``exp``. Devuelve False si ya estaba revocado.
+
+    La clave primaria sobre jti hace que, entre peticiones concurrentes con el mismo
+    token, solo una consiga revocarlo.
+    """
+    stmt = insert(tokens_revocados).values(
+        jti=claims["jti"],
+        usuario_id=int(claims["sub"]),
+        expira=datetime.fromtimestamp(claims["exp"], timezone.utc).replace(tzinfo=None),
+        revocado_en=_ahora()
+    )
+    try:
+        db.session.execute(stmt)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    get_revocaciones().agregar(claims["jti"])
+    return True
+
+def purgar_tokens_revocados():
+    """Borra las revocaciones de tokens ya expirados. Devuelve cuántas se borraron."""
+    resultado = db.session.execute(delete(tokens_revocados).where(tokens_revocados.c.expira <= _ahora()))
+    db.session.commit()
+    return resultado.rowcount
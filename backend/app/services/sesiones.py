@@ -1,51 +1,90 @@
-from sqlalchemy import insert, select, update, delete, func, and_
+from sqlalchemy import insert, select, update, delete
+from sqlalchemy.exc import IntegrityError
 from app.models.eventos import eventos_table
 from app.models.sesiones import sesiones_table
 from app.models.associations import asistentes_sesion, asistentes_evento
-from app.schemas.sesiones import SesionCreateSchema, SesionSchema
+from app.schemas.sesiones import ImportacionSesionesSchema, SesionCreateSchema, SesionSchema
+from app.schemas.registros import RegistroLoteSchema
+from app.schemas.compilados import dump_filas
+from app.schemas.fechas import a_utc
+from app.services.lotes import en_bloques, ids_coincidentes, ids_unicos, leer_filas_csv, parsear_ids
+from app.services.horarios import fusionar_intervalos, huecos_libres, intervalos_solapados, solapa_fusionados
 from app.models.usuarios import usuarios_table
 from app import db
+from app.core.config import settings
+from app.core.cache import cacheado, invalidar_cache
 from marshmallow import ValidationError
-
-def crear_sesion_service(json_data):
-    try:
-        data = SesionCreateSchema().load(json_data)
-    except ValidationError as err:
-        return {"errors": err.messages}, 400
-
-    # Obtener evento
-    stmt_evento = select(eventos_table).where(eventos_table.c.id == data['evento_id'])
+from flask import Response, stream_with_context
+import csv
+import io
+import json
+from datetime import datetime
+
+MENSAJE_SOLAPAMIENTO = "La sesión se solapa con otra sesión del evento"
+MENSAJE_FECHAS_INVERTIDAS = "La fecha de fin debe ser posterior a la de inicio"
+
+def sesion_solapada(evento_id, fecha_inicio, fecha_fin, excluir_id=None):
+    """True si otra sesión del evento se solapa con [fecha_inicio, fecha_fin).
+
+    Las sesiones de un evento no se solapan entre sí (lo garantiza esta misma comprobación
+    y, en Postgres, la restricción de exclusión ex_sesiones_sin_solapamiento), así que
+    ordenadas por inicio también quedan ordenadas por fin. Basta con leer, por el índice
+    (evento_id, fecha_inicio), la última sesión que empieza antes de ``fecha_fin`` y
+    comprobar si termina después de ``fecha_inicio``. Los extremos que solo se tocan no cuentan.
+    """
+    stmt = (
+        select(sesiones_table.c.fecha_fin)
+        .where(
+            (sesiones_table.c.evento_id == evento_id) &
+            (sesiones_table.c.fecha_inicio < fecha_fin)
+        )
+        .order_by(sesiones_table.c.fecha_inicio.desc())
+        .limit(1)
+    )
+    if excluir_id is not None:
+        stmt = stmt.where(sesiones_table.c.id != excluir_id)
+    fin_anterior = db.session.execute(stmt).scalar()
+    return fin_anterior is not None and fin_anterior > fecha_inicio
+
+def validar_horario_sesion(data, excluir_id=None):
+    """Valida el horario de la sesión contra su evento. Devuelve la respuesta de error o None."""
+    if data['fecha_inicio'] >= data['fecha_fin']:
+        return {"message": MENSAJE_FECHAS_INVERTIDAS}, 400
+
+    stmt_evento = select(eventos_table.c.fecha_inicio, eventos_table.c.fecha_fin).where(
+        eventos_table.c.id == data['evento_id']
+    )
     evento = db.session.execute(stmt_evento).fetchone()
     if not evento:
         return {"message": "Evento no encontrado"}, 404
 
-    evento_data = dict(evento._mapping)
-
-    # Convertir a naive datetime (sin zona horaria)
-    evento_inicio = evento_data['fecha_inicio'].replace(tzinfo=None)
-    evento_fin = evento_data['fecha_fin'].replace(tzinfo=None)
-    sesion_inicio = data['fecha_inicio'].replace(tzinfo=None)
-    sesion_fin = data['fecha_fin'].replace(tzinfo=None)
-
-    # Validar que la sesión esté dentro del rango del evento
-    if not (evento_inicio <= sesion_inicio and sesion_fin <= evento_fin):
+    # Todas las fechas están en UTC sin zona horaria (ver app.schemas.fechas)
+    if not (evento._mapping['fecha_inicio'] <= data['fecha_inicio'] and data['fecha_fin'] <= evento._mapping['fecha_fin']):
         return {"message": "Las fechas de la sesión deben estar dentro del horario del evento"}, 400
 
-    # Verificar solapamientos con otras sesiones
-    stmt_sesiones = select(sesiones_table).where(sesiones_table.c.evento_id == data['evento_id'])
-    sesiones = db.session.execute(stmt_sesiones).fetchall()
-    for sesion in sesiones:
-        sesion_data = dict(sesion._mapping)
-        sesion_existente_inicio = sesion_data['fecha_inicio'].replace(tzinfo=None)
-        sesion_existente_fin = sesion_data['fecha_fin'].replace(tzinfo=None)
+    if sesion_solapada(data['evento_id'], data['fecha_inicio'], data['fecha_fin'], excluir_id):
+        return {"message": MENSAJE_SOLAPAMIENTO}, 400
+    return None
 
-        if not (sesion_fin <= sesion_existente_inicio or sesion_inicio >= sesion_existente_fin):
-            return {"message": "La sesión se solapa con otra sesión del evento"}, 400
+def crear_sesion_service(json_data):
+    try:
+        data = SesionCreateSchema().load(json_data)
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+
+    error = validar_horario_sesion(data)
+    if error:
+        return error
 
-    # Insertar la sesión
+    # Insertar la sesión; en Postgres la restricción de exclusión rechaza un solapamiento concurrente
     stmt_insert = insert(sesiones_table).values(**data)
-    db.session.execute(stmt_insert)
-    db.session.commit()
+    try:
+        db.session.execute(stmt_insert)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {"message": MENSAJE_SOLAPAMIENTO}, 400
+    invalidar_cache("sesiones")
 
     return {"message": "Sesión creada exitosamente"}, 201
 
@@ -55,41 +94,180 @@ def actualizar_sesion_service(id, json_data):
     except ValidationError as err:
         return {"errors": err.messages}, 400
 
-    stmt_sesion = select(sesiones_table).where(sesiones_table.c.id == id)
+    stmt_sesion = select(sesiones_table.c.id).where(sesiones_table.c.id == id)
     sesion = db.session.execute(stmt_sesion).fetchone()
     if not sesion:
         return {"message": "Sesión no encontrada"}, 404
 
+    error = validar_horario_sesion(data, excluir_id=id)
+    if error:
+        return error
+
     stmt_update = update(sesiones_table).where(sesiones_table.c.id == id).values(**data)
-    db.session.execute(stmt_update)
-    db.session.commit()
+    try:
+        db.session.execute(stmt_update)
+        inscritos = inscritos_en_sesiones(sesiones_table.c.id == id)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return {"message": MENSAJE_SOLAPAMIENTO}, 400
+    invalidar_cache("sesiones")
+    invalidar_agendas(inscritos)
 
     return {"message": "Sesión actualizada exitosamente"}, 200
 
+def importar_sesiones_service(evento_id, json_data):
+    """Crea varias sesiones de un evento con una validación conjunta y un INSERT multi-fila.
+
+    Cada fila se valida con SesionCreateSchema y contra el horario del evento; los solapamientos
+    entre las filas y con las sesiones existentes se detectan con un único barrido ordenado
+    (ver app.services.horarios). Con ``todo_o_nada`` cualquier error cancela la importación.
+    """
+    try:
+        data = ImportacionSesionesSchema().load(json_data or {})
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+
+    stmt_evento = select(eventos_table.c.fecha_inicio, eventos_table.c.fecha_fin).where(eventos_table.c.id == evento_id)
+    evento = db.session.execute(stmt_evento).fetchone()
+    if not evento:
+        return {"message": "Evento no encontrado"}, 404
+
+    schema = SesionCreateSchema()
+    errores = []
+    validas = []  # (fila, sesión)
+    for fila, valores in enumerate(data["sesiones"]):
+        try:
+            sesion = schema.load({**valores, "evento_id": evento_id})
+        except ValidationError as err:
+            errores.append({"fila": fila, "errors": err.messages})
+            continue
+        if sesion["fecha_inicio"] >= sesion["fecha_fin"]:
+            errores.append({"fila": fila, "message": MENSAJE_FECHAS_INVERTIDAS})
+        elif not (evento.fecha_inicio <= sesion["fecha_inicio"] and sesion["fecha_fin"] <= evento.fecha_fin):
+            errores.append({"fila": fila, "message": "Las fechas de la sesión deben estar dentro del horario del evento"})
+        else:
+            sesion.setdefault("descripcion", None)  # Mismas columnas en todas las filas del INSERT
+            validas.append((fila, sesion))
+
+    stmt_existentes = select(sesiones_table.c.fecha_inicio, sesiones_table.c.fecha_fin).where(sesiones_table.c.evento_id == evento_id)
+    existentes = db.session.execute(stmt_existentes).fetchall()
+    inicios = [sesion["fecha_inicio"] for _, sesion in validas]
+    fines = [sesion["fecha_fin"] for _, sesion in validas]
+    en_lote = intervalos_solapados(inicios, fines)
+    con_todas = intervalos_solapados(
+        inicios + [e.fecha_inicio for e in existentes],
+        fines + [e.fecha_fin for e in existentes]
+    )
+
+    aceptadas = []
+    for (fila, sesion), solapa_lote, solapa_alguna in zip(validas, en_lote, con_todas):
+        if solapa_lote:
+            errores.append({"fila": fila, "message": "La sesión se solapa con otra sesión de la importación"})
+        elif solapa_alguna:
+            errores.append({"fila": fila, "message": MENSAJE_SOLAPAMIENTO})
+        else:
+            aceptadas.append(sesion)
+    errores.sort(key=lambda error: error["fila"])
+
+    if errores and data["todo_o_nada"]:
+        return {"message": "No se importó ninguna sesión", "creadas": 0, "errores": errores}, 400
+    if not aceptadas:
+        return {"message": "Ninguna sesión es válida", "creadas": 0, "errores": errores}, 400
+
+    try:
+        db.session.execute(insert(sesiones_table).values(aceptadas))
+        db.session.commit()
+    except IntegrityError:
+        # En Postgres, otra escritura concurrente ocupó el horario (restricción de exclusión)
+        db.session.rollback()
+        return {"message": MENSAJE_SOLAPAMIENTO}, 400
+    invalidar_cache("sesiones")
+
+    return {"message": "Sesiones importadas", "creadas": len(aceptadas), "errores": errores}, 201
+
+def leer_sesiones_csv(texto):
+    """Filas de un CSV con cabecera (columnas de SesionCreateSchema, sin evento_id); las celdas vacías se omiten."""
+    return leer_filas_csv(texto)
+
 def eliminar_sesion_service(id):
     stmt_sesion = select(sesiones_table).where(sesiones_table.c.id == id)
     sesion = db.session.execute(stmt_sesion).fetchone()
     if not sesion:
         return {"message": "Sesión no encontrada"}, 404
 
+    inscritos = inscritos_en_sesiones(sesiones_table.c.id == id)
     stmt_delete = delete(sesiones_table).where(sesiones_table.c.id == id)
     db.session.execute(stmt_delete)
     db.session.commit()
+    invalidar_cache("sesiones")
+    invalidar_agendas(inscritos)
 
     return {"message": "Sesión eliminada exitosamente"}, 204
 
+def sesiones_por_ids(ids, *columnas):
+    """Filas de sesiones con id en ``ids`` (un WHERE id IN) indexadas por id."""
+    stmt = select(*(columnas or [sesiones_table])).where(sesiones_table.c.id.in_(ids))
+    return {fila.id: fila for fila in db.session.execute(stmt)}
+
+def obtener_sesiones_por_ids_service(ids):
+    """Detalle con ocupación de varias sesiones; los ids inexistentes se informan aparte."""
+    try:
+        sesion_ids = parsear_ids(ids)
+    except ValueError as ve:
+        return {"message": str(ve)}, 400
+    encontradas = sesiones_por_ids(sesion_ids)
+    return {
+        "sesiones": [sesion_con_capacidad(encontradas[id]) for id in sesion_ids if id in encontradas],
+        "no_encontrados": [id for id in sesion_ids if id not in encontradas]
+    }, 200
+
+def validar_capacidad_sesiones_service(ids):
+    """Capacidad disponible de varias sesiones con una sola consulta."""
+    try:
+        sesion_ids = parsear_ids(ids)
+    except ValueError as ve:
+        return {"message": str(ve)}, 400
+    encontradas = sesiones_por_ids(
+        sesion_ids, sesiones_table.c.id, sesiones_table.c.capacidad_maxima, sesiones_table.c.asistentes_actuales
+    )
+    return {
+        "capacidades": [
+            {"id": id, "capacidad_disponible": encontradas[id].capacidad_maxima - encontradas[id].asistentes_actuales}
+            for id in sesion_ids if id in encontradas
+        ],
+        "no_encontrados": [id for id in sesion_ids if id not in encontradas]
+    }, 200
+
 def validar_capacidad_sesion_service(id):
     stmt_sesion = select(sesiones_table).where(sesiones_table.c.id == id)
     sesion = db.session.execute(stmt_sesion).fetchone()
     if not sesion:
         return {"message": "Sesión no encontrada"}, 404
 
-    stmt_asistentes = select(func.count()).select_from(asistentes_sesion).where(asistentes_sesion.c.sesion_id == id)
-    asistentes_count = db.session.execute(stmt_asistentes).scalar()
-    capacidad_disponible = sesion.capacidad_maxima - asistentes_count
+    capacidad_disponible = sesion.capacidad_maxima - sesion.asistentes_actuales
 
     return {"capacidad_disponible": capacidad_disponible}, 200
 
+def solapa_con(fecha_inicio, fecha_fin):
+    """Condición de solapamiento de una sesión con [fecha_inicio, fecha_fin); los extremos que se tocan no cuentan."""
+    return (sesiones_table.c.fecha_inicio < fecha_fin) & (sesiones_table.c.fecha_fin > fecha_inicio)
+
+def sesiones_en_conflicto(usuario_id, fecha_inicio, fecha_fin):
+    """Ids de las sesiones del usuario que se solapan con [fecha_inicio, fecha_fin), ordenados.
+
+    Recorre solo las inscripciones del usuario por la clave primaria (usuario_id, sesion_id)
+    y une cada una con su sesión por id, así que el coste depende de las sesiones del usuario
+    y no del tamaño de las tablas.
+    """
+    stmt = (
+        select(sesiones_table.c.id)
+        .select_from(asistentes_sesion.join(sesiones_table, sesiones_table.c.id == asistentes_sesion.c.sesion_id))
+        .where((asistentes_sesion.c.usuario_id == usuario_id) & solapa_con(fecha_inicio, fecha_fin))
+        .order_by(asistentes_sesion.c.sesion_id)  # Orden de la clave primaria: sin ordenación extra
+    )
+    return db.session.execute(stmt).scalars().all()
+
 def registrar_asistente_service(sesion_id, json_data):
     usuario_id = json_data.get('usuario_id')
 
@@ -107,9 +285,7 @@ def registrar_asistente_service(sesion_id, json_data):
     if not registro_evento:
         return {"message": "El usuario no está registrado en el evento"}, 400
 
-    stmt_asistentes = select(func.count()).select_from(asistentes_sesion).where(asistentes_sesion.c.sesion_id == sesion_id)
-    asistentes_count = db.session.execute(stmt_asistentes).scalar()
-    if asistentes_count >= sesion._mapping['capacidad_maxima']:
+    if sesion._mapping['asistentes_actuales'] >= sesion._mapping['capacidad_maxima']:
         return {"message": "La sesión ha alcanzado su capacidad máxima"}, 400
 
     stmt_verificar = select(asistentes_sesion).where(
@@ -120,60 +296,310 @@ def registrar_asistente_service(sesion_id, json_data):
     if registro_existente:
         return {"message": "El usuario ya está registrado en esta sesión"}, 400
 
-    fecha_inicio = sesion._mapping['fecha_inicio']
-    fecha_fin = sesion._mapping['fecha_fin']
-    stmt_conflicto = (
-        select(sesiones_table.c.id)
-        .select_from(sesiones_table.join(asistentes_sesion, sesiones_table.c.id == asistentes_sesion.c.sesion_id))
-        .where(
-            (asistentes_sesion.c.usuario_id == usuario_id) &
-            and_(
-                sesiones_table.c.fecha_inicio > fecha_fin,
-                sesiones_table.c.fecha_fin > fecha_inicio
-            )
-        )
-    )
-    conflicto = db.session.execute(stmt_conflicto).fetchone()
-    if conflicto:
-        return {"message": "El usuario ya está registrado en otra sesión que se solapa con esta"}, 400
+    conflictos = sesiones_en_conflicto(usuario_id, sesion._mapping['fecha_inicio'], sesion._mapping['fecha_fin'])
+    if conflictos:
+        return {
+            "message": "El usuario ya está registrado en otra sesión que se solapa con esta",
+            "sesiones_en_conflicto": conflictos
+        }, 400
 
     stmt_insert = insert(asistentes_sesion).values(usuario_id=usuario_id, sesion_id=sesion_id)
     db.session.execute(stmt_insert)
+
+    # Incrementar el contador en la misma transacción; la condición evita sobrecupo concurrente
+    stmt_contador = (
+        update(sesiones_table)
+        .where(
+            (sesiones_table.c.id == sesion_id) &
+            (sesiones_table.c.asistentes_actuales < sesiones_table.c.capacidad_maxima)
+        )
+        .values(asistentes_actuales=sesiones_table.c.asistentes_actuales + 1)
+    )
+    if db.session.execute(stmt_contador).rowcount == 0:
+        db.session.rollback()
+        return {"message": "La sesión ha alcanzado su capacidad máxima"}, 400
     db.session.commit()
+    invalidar_cache("sesiones")
+    invalidar_agendas([usuario_id])
 
     return {"message": "Usuario registrado exitosamente en la sesión"}, 201
 
 
-def listar_sesiones_service():
+def registrar_asistentes_lote_service(sesion_id, json_data):
+    """Registra una lista de usuarios en la sesión con consultas por conjuntos.
+
+    Estados por usuario: ``registrado``, ``no_registrado_evento``, ``ya_registrado``,
+    ``conflicto_horario`` o ``lleno``. Los aceptados se insertan con un INSERT multi-fila.
+    """
+    try:
+        data = RegistroLoteSchema().load(json_data or {})
+    except ValidationError as err:
+        return {"errors": err.messages}, 400
+    usuario_ids = ids_unicos(data["usuario_ids"])
+
+    try:
+        # UPDATE sin cambios con RETURNING: bloquea la fila de la sesión hasta el commit (también
+        # en SQLite). Fijar version evita su incremento automático: un lote sin aceptados no
+        # cambia la sesión ni sus ETags
+        stmt_lock = (
+            update(sesiones_table)
+            .where(sesiones_table.c.id == sesion_id)
+            .values(asistentes_actuales=sesiones_table.c.asistentes_actuales, version=sesiones_table.c.version)
+            .returning(
+                sesiones_table.c.evento_id,
+                sesiones_table.c.capacidad_maxima,
+                sesiones_table.c.asistentes_actuales,
+                sesiones_table.c.fecha_inicio,
+                sesiones_table.c.fecha_fin
+            )
+        )
+        sesion = db.session.execute(stmt_lock).fetchone()
+        if sesion is None:
+            db.session.rollback()
+            return {"message": "Sesión no encontrada"}, 404
+
+        stmt_evento = select(asistentes_evento.c.usuario_id).where(asistentes_evento.c.evento_id == sesion.evento_id)
+        en_evento = ids_coincidentes(stmt_evento, asistentes_evento.c.usuario_id, usuario_ids)
+
+        stmt_sesion = select(asistentes_sesion.c.usuario_id).where(asistentes_sesion.c.sesion_id == sesion_id)
+        en_sesion = ids_coincidentes(stmt_sesion, asistentes_sesion.c.usuario_id, usuario_ids)
+
+        stmt_conflicto = (
+            select(asistentes_sesion.c.usuario_id)
+            .select_from(asistentes_sesion.join(sesiones_table, sesiones_table.c.id == asistentes_sesion.c.sesion_id))
+            .where((sesiones_table.c.id != sesion_id) & solapa_con(sesion.fecha_inicio, sesion.fecha_fin))
+            .distinct()
+        )
+        en_conflicto = ids_coincidentes(stmt_conflicto, asistentes_sesion.c.usuario_id, usuario_ids)
+
+        disponibles = sesion.capacidad_maxima - sesion.asistentes_actuales
+        resultados = []
+        aceptados = []
+        for usuario_id in usuario_ids:
+            if usuario_id not in en_evento:
+                estado = "no_registrado_evento"
+            elif usuario_id in en_sesion:
+                estado = "ya_registrado"
+            elif usuario_id in en_conflicto:
+                estado = "conflicto_horario"
+            elif len(aceptados) >= disponibles:
+                estado = "lleno"
+            else:
+                estado = "registrado"
+                aceptados.append(usuario_id)
+            resultados.append({"usuario_id": usuario_id, "estado": estado})
+
+        if aceptados:
+            db.session.execute(
+                insert(asistentes_sesion),
+                [{"usuario_id": usuario_id, "sesion_id": sesion_id} for usuario_id in aceptados]
+            )
+            db.session.execute(
+                update(sesiones_table)
+                .where(sesiones_table.c.id == sesion_id)
+                .values(asistentes_actuales=sesiones_table.c.asistentes_actuales + len(aceptados))
+            )
+        db.session.commit()
+        if aceptados:
+            invalidar_cache("sesiones")
+            invalidar_agendas(aceptados)
+
+        return {"registrados": len(aceptados), "resultados": resultados}, 200
+
+    except Exception as e:
+        db.session.rollback()
+        return {"message": f"Error al registrar el lote: {str(e)}"}, 500
+
+
+def listar_sesiones_service(evento_id=None, page=None, per_page=None):
+    clave = f"listado:{evento_id}:{page}:{per_page}"
+    return cacheado(["sesiones"], clave, lambda: _listar_sesiones(evento_id, page, per_page))
+
+def sesion_con_capacidad(sesion):
+    """Sesión con su ocupación, leída del contador asistentes_actuales de la fila."""
+    asistentes_count = sesion.asistentes_actuales
+    capacidad_disponible = sesion.capacidad_maxima - asistentes_count
+    return {
+        "id": sesion.id,
+        "evento_id": sesion.evento_id,
+        "nombre": sesion.nombre,
+        "descripcion": sesion.descripcion,
+        "fecha_inicio": sesion.fecha_inicio,
+        "fecha_fin": sesion.fecha_fin,
+        "capacidad_maxima": sesion.capacidad_maxima,
+        "asistentes_actuales": asistentes_count,
+        "capacidad_disponible": capacidad_disponible,
+        "ponente": sesion.ponente
+    }
+
+def _listar_sesiones(evento_id, page, per_page):
     sesiones_data = []
-    # Obtener todas las sesiones
-    stmt_sesiones = select(sesiones_table)
+    # Una sola consulta: asistentes_actuales es un contador almacenado en la propia fila
+    stmt_sesiones = select(sesiones_table).order_by(sesiones_table.c.id)
+    if evento_id is not None:
+        stmt_sesiones = stmt_sesiones.where(sesiones_table.c.evento_id == evento_id)
+
+    # Paginación opcional: sin page/per_page se devuelven todas las sesiones, como antes
+    paginado = page is not None or per_page is not None
+    if paginado:
+        page = max(page or 1, 1)
+        per_page = min(max(per_page or 10, 1), settings.MAX_PER_PAGE)
+        stmt_sesiones = stmt_sesiones.offset((page - 1) * per_page).limit(per_page)
     sesiones = db.session.execute(stmt_sesiones).fetchall()
     for sesion in sesiones:
-        sesion_id = sesion.id
-        # Contar asistentes registrados en la sesión
-        stmt_asistentes = select(func.count()).where(asistentes_sesion.c.sesion_id == sesion_id)
-        asistentes_count = db.session.execute(stmt_asistentes).scalar()
-
-        capacidad_disponible = sesion.capacidad_maxima - asistentes_count
-
-        sesiones_data.append({
-            "id": sesion.id,
-            "evento_id": sesion.evento_id,
-            "nombre": sesion.nombre,
-            "descripcion": sesion.descripcion,
-            "fecha_inicio": sesion.fecha_inicio.isoformat(),
-            "fecha_fin": sesion.fecha_fin.isoformat(),
-            "capacidad_maxima": sesion.capacidad_maxima,
-            "asistentes_actuales": asistentes_count,
-            "capacidad_disponible": capacidad_disponible,
-            "ponente": sesion.ponente
-        })
+        sesiones_data.append(sesion_con_capacidad(sesion))
 
+    if paginado:
+        return {"sesiones": sesiones_data, "page": page, "per_page": per_page}, 200
     return {"sesiones": sesiones_data}, 200
 
 
-def listar_asistencias_service():
+# Agenda personal: sesiones en las que está inscrito un usuario, en orden cronológico
+def grupo_agenda(usuario_id):
+    return f"agenda:{usuario_id}"
+
+def agenda_cacheada():
+    return settings.AGENDA_CACHE_TTL > 0 and settings.CACHE_TTL > 0
+
+def inscritos_en_sesiones(condicion):
+    """Ids de los usuarios inscritos en las sesiones que cumplen ``condicion``.
+
+    Solo hace falta para invalidar sus agendas, así que sin caché de agenda no consulta nada.
+    Usa el índice de asistentes_sesion por sesion_id.
+    """
+    if not agenda_cacheada():
+        return []
+    stmt = (
+        select(asistentes_sesion.c.usuario_id)
+        .select_from(asistentes_sesion.join(sesiones_table, sesiones_table.c.id == asistentes_sesion.c.sesion_id))
+        .where(condicion)
+        .distinct()
+    )
+    return db.session.execute(stmt).scalars().all()
+
+def invalidar_agendas(usuario_ids):
+    if usuario_ids and agenda_cacheada():
+        invalidar_cache(*(grupo_agenda(usuario_id) for usuario_id in usuario_ids))
+
+def parsear_fecha(valor, nombre):
+    """Fecha ISO 8601 de un parámetro de consulta, en UTC sin zona; ValueError si no es válida."""
+    if valor is None or valor == "":
+        return None
+    try:
+        return a_utc(datetime.fromisoformat(valor))
+    except ValueError:
+        raise ValueError(f"El parámetro '{nombre}' debe ser una fecha ISO 8601")
+
+def consulta_agenda(usuario_id):
+    # Inscripciones del usuario por la clave primaria (usuario_id, sesion_id) y cada sesión por su id
+    return (
+        select(sesiones_table)
+        .join(asistentes_sesion, asistentes_sesion.c.sesion_id == sesiones_table.c.id)
+        .where(asistentes_sesion.c.usuario_id == usuario_id)
+        .order_by(sesiones_table.c.fecha_inicio, sesiones_table.c.id)
+    )
+
+def mis_sesiones_service(usuario_id, desde=None, hasta=None, page=None, per_page=None):
+    """Sesiones del usuario ordenadas por inicio, con filtro opcional [desde, hasta) y paginación.
+
+    Una sesión entra en el rango si se solapa con él. Con ``settings.AGENDA_CACHE_TTL`` > 0 se
+    guarda la agenda completa del usuario ya serializada y las páginas se cortan de ella; la
+    invalidan solo los registros del usuario y los cambios en sesiones en las que está inscrito.
+    """
+    try:
+        desde = parsear_fecha(desde, "desde")
+        hasta = parsear_fecha(hasta, "hasta")
+    except ValueError as ve:
+        return {"message": str(ve)}, 400
+    page = max(page or 1, 1)
+    per_page = min(max(per_page or 10, 1), settings.MAX_PER_PAGE)
+
+    if agenda_cacheada():
+        agenda, _ = cacheado(
+            [grupo_agenda(usuario_id)], "agenda",
+            lambda: ({"sesiones": dump_filas(SesionSchema, db.session.execute(consulta_agenda(usuario_id)).fetchall())}, 200),
+            ttl=settings.AGENDA_CACHE_TTL
+        )
+        # Las fechas serializadas son ISO 8601 en UTC: se comparan como texto
+        sesiones = agenda["sesiones"]
+        if desde is not None:
+            sesiones = [s for s in sesiones if s["fecha_fin"] > desde.isoformat()]
+        if hasta is not None:
+            sesiones = [s for s in sesiones if s["fecha_inicio"] < hasta.isoformat()]
+        inicio = (page - 1) * per_page
+        pagina = sesiones[inicio:inicio + per_page + 1]
+    else:
+        stmt = consulta_agenda(usuario_id)
+        if desde is not None:
+            stmt = stmt.where(sesiones_table.c.fecha_fin > desde)
+        if hasta is not None:
+            stmt = stmt.where(sesiones_table.c.fecha_inicio < hasta)
+        # Una fila de más indica si hay otra página, sin una consulta de conteo
+        filas = db.session.execute(stmt.offset((page - 1) * per_page).limit(per_page + 1)).fetchall()
+        pagina = dump_filas(SesionSchema, filas)
+
+    return {
+        "sesiones": pagina[:per_page],
+        "page": page,
+        "per_page": per_page,
+        "hay_mas": len(pagina) > per_page
+    }, 200
+
+
+def sesiones_disponibles_service(usuario_id, evento_id):
+    """Sesiones del evento en las que el usuario aún puede registrarse y sus huecos libres.
+
+    Tres consultas fijas: el evento (con el registro del usuario), los horarios ocupados del
+    usuario dentro del horario del evento y las sesiones del evento con cupo. Los ocupados se
+    fusionan en intervalos disjuntos y cada sesión se comprueba con una búsqueda binaria, así
+    que el coste no depende de cuántas sesiones tenga el usuario en otros eventos.
+    """
+    registrado = (
+        select(asistentes_evento.c.usuario_id)
+        .where((asistentes_evento.c.usuario_id == usuario_id) & (asistentes_evento.c.evento_id == evento_id))
+        .exists()
+    )
+    stmt_evento = select(eventos_table.c.fecha_inicio, eventos_table.c.fecha_fin, registrado.label("registrado")).where(
+        eventos_table.c.id == evento_id
+    )
+    evento = db.session.execute(stmt_evento).fetchone()
+    if not evento:
+        return {"message": "Evento no encontrado"}, 404
+    if not evento.registrado:
+        return {"message": "El usuario no está registrado en el evento"}, 400
+
+    stmt_ocupados = (
+        select(sesiones_table.c.fecha_inicio, sesiones_table.c.fecha_fin)
+        .select_from(asistentes_sesion.join(sesiones_table, sesiones_table.c.id == asistentes_sesion.c.sesion_id))
+        .where((asistentes_sesion.c.usuario_id == usuario_id) & solapa_con(evento.fecha_inicio, evento.fecha_fin))
+    )
+    ocupados = fusionar_intervalos(tuple(fila) for fila in db.session.execute(stmt_ocupados))
+
+    # Con cupo; las ya registradas quedan fuera porque se solapan consigo mismas
+    stmt_sesiones = (
+        select(sesiones_table)
+        .where(
+            (sesiones_table.c.evento_id == evento_id) &
+            (sesiones_table.c.asistentes_actuales < sesiones_table.c.capacidad_maxima)
+        )
+        .order_by(sesiones_table.c.fecha_inicio, sesiones_table.c.id)
+    )
+    disponibles = [
+        sesion_con_capacidad(sesion)
+        for sesion in db.session.execute(stmt_sesiones)
+        if not solapa_fusionados(ocupados, sesion.fecha_inicio, sesion.fecha_fin)
+    ]
+
+    return {
+        "sesiones": disponibles,
+        "huecos_libres": [
+            {"fecha_inicio": inicio, "fecha_fin": fin}
+            for inicio, fin in huecos_libres(ocupados, evento.fecha_inicio, evento.fecha_fin)
+        ]
+    }, 200
+
+
+def consulta_asistencias(sesion_id=None, evento_id=None):
     stmt = (
         select(
             usuarios_table.c.id.label("usuario_id"),
@@ -188,7 +614,15 @@ def listar_asistencias_service():
             .join(sesiones_table, asistentes_sesion.c.sesion_id == sesiones_table.c.id)
         )
     )
-    resultados = db.session.execute(stmt).fetchall()
+    if sesion_id is not None:
+        stmt = stmt.where(asistentes_sesion.c.sesion_id == sesion_id)
+    if evento_id is not None:
+        stmt = stmt.where(sesiones_table.c.evento_id == evento_id)
+    return stmt
+
+
+def listar_asistencias_service():
+    resultados = db.session.execute(consulta_asistencias()).fetchall()
     asistencias = []
     for row in resultados:
         asistencias.append({
@@ -196,11 +630,69 @@ def listar_asistencias_service():
             "email": row.email,
             "sesion_id": row.sesion_id,
             "nombre_sesion": row.nombre_sesion,
-            "fecha_inicio": row.fecha_inicio.isoformat(),
+            "fecha_inicio": row.fecha_inicio,
         })
     return {"asistencias": asistencias}, 200
 
 
+# Filas leídas por cada viaje al cursor del servidor durante la exportación
+FILAS_POR_LOTE_EXPORTACION = 1000
+COLUMNAS_EXPORTACION = ["usuario_id", "email", "sesion_id", "nombre_sesion", "fecha_inicio"]
+FORMATOS_EXPORTACION = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def exportar_asistencias_service(formato="ndjson", sesion_id=None, evento_id=None):
+    """Exporta las asistencias como NDJSON o CSV en streaming.
+
+    Las filas se leen con un cursor del lado del servidor (``yield_per``) y se escriben
+    directamente en la respuesta, por lo que la memoria no crece con el número de filas.
+    """
+    if formato not in FORMATOS_EXPORTACION:
+        return {"message": "Formato no soportado, use 'ndjson' o 'csv'"}, 400
+
+    stmt = consulta_asistencias(sesion_id, evento_id).execution_options(
+        stream_results=True, yield_per=FILAS_POR_LOTE_EXPORTACION
+    )
+
+    def generar():
+        resultado = db.session.execute(stmt)
+        try:
+            if formato == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(COLUMNAS_EXPORTACION)
+                for particion in resultado.partitions():
+                    writer.writerows(
+                        (row.usuario_id, row.email, row.sesion_id, row.nombre_sesion, row.fecha_inicio.isoformat())
+                        for row in particion
+                    )
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                for particion in resultado.partitions():
+                    yield "".join(
+                        json.dumps({
+                            "usuario_id": row.usuario_id,
+                            "email": row.email,
+                            "sesion_id": row.sesion_id,
+                            "nombre_sesion": row.nombre_sesion,
+                            "fecha_inicio": row.fecha_inicio.isoformat(),
+                        }, ensure_ascii=False) + "\n"
+                        for row in particion
+                    )
+        finally:
+            resultado.close()
+
+    nombre_archivo = f"asistencias.{formato}"
+    return Response(
+        stream_with_context(generar()),
+        mimetype=FORMATOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f"attachment; filename={nombre_archivo}"}
+    )
+
+
 def asignar_ponente_service(sesion_id, data):
     ponente = data.get("ponente")
     if not ponente:
@@ -211,13 +703,46 @@ def asignar_ponente_service(sesion_id, data):
         .values(ponente=ponente)
     )
     result = db.session.execute(stmt)
+    inscritos = inscritos_en_sesiones(sesiones_table.c.id == sesion_id) if result.rowcount else []
     db.session.commit()
     if result.rowcount == 0:
         return {"message": "Sesión no encontrada"}, 404
+    invalidar_cache("sesiones")
+    invalidar_agendas(inscritos)
     return {"message": f"Ponente asignado a la sesión {sesion_id}"}, 200
 
 
+def version_sesiones_evento(evento_id):
+    """Versión de las sesiones de un evento: (id, version) de cada fila."""
+    stmt = (
+        select(sesiones_table.c.id, sesiones_table.c.version)
+        .where(sesiones_table.c.evento_id == evento_id)
+        .order_by(sesiones_table.c.id)
+    )
+    return [tuple(fila) for fila in db.session.execute(stmt)]
+
+def version_sesiones_eventos(evento_ids):
+    """Versión de las sesiones de varios eventos: (evento_id, id, version) de cada fila."""
+    stmt = select(sesiones_table.c.evento_id, sesiones_table.c.id, sesiones_table.c.version)
+    filas = []
+    for bloque in en_bloques(list(evento_ids)):
+        filas.extend(tuple(fila) for fila in db.session.execute(stmt.where(sesiones_table.c.evento_id.in_(bloque))))
+    return sorted(filas)
+
+def sesiones_por_evento(evento_ids):
+    """Sesiones serializadas de varios eventos, agrupadas por evento_id (una consulta IN por bloque)."""
+    agrupadas = {evento_id: [] for evento_id in evento_ids}
+    stmt = select(sesiones_table).order_by(sesiones_table.c.fecha_inicio, sesiones_table.c.id)
+    for bloque in en_bloques(list(agrupadas)):
+        filas = db.session.execute(stmt.where(sesiones_table.c.evento_id.in_(bloque))).fetchall()
+        for fila, sesion in zip(filas, dump_filas(SesionSchema, filas)):
+            agrupadas[fila.evento_id].append(sesion)
+    return agrupadas
+
 def obtener_sesiones_evento_service(evento_id):
+    return cacheado(["sesiones"], f"evento:{evento_id}", lambda: _obtener_sesiones_evento(evento_id))
+
+def _obtener_sesiones_evento(evento_id):
     stmt = select(sesiones_table).where(sesiones_table.c.evento_id == evento_id)
     sesiones = db.session.execute(stmt).fetchall()
-    return SesionSchema(many=True).dump([dict(s._mapping) for s in sesiones]), 200
\ No newline at end of file
+    return dump_filas(SesionSchema, sesiones), 200
\ No newline at end of file
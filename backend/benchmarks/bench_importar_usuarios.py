@@ -0,0 +1,75 @@
+"""Benchmark de importación de usuarios: usuarios/segundo según los procesos de hash.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_importar_usuarios [--usuarios 2000] [--procesos 1 2 4] [--url postgresql+psycopg2://...]
+
+Sin --url usa una base SQLite temporal. El coste lo domina PASSWORD_HASH_METODO; la
+estimación para 100 000 cuentas se extrapola del ritmo medido.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from flask import Flask
+
+from app import db
+from app.core import contrasenas
+from app.core.config import settings
+from app.models.shared import metadata
+from app.services.auth import BLOQUE_IMPORTACION_USUARIOS, importar_usuarios_service
+from app.services.lotes import en_bloques
+
+
+def crear_app(url):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    if url.startswith("sqlite"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 60, "check_same_thread": False}}
+    db.init_app(app)
+    return app
+
+
+def medir(app, usuarios, procesos):
+    with app.app_context():
+        metadata.drop_all(db.engine)
+        metadata.create_all(db.engine)
+
+    settings.PASSWORD_HASH_PROCESOS = procesos
+    filas = [{"email": f"user{i}@example.com", "password": f"secreto{i}"} for i in range(usuarios)]
+    try:
+        contrasenas.hashear_varios(["calentamiento"] * max(procesos, 1))  # Arranque del pool fuera de la medida
+        inicio = time.perf_counter()
+        with app.app_context():
+            creados = sum(
+                importar_usuarios_service({"usuarios": bloque}, max_usuarios=None)[0]["creados"]
+                for bloque in en_bloques(filas, BLOQUE_IMPORTACION_USUARIOS)
+            )
+        duracion = time.perf_counter() - inicio
+    finally:
+        contrasenas.cerrar_pool()
+
+    assert creados == usuarios, "no todos los usuarios fueron creados"
+    return usuarios / duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=2000)
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    url = args.url or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+    app = crear_app(url)
+
+    print(f"método: {settings.PASSWORD_HASH_METODO}")
+    print(f"{'procesos':<10}{'usuarios/s':>12}{'100k (min)':>12}")
+    for procesos in args.procesos:
+        ritmo = medir(app, args.usuarios, procesos)
+        print(f"{procesos:<10}{ritmo:>12.0f}{100000 / ritmo / 60:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark del coste por petición del limitador (ventanas por IP y por email) en memoria.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_limites [--peticiones 50000] [--clientes 1000]
+"""
+import argparse
+import timeit
+from unittest.mock import patch
+
+from flask import Flask
+
+from app.core import limites
+from app.core.config import settings
+from app.core.limites import MemoriaLimitador, limitar
+
+
+@limitar("bench")
+def ruta():
+    return {}, 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=50000)
+    parser.add_argument("--clientes", type=int, default=1000, help="IPs y emails distintos")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    contextos = [
+        app.test_request_context("/", method="POST", json={"email": f"user{i}@example.com", "password": "x"},
+                                 environ_base={"REMOTE_ADDR": f"10.0.{i // 256}.{i % 256}"})
+        for i in range(args.clientes)
+    ]
+
+    def ejecutar(funcion):
+        def bucle():
+            for i in range(args.peticiones):
+                with contextos[i % len(contextos)]:
+                    funcion()
+        return bucle
+
+    base = min(timeit.repeat(ejecutar(ruta.__wrapped__), number=1, repeat=3))
+    # Límites que nunca se alcanzan: se mide el camino completo de una petición aceptada
+    configuracion = {"bench": {"ip": "1000000/minuto", "email": "1000000/minuto"}}
+    with patch.object(settings, "LIMITES_PETICIONES", configuracion), \
+            patch.object(limites, "_limitador", MemoriaLimitador()):
+        con_limites = min(timeit.repeat(ejecutar(ruta), number=1, repeat=3))
+
+    print(f"limitador: {(con_limites - base) / args.peticiones * 1e6:.1f} µs/petición "
+          f"(ip + email, {args.clientes} clientes, {args.peticiones} peticiones)")
+
+
+if __name__ == "__main__":
+    main()
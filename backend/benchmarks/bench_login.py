@@ -0,0 +1,115 @@
+"""Benchmark de inicio de sesión bajo carga mixta: hash en el worker frente al pool de procesos.
+
+Varios hilos (como los de un worker gthread de gunicorn) inician sesión sin parar mientras
+otros hacen GET ligeros autenticados. Se mide el rendimiento de los logins y la latencia
+p99 de ambos tipos de petición.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_login [--segundos 5] [--hilos-login 4] [--hilos-get 4] [--procesos 2]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from flask import Flask
+from flask_restx import Api
+from sqlalchemy import insert
+
+from app import db
+from app.core import contrasenas
+from app.core.config import settings
+from app.core.representaciones import registrar_representaciones
+from app.models.shared import metadata
+from app.models.usuarios import usuarios_table
+from app.routes.auth import auth_ns
+
+
+def crear_app(ruta, usuarios):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{ruta}"
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 60, "check_same_thread": False}}
+    db.init_app(app)
+    api = Api(app)
+    registrar_representaciones(api)
+    api.add_namespace(auth_ns, path="/api/auth")
+    with app.app_context():
+        metadata.create_all(db.engine, tables=[usuarios_table])
+        password_hash = contrasenas.hashear("clave-del-benchmark")
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": password_hash} for i in range(1, usuarios + 1)
+        ])
+        db.session.commit()
+    return app
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else float("nan")
+
+
+def medir(app, segundos, hilos_login, hilos_get, usuarios):
+    cliente = app.test_client()
+    token = cliente.post("/api/auth/login", json={"email": "user1@example.com", "password": "clave-del-benchmark"}).get_json()["token"]
+    latencias = {"login": [], "get": []}
+    rechazados = []  # Respuestas de login distintas de 200: invalidan la medición
+    fin = time.perf_counter() + segundos
+
+    def login(n):
+        cliente = app.test_client()
+        i = n
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            response = cliente.post("/api/auth/login", json={"email": f"user{i % usuarios + 1}@example.com", "password": "clave-del-benchmark"})
+            latencias["login"].append(time.perf_counter() - inicio)
+            if response.status_code != 200:
+                rechazados.append(response.status_code)
+            i += hilos_login
+
+    def get(_):
+        cliente = app.test_client()
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            cliente.get("/api/auth/tokens/estadisticas", headers={"Authorization": f"Bearer {token}"})
+            latencias["get"].append(time.perf_counter() - inicio)
+
+    hilos = [threading.Thread(target=login, args=(n,)) for n in range(hilos_login)]
+    hilos += [threading.Thread(target=get, args=(n,)) for n in range(hilos_get)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not rechazados, f"{len(rechazados)} logins fallidos (códigos {sorted(set(rechazados))})"
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segundos", type=float, default=5)
+    parser.add_argument("--hilos-login", type=int, default=4)
+    parser.add_argument("--hilos-get", type=int, default=4)
+    parser.add_argument("--procesos", type=int, default=2, help="PASSWORD_HASH_PROCESOS del modo con pool")
+    parser.add_argument("--usuarios", type=int, default=50)
+    args = parser.parse_args()
+
+    settings.JWT_SECRET_KEY = "clave-de-benchmark-de-al-menos-32-bytes"
+    settings.LIMITES_ACTIVOS = False  # Sin límites de peticiones: se mide el hash, no los 429
+    print(f"{'modo':<12}{'logins/s':>10}{'p99 login ms':>14}{'GET/s':>10}{'p99 GET ms':>12}  ({settings.PASSWORD_HASH_METODO})")
+    for nombre, procesos in (("en worker", 0), (f"pool x{args.procesos}", args.procesos)):
+        with tempfile.TemporaryDirectory() as directorio, patch.object(settings, "PASSWORD_HASH_PROCESOS", procesos):
+            app = crear_app(os.path.join(directorio, "bench.db"), args.usuarios)
+            contrasenas.hashear("calentar")  # Arranca el pool fuera de la medición
+            latencias = medir(app, args.segundos, args.hilos_login, args.hilos_get, args.usuarios)
+            contrasenas.cerrar_pool()
+            with app.app_context():
+                db.engine.dispose()
+        print(
+            f"{nombre:<12}{len(latencias['login']) / args.segundos:>10.1f}{percentil(latencias['login'], 0.99) * 1000:>14.1f}"
+            f"{len(latencias['get']) / args.segundos:>10.1f}{percentil(latencias['get'], 0.99) * 1000:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
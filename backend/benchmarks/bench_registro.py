@@ -0,0 +1,92 @@
+"""Benchmark de registros/segundo: registro normal frente al modo de alta demanda.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_registro [--usuarios 5000] [--hilos 16] [--url postgresql+psycopg2://...]
+
+Sin --url usa una base SQLite temporal.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+
+from flask import Flask
+from sqlalchemy import insert
+
+from app import db
+from app.core.asientos import MemoriaAsientosStore
+from app.models.shared import metadata
+from app.models.eventos import eventos_table
+from app.models.usuarios import usuarios_table
+from app.services.alta_demanda import volcar_registros
+from app.services.eventos import registrarse_evento_service
+
+
+def crear_app(url):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    if url.startswith("sqlite"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"connect_args": {"timeout": 60, "check_same_thread": False}}
+    db.init_app(app)
+    return app
+
+
+def preparar(app, usuarios, alta_demanda):
+    with app.app_context():
+        metadata.drop_all(db.engine)
+        metadata.create_all(db.engine)
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Benchmark", capacidad_maxima=usuarios, alta_demanda=alta_demanda,
+            fecha_inicio=datetime(2025, 6, 1, 10), fecha_fin=datetime(2025, 6, 1, 12)
+        ))
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": "x"} for i in range(1, usuarios + 1)
+        ])
+        db.session.commit()
+
+
+def medir(app, usuarios, hilos, alta_demanda):
+    preparar(app, usuarios, alta_demanda)
+
+    def registrar(usuario_id):
+        with app.app_context():
+            return registrarse_evento_service({"id": usuario_id}, 1)[1]
+
+    with patch("app.core.asientos._store", MemoriaAsientosStore()):
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=hilos) as executor:
+            codigos = list(executor.map(registrar, range(1, usuarios + 1)))
+        if alta_demanda:
+            with app.app_context():
+                volcar_registros()  # El volcado final cuenta dentro del tiempo medido
+        duracion = time.perf_counter() - inicio
+
+    assert codigos.count(200) == usuarios, "no todos los registros fueron aceptados"
+    return usuarios / duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=5000)
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--url", default=None, help="URL de base de datos (por defecto SQLite temporal)")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp()
+    url = args.url or f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+    app = crear_app(url)
+
+    normal = medir(app, args.usuarios, args.hilos, alta_demanda=False)
+    rapido = medir(app, args.usuarios, args.hilos, alta_demanda=True)
+
+    print(f"{'modo':<16}{'registros/s':>14}")
+    print(f"{'normal':<16}{normal:>14.0f}")
+    print(f"{'alta demanda':<16}{rapido:>14.0f}")
+    print(f"aceleración: x{rapido / normal:.1f}")
+
+
+if __name__ == "__main__":
+    main()
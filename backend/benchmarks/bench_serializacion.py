@@ -0,0 +1,59 @@
+"""Benchmark de serialización de páginas de eventos: marshmallow frente a los serializadores compilados.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serializacion [--filas 100] [--repeticiones 2000]
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+
+from app.models.shared import metadata
+from app.models.eventos import eventos_table
+from app.schemas.eventos import EventoSchema
+from app.schemas.compilados import dump_filas
+
+
+def cargar_filas(filas):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine, tables=[eventos_table])
+    with engine.begin() as conn:
+        conn.execute(insert(eventos_table), [
+            {"id": i, "nombre": f"Evento {i}", "descripcion": "Descripción del evento",
+             "capacidad_maxima": 100, "fecha_inicio": datetime(2025, 6, 1, 10), "fecha_fin": datetime(2025, 6, 1, 12)}
+            for i in range(1, filas + 1)
+        ])
+        return conn.execute(select(eventos_table)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filas", type=int, default=100)
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    filas = cargar_filas(args.filas)
+
+    def marshmallow():
+        return EventoSchema(many=True).dump([dict(fila._mapping) for fila in filas])
+
+    def compilado():
+        return dump_filas(EventoSchema, filas)
+
+    assert json.dumps(marshmallow()) == json.dumps(compilado()), "las salidas difieren"
+
+    resultados = {}
+    for nombre, funcion in (("marshmallow", marshmallow), ("compilado", compilado)):
+        segundos = min(timeit.repeat(funcion, number=args.repeticiones, repeat=3))
+        resultados[nombre] = args.repeticiones / segundos
+
+    print(f"{'serializador':<16}{'páginas/s':>14}  ({args.filas} filas por página)")
+    for nombre, paginas in resultados.items():
+        print(f"{nombre:<16}{paginas:>14.0f}")
+    print(f"aceleración: x{resultados['compilado'] / resultados['marshmallow']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark del coste por petición de token_required: con y sin la caché de tokens verificados.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_token [--peticiones 20000] [--clientes 100]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import jwt
+from flask import Flask
+
+from app.core import auth
+from app.core.auth import TokenCache, token_required
+from app.core.config import settings
+
+
+@token_required
+def ruta(current_user):
+    return current_user, 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=20000)
+    parser.add_argument("--clientes", type=int, default=100, help="Tokens distintos en circulación")
+    args = parser.parse_args()
+
+    settings.JWT_SECRET_KEY = "clave-de-benchmark-de-al-menos-32-bytes"
+    exp = datetime.now(timezone.utc) + timedelta(hours=1)
+    tokens = [
+        jwt.encode({"sub": str(i), "exp": exp}, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
+        for i in range(1, args.clientes + 1)
+    ]
+    app = Flask(__name__)
+    contextos = [app.test_request_context("/", headers={"Authorization": f"Bearer {t}"}) for t in tokens]
+
+    def ejecutar():
+        for i in range(args.peticiones):
+            with contextos[i % len(contextos)]:
+                ruta()
+
+    def sin_decorador():
+        for i in range(args.peticiones):
+            with contextos[i % len(contextos)]:
+                ruta.__wrapped__(current_user={"id": 1})
+
+    resultados = {}
+    base = min(timeit.repeat(sin_decorador, number=1, repeat=3))
+    for nombre, max_entradas in (("sin caché", 0), ("con caché", 10000)):
+        with patch.object(settings, "JWT_CACHE_MAX_ENTRADAS", max_entradas), \
+                patch.object(auth, "_token_cache", TokenCache(max_entradas)):
+            segundos = min(timeit.repeat(ejecutar, number=1, repeat=3))
+        resultados[nombre] = (segundos - base) / args.peticiones * 1e6
+
+    print(f"{'token_required':<16}{'µs/petición':>14}  ({args.clientes} tokens, {args.peticiones} peticiones)")
+    for nombre, microsegundos in resultados.items():
+        print(f"{nombre:<16}{microsegundos:>14.1f}")
+    print(f"aceleración: x{resultados['sin caché'] / resultados['con caché']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,118 @@ from unittest.mock import patch
 from flask import Flask
 from app import db
 
+# Caché de lectura nueva para cada prueba
+@pytest.fixture(autouse=True)
+def cache():
+    from app.core.cache import MemoriaCache
+
+    cache = MemoriaCache()
+    with patch('app.core.cache._cache', cache):
+        yield cache
+
+# Caché de tokens verificados nueva para cada prueba
+@pytest.fixture(autouse=True)
+def token_cache():
+    from app.core.auth import TokenCache
+
+    cache = TokenCache()
+    with patch('app.core.auth._token_cache', cache), patch('app.core.auth._comprobaciones_revocacion', []):
+        yield cache
+
+# Limitador de peticiones nuevo para cada prueba
+@pytest.fixture(autouse=True)
+def limitador():
+    from app.core.limites import MemoriaLimitador
+
+    limitador = MemoriaLimitador()
+    with patch('app.core.limites._limitador', limitador):
+        yield limitador
+
+# Registro de tokens revocados nuevo para cada prueba (el filtro se carga de la base de datos de la prueba)
+@pytest.fixture(autouse=True)
+def revocaciones():
+    from app.services.revocaciones import RevocacionesTokens
+
+    revocaciones = RevocacionesTokens(capacidad=1000)
+    with patch('app.services.revocaciones._revocaciones', revocaciones):
+        yield revocaciones
+
+# Contraseñas en el propio proceso (las pruebas del pool lo activan explícitamente)
+@pytest.fixture(autouse=True)
+def sin_pool_contrasenas(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_PROCESOS", 0)
+
 # Fixture para la aplicación Flask
 @pytest.fixture
 def app():
     app = Flask(__name__)
     return app
 
+# Fixture para una aplicación con una base de datos SQLite real (en archivo temporal)
+@pytest.fixture
+def db_app(tmp_path):
+    from app.models.shared import metadata
+    import app.models.associations, app.models.eventos, app.models.sesiones, app.models.usuarios, app.models.tokens  # noqa: F401 (registra las tablas)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {"connect_args": {"timeout": 30, "check_same_thread": False}}
+    db.init_app(app)
+    with app.app_context():
+        metadata.create_all(db.engine)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+# Fixture para un cliente HTTP con los namespaces de la API registrados sobre db_app
+@pytest.fixture
+def api_client(db_app):
+    from flask_restx import Api
+    from app.routes.eventos import evento_ns
+    from app.routes.auth import auth_ns
+    from app.routes.sesiones import sesion_ns
+    from app.core.representaciones import registrar_representaciones
+
+    api = Api(db_app)
+    registrar_representaciones(api)
+    api.add_namespace(evento_ns, path="/api/eventos")
+    api.add_namespace(auth_ns, path="/api/auth")
+    api.add_namespace(sesion_ns, path="/api/sesiones")
+    return db_app.test_client()
+
+# Fixture con cabeceras de autenticación válidas para api_client
+@pytest.fixture
+def auth_headers(monkeypatch):
+    import jwt
+    from datetime import datetime, timezone, timedelta
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "clave-de-pruebas-de-al-menos-32-bytes")
+    token = jwt.encode(
+        {"sub": "1", "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+# Fixture que registra cada sentencia SQL ejecutada contra db_app
+@pytest.fixture
+def contar_consultas(db_app):
+    from sqlalchemy import event
+
+    consultas = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    with db_app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _registrar)
+    yield consultas
+    event.remove(engine, "before_cursor_execute", _registrar)
+
 # Fixture para el cliente de prueba de Flask
 @pytest.fixture
 def client(app):
@@ -0,0 +1,151 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import insert, select, func
+from app import db
+from app.core.asientos import MemoriaAsientosStore, RESERVA_OK, RESERVA_DUPLICADO, RESERVA_LLENO
+from app.models.eventos import eventos_table
+from app.models.associations import asistentes_evento
+from app.models.usuarios import usuarios_table
+from app.services.alta_demanda import volcar_registros
+from app.services.eventos import registrarse_evento_service, validar_capacidad_evento_service
+
+# Asignador nuevo para cada prueba
+@pytest.fixture
+def store():
+    store = MemoriaAsientosStore()
+    with patch('app.core.asientos._store', store):
+        yield store
+
+@pytest.fixture
+def evento_alta_demanda(db_app, store):
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Lanzamiento", capacidad_maxima=25, alta_demanda=True,
+            fecha_inicio=datetime(2025, 6, 1, 10), fecha_fin=datetime(2025, 6, 1, 12)
+        ))
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": "x"} for i in range(1, 201)
+        ])
+        db.session.commit()
+    return db_app
+
+def _contar_registros():
+    registrados = db.session.execute(select(func.count()).select_from(asistentes_evento)).scalar()
+    contador = db.session.execute(select(eventos_table.c.asistentes_actuales)).scalar()
+    return registrados, contador
+
+# Pruebas para MemoriaAsientosStore
+def test_memoria_store_reservar():
+    store = MemoriaAsientosStore()
+    assert store.reservar(1, 10) is None  # Evento no cargado
+    store.cargar(1, 2, registrados=[10])
+    assert store.reservar(1, 10) == RESERVA_DUPLICADO
+    assert store.reservar(1, 11) == RESERVA_OK
+    assert store.reservar(1, 12) == RESERVA_OK
+    assert store.reservar(1, 13) == RESERVA_LLENO
+    assert store.disponibles(1) == 0
+    assert store.extraer_pendientes(10) == [(1, 11), (1, 12)]
+    store.liberar(1, 11)
+    assert store.disponibles(1) == 1
+
+def test_memoria_store_reencolar_conserva_orden():
+    store = MemoriaAsientosStore()
+    store.cargar(1, 5, registrados=[])
+    for usuario_id in (1, 2, 3):
+        store.reservar(1, usuario_id)
+    lote = store.extraer_pendientes(2)
+    store.reencolar(lote)
+    assert store.extraer_pendientes(10) == [(1, 1), (1, 2), (1, 3)]
+
+# Pruebas del modo de alta demanda de punta a punta
+def test_registro_alta_demanda_concurrente_y_volcado(evento_alta_demanda, store):
+    def registrar(usuario_id):
+        with evento_alta_demanda.app_context():
+            return registrarse_evento_service({"id": usuario_id}, 1)[1]
+
+    intentos = list(range(1, 201)) * 2
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        status_codes = list(executor.map(registrar, intentos))
+
+    assert status_codes.count(200) == 25
+    assert set(status_codes) == {200, 400}
+
+    with evento_alta_demanda.app_context():
+        # La capacidad refleja los registros aún no volcados
+        assert validar_capacidad_evento_service(1)[0]["capacidad_disponible"] == 0
+        assert volcar_registros() == 25
+        assert _contar_registros() == (25, 25)
+
+def test_volcado_omite_registros_existentes(evento_alta_demanda, store):
+    with evento_alta_demanda.app_context():
+        assert registrarse_evento_service({"id": 1}, 1)[1] == 200
+        assert registrarse_evento_service({"id": 2}, 1)[1] == 200
+        # Un registro llegó a la base de datos por otra vía antes del volcado
+        db.session.execute(insert(asistentes_evento).values(usuario_id=2, evento_id=1))
+        db.session.commit()
+
+        volcar_registros()
+        registrados, contador = _contar_registros()
+        assert registrados == 2
+        assert contador == 1  # Solo se contabiliza lo insertado por el volcado
+        assert store.pendientes() == 0
+
+def test_volcado_descarta_usuarios_eliminados(evento_alta_demanda, store):
+    from sqlalchemy import delete, event
+
+    with evento_alta_demanda.app_context():
+        # Claves foráneas activas en SQLite, como en Postgres
+        engine = db.engine
+        engine.dispose()
+        event.listen(engine, "connect", lambda conexion, _: conexion.execute("PRAGMA foreign_keys=ON"))
+        for usuario_id in (1, 2, 3):
+            assert registrarse_evento_service({"id": usuario_id}, 1)[1] == 200
+        db.session.execute(delete(usuarios_table).where(usuarios_table.c.id == 2))
+        db.session.commit()
+
+        assert volcar_registros() == 3
+        assert _contar_registros() == (2, 2)
+        assert store.pendientes() == 0
+
+def test_fallo_del_volcado_no_rechaza_la_reserva(evento_alta_demanda, store, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ALTA_DEMANDA_LOTE", 1)
+    with evento_alta_demanda.app_context():
+        with patch('app.services.alta_demanda._insertar_lote', side_effect=RuntimeError("sin conexión")):
+            assert registrarse_evento_service({"id": 1}, 1)[1] == 200
+        assert store.pendientes() == 1  # Sigue pendiente para el próximo volcado
+        assert volcar_registros() == 1
+        assert _contar_registros() == (1, 1)
+
+def test_alta_demanda_con_varios_workers_exige_redis(evento_alta_demanda, store, monkeypatch):
+    from app.core.config import settings
+    from app.schemas.eventos import EventoCreateSchema
+
+    monkeypatch.setattr(settings, "WORKERS", 4)
+    datos = {"nombre": "Otro", "capacidad_maxima": 10, "alta_demanda": True,
+             "fecha_inicio": "2025-06-01T10:00:00", "fecha_fin": "2025-06-01T12:00:00"}
+    with pytest.raises(Exception, match="ASIENTOS_BACKEND=redis"):
+        EventoCreateSchema().load(datos)
+    with evento_alta_demanda.app_context():
+        result, status_code = registrarse_evento_service({"id": 1}, 1)
+        assert status_code == 500
+        assert "ASIENTOS_BACKEND=redis" in result["message"]
+        assert not store.cargado(1)
+        assert _contar_registros() == (0, 0)
+
+    monkeypatch.setattr(settings, "ASIENTOS_BACKEND", "redis")
+    assert EventoCreateSchema().load(datos)["alta_demanda"] is True
+
+def test_fallo_del_volcado_no_rechaza_el_lote(evento_alta_demanda, store):
+    from app.services.eventos import registrar_lote_evento_service
+
+    with evento_alta_demanda.app_context():
+        with patch('app.services.alta_demanda._insertar_lote', side_effect=RuntimeError("sin conexión")):
+            result, status_code = registrar_lote_evento_service(1, {"usuario_ids": [1, 2, 3]})
+        assert (status_code, result["registrados"]) == (200, 3)
+        assert store.pendientes() == 3  # Siguen pendientes para el próximo volcado
+        assert volcar_registros() == 3
+        assert _contar_registros() == (3, 3)
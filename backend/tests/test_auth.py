@@ -1,7 +1,6 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, call, patch
 from datetime import datetime, timezone, timedelta
-import jwt
 from app.services.auth import register_user_service, login_user_service
 from app.core.config import settings
 
@@ -25,7 +24,8 @@ def existing_user():
             "id": 1,
             "email": "existing@example.com",
             "password_hash": "hashedpassword"
-        }
+        },
+        password_hash="hashedpassword"
     )
 
 @pytest.fixture
@@ -46,14 +46,15 @@ def test_register_user_success(mock_db_session, user_data):
     mock_db_session.execute.assert_called()
     mock_db_session.commit.assert_called_once()
 
-def test_register_user_existing_email(mock_db_session, user_data, existing_user):
-    # Configurar el mock para simular que el usuario ya existe
-    mock_db_session.execute.return_value.fetchone.return_value = existing_user
+def test_register_user_existing_email(mock_db_session, user_data):
+    # Configurar el mock para simular que el INSERT no devuelve filas (ON CONFLICT DO NOTHING)
+    mock_db_session.execute.return_value.scalars.return_value.all.return_value = []
     
     result, status_code = register_user_service(user_data)
     
     assert status_code == 400
     assert result["message"] == "Email already exists"
+    mock_db_session.execute.assert_called_once()  # Sin SELECT previo
     mock_db_session.commit.assert_not_called()
 
 def test_register_user_invalid_data(mock_db_session):
@@ -76,9 +77,10 @@ def test_login_user_success(mock_db_session, user_data, existing_user, mock_jwt_
     
     assert status_code == 200
     assert "token" in result
+    assert "refresh_token" in result
     assert "user" in result
     assert result["token"] == "mocked.jwt.token"
-    mock_jwt_encode.assert_called_once()
+    assert mock_jwt_encode.call_count == 2  # Token de acceso y token de refresco
 
 def test_login_user_invalid_credentials(mock_db_session, user_data):
     # Configurar mock para simular usuario no encontrado
@@ -114,16 +116,27 @@ def test_login_user_token_generation(mock_db_session, user_data, existing_user):
     assert status_code == 200
     assert result["token"] == "generated.token"
 
+    assert result["refresh_token"] == "generated.token"
+
     # Verificar que se llamó a jwt.encode con los parámetros correctos
-    expected_payload = {
+    expected_access = {
         'sub': '1',  # user.id como string
-        'exp': fixed_time + timedelta(hours=10)  # Usar el tiempo simulado
+        'exp': fixed_time + timedelta(minutes=settings.ACCESS_TOKEN_MINUTOS),  # Usar el tiempo simulado
+        'jti': ANY,
+        'tipo': 'access'
     }
-    jwt_mock.assert_called_once_with(
-        expected_payload,
-        settings.JWT_SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
+    expected_refresh = {
+        'sub': '1',
+        'exp': fixed_time + timedelta(days=settings.REFRESH_TOKEN_DIAS),
+        'jti': ANY,
+        'tipo': 'refresh'
+    }
+    assert jwt_mock.call_args_list == [
+        call(expected_access, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM),
+        call(expected_refresh, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM),
+    ]
+    jtis = [llamada.args[0]['jti'] for llamada in jwt_mock.call_args_list]
+    assert jtis[0] != jtis[1]
 
 # Pruebas para casos extremos
 def test_register_user_empty_password(mock_db_session):
@@ -156,4 +169,192 @@ def test_register_user_invalid_email(mock_db_session):
         "password": "validpass123"
     })
     assert status_code == 400
-    assert "email" in result["errors"]
\ No newline at end of file
+    assert "email" in result["errors"]
+# Pruebas del hash de contraseñas (app.core.contrasenas)
+@pytest.fixture
+def metodo_barato(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_METODO", "pbkdf2:sha256:1000")
+
+def test_hash_en_pool_de_procesos(monkeypatch, metodo_barato):
+    from app.core import contrasenas
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_PROCESOS", 1)
+    try:
+        password_hash = contrasenas.hashear("secreto")
+        assert password_hash.startswith("pbkdf2:sha256:1000$")
+        assert contrasenas.verificar(password_hash, "secreto") is True
+        assert contrasenas.verificar(password_hash, "otro") is False
+        assert contrasenas.get_pool() is contrasenas.get_pool()
+    finally:
+        contrasenas.cerrar_pool()
+
+@pytest.mark.parametrize("password_hash, esperado", [
+    ("pbkdf2:sha256:1000$sal$hash", False),
+    ("pbkdf2:sha256:600000$sal$hash", True),
+    ("scrypt:32768:8:1$sal$hash", True),
+    ("hashedpassword", False),  # Formato desconocido: no se toca
+])
+def test_necesita_rehash(metodo_barato, password_hash, esperado):
+    from app.core.contrasenas import necesita_rehash
+
+    assert necesita_rehash(password_hash) is esperado
+
+def test_login_actualiza_hash_antiguo(db_app, monkeypatch, metodo_barato):
+    from sqlalchemy import insert, select
+    from werkzeug.security import generate_password_hash
+    from app import db
+    from app.models.usuarios import usuarios_table
+
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "clave-de-pruebas-de-al-menos-32-bytes")
+    credenciales = {"email": "test@example.com", "password": "securepassword123"}
+    with db_app.app_context():
+        db.session.execute(insert(usuarios_table).values(
+            id=1, email=credenciales["email"], password_hash=generate_password_hash(credenciales["password"], "pbkdf2:sha256:500")
+        ))
+        db.session.commit()
+
+        assert login_user_service(credenciales)[1] == 200
+        password_hash = db.session.execute(select(usuarios_table.c.password_hash)).scalar()
+        assert password_hash.startswith("pbkdf2:sha256:1000$")
+
+        # Con el hash ya actualizado el inicio de sesión sigue funcionando y no se reescribe
+        assert login_user_service(credenciales)[1] == 200
+        assert db.session.execute(select(usuarios_table.c.password_hash)).scalar() == password_hash
+
+def test_hashear_varios_en_pool_conserva_el_orden(monkeypatch, metodo_barato):
+    from app.core import contrasenas
+    from werkzeug.security import check_password_hash
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_PROCESOS", 2)
+    passwords = [f"secreto{i}" for i in range(20)]
+    try:
+        hashes = contrasenas.hashear_varios(passwords)
+    finally:
+        contrasenas.cerrar_pool()
+    assert all(check_password_hash(h, p) for h, p in zip(hashes, passwords))
+
+# Pruebas del registro con INSERT ... ON CONFLICT DO NOTHING y de la importación de usuarios
+def test_register_un_insert_y_email_duplicado(db_app, api_client, metodo_barato, contar_consultas):
+    datos = {"email": "nuevo@example.com", "password": "securepassword123"}
+    with patch('app.services.auth.UsuarioCreateSchema.load', autospec=True, side_effect=lambda self, d: d) as mock_load:
+        assert api_client.post("/api/auth/register", json=datos).status_code == 201
+    assert mock_load.call_count == 1  # Una sola validación por petición
+    assert [c.split()[0] for c in contar_consultas] == ["INSERT"]
+
+    response = api_client.post("/api/auth/register", json=datos)
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Email already exists"}
+
+def test_insertar_usuarios_usa_el_dialecto_del_engine(mock_db_session):
+    from sqlalchemy.dialects import postgresql
+    from app.services.auth import _insertar_usuarios
+
+    mock_db_session.get_bind.return_value.dialect.name = "postgresql"
+    _insertar_usuarios([{"email": "a@example.com", "password_hash": "h"}])
+    stmt = mock_db_session.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (email) DO NOTHING RETURNING usuarios.email" in sql
+
+def _usuarios_en_bd(db_app):
+    from sqlalchemy import select
+    from app import db
+    from app.models.usuarios import usuarios_table
+
+    with db_app.app_context():
+        return db.session.execute(select(usuarios_table.c.email).order_by(usuarios_table.c.id)).scalars().all()
+
+def test_importar_usuarios_errores_por_fila(db_app, metodo_barato):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.usuarios import usuarios_table
+    from app.services.auth import importar_usuarios_service
+
+    with db_app.app_context():
+        db.session.execute(insert(usuarios_table).values(email="existe@example.com", password_hash="x"))
+        db.session.commit()
+        with patch('app.services.auth.hashear_varios', wraps=lambda ps: [f"hash:{p}" for p in ps]) as mock_hash:
+            result, status_code = importar_usuarios_service({"usuarios": [
+                {"email": "a@example.com", "password": "secreto1"},
+                {"email": "no-es-email", "password": "secreto2"},
+                {"email": "existe@example.com", "password": "secreto3"},
+                {"email": "a@example.com", "password": "secreto4"},
+                {"email": "b@example.com", "password": "secreto5"},
+            ]})
+    assert status_code == 201
+    assert result["creados"] == 2
+    assert [(e["fila"], e.get("message")) for e in result["errores"]] == [
+        (1, None), (2, "Email already exists"), (3, "Email repetido en la importación")
+    ]
+    mock_hash.assert_called_once_with(["secreto1", "secreto5"])  # Sin hash para los rechazados
+    assert _usuarios_en_bd(db_app) == ["existe@example.com", "a@example.com", "b@example.com"]
+
+def test_importar_usuarios_por_bloques(db_app, metodo_barato, monkeypatch, contar_consultas):
+    from app.services.auth import importar_usuarios_service
+
+    monkeypatch.setattr('app.services.auth.TAMANO_LOTE_USUARIOS', 10)
+    with db_app.app_context():
+        result, status_code = importar_usuarios_service({"usuarios": [
+            {"email": f"user{i}@example.com", "password": "secreto"} for i in range(25)
+        ]})
+    assert (status_code, result["creados"], result["errores"]) == (201, 25, [])
+    assert sum(c.startswith("INSERT") for c in contar_consultas) == 3
+    assert len(_usuarios_en_bd(db_app)) == 25
+
+def test_importar_usuarios_csv_por_api(db_app, api_client, auth_headers, metodo_barato, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_USUARIOS", {1})
+    cuerpo = "email,password\nuno@example.com,secreto1\ndos@example.com,corta\n"
+    response = api_client.post("/api/auth/importar-usuarios", data=cuerpo, content_type="text/csv", headers=auth_headers)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data["creados"] == 1
+    assert data["errores"][0]["fila"] == 1
+
+    response = api_client.post("/api/auth/importar-usuarios", json={"usuarios": []}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "usuarios" in response.get_json()["errors"]
+
+def test_importar_usuarios_ninguno_valido(db_app, metodo_barato):
+    from app.services.auth import importar_usuarios_service
+
+    with db_app.app_context():
+        result, status_code = importar_usuarios_service({"usuarios": [{"email": "x@example.com"}]})
+    assert status_code == 400
+    assert result["creados"] == 0
+
+def test_importar_usuarios_solo_administradores(db_app, api_client, auth_headers, metodo_barato, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_USUARIOS", {2})
+    datos = {"usuarios": [{"email": "uno@example.com", "password": "secreto1"}]}
+    response = api_client.post("/api/auth/importar-usuarios", json=datos, headers=auth_headers)
+    assert response.status_code == 403
+    assert response.get_json() == {"message": "Admin privileges required"}
+    assert _usuarios_en_bd(db_app) == []
+
+def test_importar_usuarios_por_api_limita_filas_y_peticiones(db_app, api_client, auth_headers, metodo_barato, monkeypatch):
+    from app.schemas.usuarios import MAX_USUARIOS_IMPORTACION
+
+    monkeypatch.setattr(settings, "ADMIN_USUARIOS", {1})
+    monkeypatch.setitem(settings.LIMITES_PETICIONES, "auth.importar_usuarios", {"usuario": "2/minuto"})
+    demasiados = {"usuarios": [
+        {"email": f"user{i}@example.com", "password": "secreto"} for i in range(MAX_USUARIOS_IMPORTACION + 1)
+    ]}
+    with patch('app.services.auth.hashear_varios') as mock_hash:
+        response = api_client.post("/api/auth/importar-usuarios", json=demasiados, headers=auth_headers)
+    assert response.status_code == 400
+    assert "usuarios" in response.get_json()["errors"]
+    mock_hash.assert_not_called()
+
+    datos = {"usuarios": [{"email": "uno@example.com", "password": "secreto1"}]}
+    assert api_client.post("/api/auth/importar-usuarios", json=datos, headers=auth_headers).status_code == 201
+    response = api_client.post("/api/auth/importar-usuarios", json=datos, headers=auth_headers)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+def test_importar_usuarios_sin_limite_de_filas_desde_la_cli(db_app, metodo_barato):
+    from app.services.auth import importar_usuarios_service
+    from app.schemas.usuarios import MAX_USUARIOS_IMPORTACION
+
+    with db_app.app_context():
+        result, status_code = importar_usuarios_service({"usuarios": [
+            {"email": f"user{i}@example.com", "password": "secreto"} for i in range(MAX_USUARIOS_IMPORTACION + 1)
+        ]}, max_usuarios=None)
+    assert (status_code, result["creados"]) == (201, MAX_USUARIOS_IMPORTACION + 1)
@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import insert
+from app import db
+from app.core.cache import MemoriaCache, cacheado
+from app.models.eventos import eventos_table
+from app.models.sesiones import sesiones_table
+from app.models.associations import asistentes_evento
+from app.models.usuarios import usuarios_table
+
+# Pruebas para MemoriaCache
+def test_memoria_cache_ttl():
+    cache = MemoriaCache()
+    with patch('app.core.cache.time.monotonic', return_value=100.0):
+        cache.guardar("a", {"valor": 1}, ttl=10)
+        assert cache.obtener("a") == {"valor": 1}
+    with patch('app.core.cache.time.monotonic', return_value=110.0):
+        assert cache.obtener("a") is None
+    assert cache.estadisticas() == {"aciertos": 1, "fallos": 1, "tasa_aciertos": 0.5, "entradas": 0}
+
+def test_memoria_cache_desaloja_lru():
+    cache = MemoriaCache(max_entradas=2)
+    cache.guardar("a", 1, ttl=60)
+    cache.guardar("b", 2, ttl=60)
+    cache.obtener("a")  # "b" pasa a ser la menos usada
+    cache.guardar("c", 3, ttl=60)
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") == 1
+    assert cache.obtener("c") == 3
+
+def test_cacheado_versiona_por_grupo(cache):
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        return {"n": len(llamadas)}, 200
+
+    assert cacheado(["eventos"], "x", calcular) == ({"n": 1}, 200)
+    assert cacheado(["eventos"], "x", calcular) == ({"n": 1}, 200)
+    cache.invalidar("sesiones")
+    assert cacheado(["eventos"], "x", calcular) == ({"n": 1}, 200)
+    cache.invalidar("eventos")
+    assert cacheado(["eventos"], "x", calcular) == ({"n": 2}, 200)
+
+def test_cacheado_no_guarda_errores(cache):
+    respuestas = iter([({"message": "Evento no encontrado"}, 404), ({"id": 1}, 200)])
+    assert cacheado(["evento:1"], "detalle", lambda: next(respuestas))[1] == 404
+    assert cacheado(["evento:1"], "detalle", lambda: next(respuestas)) == ({"id": 1}, 200)
+
+# Pruebas de lectura a través de la caché e invalidación contra una base de datos real
+@pytest.fixture
+def datos(db_app):
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", descripcion="Anual", capacidad_maxima=100,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.execute(insert(sesiones_table).values(
+            id=1, evento_id=1, nombre="Apertura", descripcion="", ponente="P", capacidad_maxima=10,
+            fecha_inicio=datetime(2025, 6, 1, 10), fecha_fin=datetime(2025, 6, 1, 11)
+        ))
+        db.session.execute(insert(usuarios_table).values(id=1, email="user1@example.com", password_hash="x"))
+        db.session.execute(insert(asistentes_evento).values(usuario_id=1, evento_id=1))
+        db.session.commit()
+    return db_app
+
+def test_detalle_evento_se_sirve_de_cache_e_invalida_al_actualizar(datos, api_client, auth_headers, contar_consultas, cache):
+    assert api_client.get("/api/eventos/1", headers=auth_headers).get_json()["nombre"] == "Congreso"
+    consultas = len(contar_consultas)
+    assert api_client.get("/api/eventos/1", headers=auth_headers).get_json()["nombre"] == "Congreso"
+    assert len(contar_consultas) == consultas + 1  # Solo la lectura de la versión para el ETag
+
+    response = api_client.put("/api/eventos/1/actualizar", headers=auth_headers, json={
+        "nombre": "Congreso 2025", "descripcion": "Anual", "capacidad_maxima": 100,
+        "fecha_inicio": "2025-06-01T09:00:00", "fecha_fin": "2025-06-01T18:00:00"
+    })
+    assert response.status_code == 200
+    assert api_client.get("/api/eventos/1", headers=auth_headers).get_json()["nombre"] == "Congreso 2025"
+    assert cache.estadisticas()["aciertos"] == 1
+
+def test_listado_sesiones_invalida_al_registrar_asistente(datos, api_client, auth_headers, contar_consultas):
+    sesion = api_client.get("/api/sesiones/sesiones", headers=auth_headers).get_json()["sesiones"][0]
+    assert sesion["asistentes_actuales"] == 0
+    consultas = len(contar_consultas)
+    api_client.get("/api/sesiones/sesiones", headers=auth_headers)
+    assert len(contar_consultas) == consultas
+
+    response = api_client.post("/api/sesiones/registrar_asistente/1", headers=auth_headers, json={"usuario_id": 1})
+    assert response.status_code == 201
+    sesion = api_client.get("/api/sesiones/sesiones", headers=auth_headers).get_json()["sesiones"][0]
+    assert sesion["asistentes_actuales"] == 1
+
+def test_estadisticas_cache_endpoint(datos, api_client, auth_headers):
+    api_client.get("/api/eventos/eventos", headers=auth_headers)
+    api_client.get("/api/eventos/eventos", headers=auth_headers)
+    api_client.get("/api/eventos/eventos?page=2", headers=auth_headers)
+    estadisticas = api_client.get("/api/eventos/cache/estadisticas", headers=auth_headers).get_json()
+    assert estadisticas["aciertos"] == 1
+    assert estadisticas["fallos"] == 2
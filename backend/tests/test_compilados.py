@@ -0,0 +1,93 @@
+import json
+import pytest
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+from marshmallow import Schema, fields, post_dump
+from sqlalchemy import insert, select
+from app import db
+from app.models.eventos import eventos_table
+from app.models.sesiones import sesiones_table
+from app.schemas.eventos import EventoSchema
+from app.schemas.sesiones import SesionSchema
+from app.schemas.compilados import dump_fila, dump_filas, serializador
+
+def _json(valor):
+    # Comparación byte a byte: mismo contenido, tipos y orden de claves
+    return json.dumps(valor, ensure_ascii=False)
+
+class _Fila:
+    """Fila mínima con la interfaz ``_mapping`` de sqlalchemy Row."""
+
+    def __init__(self, **valores):
+        self._mapping = valores
+
+# Pruebas de paridad con marshmallow
+@pytest.mark.parametrize("valores", [
+    {"id": 1, "nombre": "Concierto", "descripcion": "Ñandú ☃", "capacidad_maxima": 100, "estado": "activo",
+     "fecha_inicio": datetime(2025, 6, 1, 10, 0, 0, 123456), "fecha_fin": datetime(2025, 6, 1, 12),
+     "alta_demanda": False, "asistentes_actuales": 3, "version": 7},
+    {"id": 2, "nombre": "UTC", "descripcion": None, "capacidad_maxima": None, "estado": None,
+     "fecha_inicio": datetime(2025, 6, 1, 10, tzinfo=timezone.utc),
+     "fecha_fin": datetime(2025, 6, 1, 12, tzinfo=timezone(timedelta(hours=-5))), "alta_demanda": True},
+    {"id": Decimal("3"), "nombre": b"bytes", "descripcion": 42, "capacidad_maxima": "7", "estado": "x",
+     "fecha_inicio": None, "fecha_fin": None, "alta_demanda": None},
+    {"id": 4, "nombre": "Parcial"},  # Los campos ausentes se omiten, como en marshmallow
+])
+def test_paridad_evento_schema(valores):
+    fila = _Fila(**valores)
+    assert _json(dump_fila(EventoSchema, fila)) == _json(EventoSchema().dump(dict(fila._mapping)))
+    assert _json(dump_filas(EventoSchema, [fila, fila])) == _json(EventoSchema(many=True).dump([valores, valores]))
+
+def test_paridad_con_filas_reales(db_app):
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table), [
+            {"id": i, "nombre": f"Evento {i} — ñ", "descripcion": None if i % 2 else "desc",
+             "capacidad_maxima": i * 10, "alta_demanda": i % 3 == 0,
+             "fecha_inicio": datetime(2025, 6, 1, 10, 0, i), "fecha_fin": datetime(2025, 6, 2)}
+            for i in range(1, 21)
+        ])
+        db.session.execute(insert(sesiones_table), [
+            {"id": i, "evento_id": 1, "nombre": f"Sesión {i}", "ponente": "P", "capacidad_maxima": 5,
+             "fecha_inicio": datetime(2025, 6, 1, 10, i), "fecha_fin": datetime(2025, 6, 1, 11, i)}
+            for i in range(1, 11)
+        ])
+        db.session.commit()
+
+        for schema_cls, stmt in [
+            (EventoSchema, select(eventos_table)),
+            (SesionSchema, select(sesiones_table)),
+            (EventoSchema, select(eventos_table.c.nombre, eventos_table.c.id)),
+        ]:
+            filas = db.session.execute(stmt).fetchall()
+            esperado = schema_cls(many=True).dump([dict(f._mapping) for f in filas])
+            assert _json(dump_filas(schema_cls, filas)) == _json(esperado)
+
+def test_paridad_opciones_de_campo():
+    class OpcionesSchema(Schema):
+        id = fields.Int(data_key="identificador")
+        titulo = fields.Str(attribute="nombre")
+        total = fields.Int(as_string=True)
+        correo = fields.Email()
+        pais = fields.Str(dump_default="CO")
+        inicio = fields.DateTime(format="%Y-%m-%d")
+        secreto = fields.Str(load_only=True)
+
+    valores = {"id": 1, "nombre": "Taller", "total": 5, "correo": "a@b.co", "inicio": datetime(2025, 6, 1), "secreto": "x"}
+    fila = _Fila(**valores)
+    assert _json(dump_fila(OpcionesSchema, fila)) == _json(OpcionesSchema().dump(valores))
+
+def test_esquema_con_hooks_usa_marshmallow():
+    class ConHookSchema(Schema):
+        id = fields.Int()
+
+        @post_dump
+        def marcar(self, data, **kwargs):
+            data["marcado"] = True
+            return data
+
+    assert dump_fila(ConHookSchema, _Fila(id=1)) == {"id": 1, "marcado": True}
+
+def test_serializador_se_compila_una_vez_por_forma():
+    columnas = ("id", "nombre")
+    assert serializador(EventoSchema, columnas) is serializador(EventoSchema, columnas)
+    assert serializador(EventoSchema, columnas) is not serializador(SesionSchema, columnas)
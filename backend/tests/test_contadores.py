@@ -0,0 +1,53 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import insert, select
+from app import db
+from app.models.eventos import eventos_table
+from app.models.sesiones import sesiones_table
+from app.models.associations import asistentes_evento, asistentes_sesion
+from app.models.usuarios import usuarios_table
+from app.services.contadores import reconciliar_contadores_service
+
+@pytest.fixture
+def datos_desviados(db_app):
+    with db_app.app_context():
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": "x"} for i in (1, 2, 3)
+        ])
+        db.session.execute(insert(eventos_table), [
+            # Contador correcto
+            {"id": 1, "nombre": "A", "capacidad_maxima": 10, "asistentes_actuales": 1,
+             "fecha_inicio": datetime(2025, 6, 1, 9), "fecha_fin": datetime(2025, 6, 1, 18)},
+            # Contador desviado (dice 5, hay 2)
+            {"id": 2, "nombre": "B", "capacidad_maxima": 10, "asistentes_actuales": 5,
+             "fecha_inicio": datetime(2025, 6, 1, 9), "fecha_fin": datetime(2025, 6, 1, 18)},
+        ])
+        db.session.execute(insert(asistentes_evento), [
+            {"usuario_id": 1, "evento_id": 1},
+            {"usuario_id": 1, "evento_id": 2},
+            {"usuario_id": 2, "evento_id": 2},
+        ])
+        db.session.execute(insert(sesiones_table).values(
+            id=1, evento_id=2, nombre="S", capacidad_maxima=10, ponente="P", asistentes_actuales=0,
+            fecha_inicio=datetime(2025, 6, 1, 10), fecha_fin=datetime(2025, 6, 1, 11)
+        ))
+        db.session.execute(insert(asistentes_sesion).values(usuario_id=3, sesion_id=1))
+        db.session.commit()
+    return db_app
+
+def test_reconciliar_contadores_detecta_desviaciones(datos_desviados):
+    with datos_desviados.app_context():
+        resultado = reconciliar_contadores_service()
+        assert resultado["eventos"] == [{"id": 2, "asistentes_actuales": 5, "asistentes_reales": 2}]
+        assert resultado["sesiones"] == [{"id": 1, "asistentes_actuales": 0, "asistentes_reales": 1}]
+        # Sin --reparar no se modifica nada
+        contador = db.session.execute(select(eventos_table.c.asistentes_actuales).where(eventos_table.c.id == 2)).scalar()
+        assert contador == 5
+
+def test_reconciliar_contadores_repara(datos_desviados):
+    with datos_desviados.app_context():
+        reconciliar_contadores_service(reparar=True)
+        contadores = dict(db.session.execute(select(eventos_table.c.id, eventos_table.c.asistentes_actuales)).fetchall())
+        assert contadores == {1: 1, 2: 2}
+        assert db.session.execute(select(sesiones_table.c.asistentes_actuales)).scalar() == 1
+        assert reconciliar_contadores_service() == {"eventos": [], "sesiones": []}
@@ -0,0 +1,12 @@
+from pathlib import Path
+import pytest
+
+# Solo donde Poetry está instalado (la imagen del backend lo instala para poetry install)
+factory = pytest.importorskip("poetry.factory")
+
+def test_poetry_lock_corresponde_a_pyproject():
+    # Cada commit que cambia las dependencias o extras de pyproject.toml debe regenerar
+    # poetry.lock: con un lock desfasado poetry install falla al construir la imagen
+    poetry = factory.Factory().create_poetry(Path(__file__).resolve().parents[1])
+    assert poetry.locker.is_locked(), "Falta poetry.lock"
+    assert poetry.locker.is_fresh(), "poetry.lock no corresponde a pyproject.toml: ejecute poetry lock"
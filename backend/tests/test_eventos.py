@@ -13,7 +13,7 @@ from app.services.eventos import (
     obtener_mis_eventos_service,
     get_evento_or_404
 )
-from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
 
 # Fixture para datos de evento válidos
 @pytest.fixture
@@ -38,10 +38,14 @@ def mock_evento():
         "fecha_inicio": datetime(2025, 6, 1, 10, 0, tzinfo=timezone.utc),
         "fecha_fin": datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc),
         "capacidad_maxima": 100,
-        "estado": "activo"
+        "estado": "activo",
+        "asistentes_actuales": 50,
+        "alta_demanda": False
     }
     evento.id = 1
     evento.capacidad_maxima = 100
+    evento.asistentes_actuales = 50
+    evento.alta_demanda = False
     return evento
 
 # Pruebas para get_evento_or_404
@@ -298,94 +302,131 @@ def test_buscar_eventos_service_no_results(mock_db_session):
 def current_user():
     return {"id": 1}
 
-def test_registrarse_evento_service_success(mock_db_session, mock_evento, current_user):
+def test_registrarse_evento_service_success(mock_db_session, current_user):
     # Simular las consultas necesarias
-    result_get_evento = MagicMock()
-    result_get_evento.fetchone.return_value = mock_evento  # get_evento_or_404
-    result_verificar = MagicMock()
-    result_verificar.fetchone.return_value = None  # Verificar registro existente
-    result_count = MagicMock()
-    result_count.scalar.return_value = 50  # Contar asistentes (capacidad_maxima = 100)
+    result_contador = MagicMock(rowcount=1)  # UPDATE condicionado a la capacidad
     result_insert = MagicMock(rowcount=1)  # Insertar registro
     mock_db_session.execute.side_effect = [
-        result_get_evento,
-        result_verificar,
-        result_count,
+        result_contador,
         result_insert
     ]
     result, status_code = registrarse_evento_service(current_user, 1)
     assert status_code == 200
     assert result["message"] == "Te has registrado exitosamente al evento"
+    assert mock_db_session.execute.call_count == 2
     mock_db_session.commit.assert_called_once()
 
-def test_registrarse_evento_service_already_registered(mock_db_session, mock_evento, current_user):
+def test_registrarse_evento_service_already_registered(mock_db_session, current_user):
     # Simular las consultas necesarias
-    result_get_evento = MagicMock()
-    result_get_evento.fetchone.return_value = mock_evento  # get_evento_or_404
-    result_verificar = MagicMock()
-    result_verificar.fetchone.return_value = MagicMock()  # Registro existente
     mock_db_session.execute.side_effect = [
-        result_get_evento,
-        result_verificar
+        MagicMock(rowcount=1),
+        IntegrityError("INSERT", {}, Exception("duplicate key"))  # Violación de la clave primaria
+    ]
+    result, status_code = registrarse_evento_service(current_user, 1)
+    assert status_code == 400
+    assert result["message"] == "Ya te has registrado a este evento"
+    mock_db_session.rollback.assert_called_once()
+    mock_db_session.commit.assert_not_called()
+
+def test_registrarse_evento_service_already_registered_full_event(mock_db_session, current_user):
+    result_estado = MagicMock()
+    result_estado.fetchone.return_value = (1, True, False)  # Evento existe y el usuario ya está registrado
+    mock_db_session.execute.side_effect = [
+        MagicMock(rowcount=0),
+        result_estado
     ]
     result, status_code = registrarse_evento_service(current_user, 1)
     assert status_code == 400
     assert result["message"] == "Ya te has registrado a este evento"
 
-def test_registrarse_evento_service_capacity_exceeded(mock_db_session, mock_evento, current_user):
+def test_registrarse_evento_service_capacity_exceeded(mock_db_session, current_user):
     # Simular las consultas necesarias
-    result_get_evento = MagicMock()
-    result_get_evento.fetchone.return_value = mock_evento  # get_evento_or_404
-    result_verificar = MagicMock()
-    result_verificar.fetchone.return_value = None  # Verificar registro existente
-    result_count = MagicMock()
-    result_count.scalar.return_value = 100  # Contar asistentes (capacidad_maxima = 100)
+    result_estado = MagicMock()
+    result_estado.fetchone.return_value = (1, False, False)  # Evento existe, usuario no registrado
     mock_db_session.execute.side_effect = [
-        result_get_evento,
-        result_verificar,
-        result_count
+        MagicMock(rowcount=0),  # La condición de capacidad no se cumplió
+        result_estado
     ]
     result, status_code = registrarse_evento_service(current_user, 1)
     assert status_code == 400
     assert result["message"] == "El evento ha alcanzado su capacidad máxima"
+    mock_db_session.commit.assert_not_called()
 
 def test_registrarse_evento_service_not_found(mock_db_session, current_user):
-    result_mock = MagicMock()
-    result_mock.fetchone.return_value = None  # get_evento_or_404
-    mock_db_session.execute.return_value = result_mock
+    result_estado = MagicMock()
+    result_estado.fetchone.return_value = None
+    mock_db_session.execute.side_effect = [
+        MagicMock(rowcount=0),
+        result_estado
+    ]
     result, status_code = registrarse_evento_service(current_user, 1)
     assert status_code == 404
     assert result["message"] == "Evento no encontrado"
 
-def test_registrarse_evento_service_db_error(mock_db_session, mock_evento, current_user):
+def test_registrarse_evento_service_db_error(mock_db_session, current_user):
     # Simular las consultas necesarias
-    result_get_evento = MagicMock()
-    result_get_evento.fetchone.return_value = mock_evento  # get_evento_or_404
-    result_verificar = MagicMock()
-    result_verificar.fetchone.return_value = None  # Verificar registro existente
     mock_db_session.execute.side_effect = [
-        result_get_evento,
-        result_verificar,
-        Exception("DB Error")  # Error al contar asistentes
+        MagicMock(rowcount=1),
+        Exception("DB Error")  # Error al insertar el registro
     ]
     result, status_code = registrarse_evento_service(current_user, 1)
     assert status_code == 500
     assert result["message"] == "Error al registrarse al evento: DB Error"
+    mock_db_session.rollback.assert_called_once()
+
+def test_registrarse_evento_concurrente_no_supera_capacidad(db_app):
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import insert, select, func
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.associations import asistentes_evento
+    from app.models.usuarios import usuarios_table
+
+    capacidad = 25
+    total_usuarios = 200
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Lanzamiento", descripcion="", capacidad_maxima=capacidad,
+            fecha_inicio=datetime(2025, 6, 1, 10), fecha_fin=datetime(2025, 6, 1, 12)
+        ))
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": "x"}
+            for i in range(1, total_usuarios + 1)
+        ])
+        db.session.commit()
+
+    def registrar(usuario_id):
+        with db_app.app_context():
+            return registrarse_evento_service({"id": usuario_id}, 1)[1]
+
+    # Cada usuario intenta registrarse dos veces para ejercitar también los duplicados
+    intentos = list(range(1, total_usuarios + 1)) * 2
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        status_codes = list(executor.map(registrar, intentos))
+
+    with db_app.app_context():
+        registrados = db.session.execute(
+            select(func.count()).select_from(asistentes_evento).where(asistentes_evento.c.evento_id == 1)
+        ).scalar()
+        contador = db.session.execute(
+            select(eventos_table.c.asistentes_actuales).where(eventos_table.c.id == 1)
+        ).scalar()
+
+    assert registrados == capacidad
+    assert contador == capacidad
+    assert status_codes.count(200) == capacidad
+    assert set(status_codes) == {200, 400}
 
 # Pruebas para validar_capacidad_evento_service
 def test_validar_capacidad_evento_service_success(mock_db_session, mock_evento):
-    # Simular las consultas necesarias
+    # El contador asistentes_actuales viene en la misma fila del evento
     result_get_evento = MagicMock()
     result_get_evento.fetchone.return_value = mock_evento  # get_evento_or_404
-    result_count = MagicMock()
-    result_count.scalar.return_value = 50  # Contar asistentes
-    mock_db_session.execute.side_effect = [
-        result_get_evento,
-        result_count
-    ]
+    mock_db_session.execute.return_value = result_get_evento
     result, status_code = validar_capacidad_evento_service(1)
     assert status_code == 200
     assert result["capacidad_disponible"] == 50  # 100 - 50
+    mock_db_session.execute.assert_called_once()
 
 def test_validar_capacidad_evento_service_not_found(mock_db_session):
     result_mock = MagicMock()
@@ -395,14 +436,8 @@ def test_validar_capacidad_evento_service_not_found(mock_db_session):
     assert status_code == 404
     assert result["message"] == "Evento no encontrado"
 
-def test_validar_capacidad_evento_service_db_error(mock_db_session, mock_evento):
-    # Simular las consultas necesarias
-    result_get_evento = MagicMock()
-    result_get_evento.fetchone.return_value = mock_evento  # get_evento_or_404
-    mock_db_session.execute.side_effect = [
-        result_get_evento,
-        Exception("DB Error")  # Error al contar asistentes
-    ]
+def test_validar_capacidad_evento_service_db_error(mock_db_session):
+    mock_db_session.execute.side_effect = Exception("DB Error")
     result, status_code = validar_capacidad_evento_service(1)
     assert status_code == 500
     assert result["message"] == "Error al validar capacidad: DB Error"
@@ -485,4 +520,367 @@ def test_obtener_mis_eventos_service_no_events(mock_db_session, current_user):
     
     assert status_code == 200
     assert result['total'] == 0
-    assert result['eventos'] == []
\ No newline at end of file
+    assert result['eventos'] == []
+# Pruebas para registrar_lote_evento_service
+@pytest.fixture
+def evento_con_usuarios(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.associations import asistentes_evento
+    from app.models.usuarios import usuarios_table
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", capacidad_maxima=5, asistentes_actuales=1,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": "x"} for i in range(1, 11)
+        ])
+        db.session.execute(insert(asistentes_evento).values(usuario_id=1, evento_id=1))
+        db.session.commit()
+    return db_app
+
+def test_registrar_lote_evento_service_informe(evento_con_usuarios):
+    from sqlalchemy import select
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.services.eventos import registrar_lote_evento_service
+
+    with evento_con_usuarios.app_context():
+        result, status_code = registrar_lote_evento_service(1, {"usuario_ids": [1, 2, 3, 3, 99, 4, 5, 6, 7]})
+        contador = db.session.execute(select(eventos_table.c.asistentes_actuales)).scalar()
+
+    assert status_code == 200
+    assert result["registrados"] == 4
+    assert [(r["usuario_id"], r["estado"]) for r in result["resultados"]] == [
+        (1, "ya_registrado"),
+        (2, "registrado"),
+        (3, "registrado"),
+        (99, "usuario_no_encontrado"),
+        (4, "registrado"),
+        (5, "registrado"),
+        (6, "lleno"),
+        (7, "lleno"),
+    ]
+    assert contador == 5
+
+def test_registrar_lote_evento_sin_aceptados_conserva_la_version(evento_con_usuarios):
+    from sqlalchemy import select
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.services.eventos import registrar_lote_evento_service
+
+    with evento_con_usuarios.app_context():
+        version = db.session.execute(select(eventos_table.c.version)).scalar()
+        result, status_code = registrar_lote_evento_service(1, {"usuario_ids": [1, 99]})
+        assert (status_code, result["registrados"]) == (200, 0)
+        assert db.session.execute(select(eventos_table.c.version)).scalar() == version
+
+        registrar_lote_evento_service(1, {"usuario_ids": [2]})
+        assert db.session.execute(select(eventos_table.c.version)).scalar() == version + 1
+
+def test_registrar_lote_evento_service_not_found(evento_con_usuarios):
+    from app.services.eventos import registrar_lote_evento_service
+
+    with evento_con_usuarios.app_context():
+        result, status_code = registrar_lote_evento_service(2, {"usuario_ids": [1]})
+    assert status_code == 404
+    assert result["message"] == "Evento no encontrado"
+
+def test_registrar_lote_evento_service_validation_error(mock_db_session):
+    from app.services.eventos import registrar_lote_evento_service
+
+    result, status_code = registrar_lote_evento_service(1, {"usuario_ids": []})
+    assert status_code == 400
+    assert "usuario_ids" in result["errors"]
+    mock_db_session.execute.assert_not_called()
+
+# Pruebas para la paginación por cursor
+@pytest.fixture
+def eventos_ordenables(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.associations import asistentes_evento
+
+    with db_app.app_context():
+        # Varias fechas repetidas para ejercitar el desempate por id
+        db.session.execute(insert(eventos_table), [
+            {"id": i, "nombre": f"Evento {i}", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1 + i % 4, 10), "fecha_fin": datetime(2025, 6, 10)}
+            for i in range(1, 24)
+        ])
+        db.session.execute(insert(asistentes_evento), [{"usuario_id": 1, "evento_id": i} for i in range(1, 24, 2)])
+        db.session.commit()
+    return db_app
+
+def _recorrer_cursor(client, url, headers):
+    ids, cursor, paginas = [], "", 0
+    while cursor is not None:
+        separador = "&" if "?" in url else "?"
+        data = client.get(f"{url}{separador}cursor={cursor}", headers=headers).get_json()
+        ids += [e["id"] for e in data["eventos"]]
+        cursor = data["next_cursor"]
+        paginas += 1
+    return ids, paginas
+
+def test_obtener_eventos_cursor_recorre_en_orden(eventos_ordenables, api_client, auth_headers):
+    ids, paginas = _recorrer_cursor(api_client, "/api/eventos/eventos?per_page=5", auth_headers)
+    esperado = sorted(range(1, 24), key=lambda i: (1 + i % 4, i))
+    assert ids == esperado
+    assert paginas == 5
+
+def test_obtener_mis_eventos_cursor(eventos_ordenables, api_client, auth_headers):
+    ids, _ = _recorrer_cursor(api_client, "/api/eventos/mis-eventos?per_page=4", auth_headers)
+    assert sorted(ids) == list(range(1, 24, 2))
+
+def test_obtener_eventos_cursor_total_opcional(eventos_ordenables, api_client, auth_headers, contar_consultas):
+    data = api_client.get("/api/eventos/eventos?cursor=&per_page=5", headers=auth_headers).get_json()
+    assert "total" not in data
+    assert len(contar_consultas) == 1  # Sin COUNT(*)
+
+    data = api_client.get("/api/eventos/eventos?cursor=&total=exacto", headers=auth_headers).get_json()
+    assert data["total"] == 23
+
+def test_obtener_eventos_cursor_invalido(eventos_ordenables, api_client, auth_headers):
+    response = api_client.get("/api/eventos/eventos?cursor=no-es-un-cursor", headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Cursor inválido"
+
+def test_obtener_eventos_limita_per_page(eventos_ordenables, api_client, auth_headers):
+    data = api_client.get("/api/eventos/eventos?per_page=1000000", headers=auth_headers).get_json()
+    assert data["per_page"] == 100
+
+# Pruebas de búsqueda por relevancia
+@pytest.fixture
+def catalogo(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table), [
+            dict(e, capacidad_maxima=10, fecha_inicio=datetime(2025, 6, 1), fecha_fin=datetime(2025, 6, 2))
+            for e in [
+                {"id": 1, "nombre": "Festival de Jazz", "descripcion": "Música en vivo"},
+                {"id": 2, "nombre": "Jazz", "descripcion": "Noche de jazz"},
+                {"id": 3, "nombre": "Conferencia", "descripcion": "Historia del jazz latino"},
+                {"id": 4, "nombre": "Jazzistas del Caribe", "descripcion": ""},
+                {"id": 5, "nombre": "Rock al parque", "descripcion": "100% rock"},
+            ]
+        ])
+        db.session.commit()
+    return db_app
+
+def test_buscar_eventos_service_ordena_por_relevancia(catalogo):
+    with catalogo.app_context():
+        result, status_code = buscar_eventos_service("jazz")
+    assert status_code == 200
+    # Nombre exacto, prefijo, contiene en el nombre, contiene en la descripción
+    assert [e["id"] for e in result] == [2, 4, 1, 3]
+
+def test_buscar_eventos_service_paginado(catalogo):
+    with catalogo.app_context():
+        pagina_1, _ = buscar_eventos_service("jazz", page=1, per_page=3)
+        pagina_2, _ = buscar_eventos_service("jazz", page=2, per_page=3)
+    assert [e["id"] for e in pagina_1] == [2, 4, 1]
+    assert [e["id"] for e in pagina_2] == [3]
+
+def test_buscar_eventos_service_escapa_comodines(catalogo):
+    with catalogo.app_context():
+        result, _ = buscar_eventos_service("100%")
+    assert [e["id"] for e in result] == [5]
+
+def test_buscar_eventos_service_postgres_usa_indices(mock_db_session):
+    from sqlalchemy.dialects import postgresql
+    from app.services.busqueda import TSVECTOR_EVENTOS
+
+    mock_db_session.get_bind.return_value.dialect.name = "postgresql"
+    mock_db_session.execute.return_value.fetchall.return_value = []
+    buscar_eventos_service("jazz latino")
+    stmt = mock_db_session.execute.call_args[0][0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert TSVECTOR_EVENTOS in sql
+    assert "@@ websearch_to_tsquery('spanish'" in sql
+    assert "ILIKE" in sql
+    assert "similarity(eventos.nombre" in sql
+
+# Pruebas de GET condicional (ETag / If-None-Match)
+def test_obtener_evento_etag_304(eventos_ordenables, api_client, auth_headers, contar_consultas):
+    response = api_client.get("/api/eventos/1", headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    consultas = len(contar_consultas)
+    response = api_client.get("/api/eventos/1", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert len(contar_consultas) == consultas + 1  # Solo la versión de la fila
+
+    api_client.put("/api/eventos/1/actualizar", headers=auth_headers, json={
+        "nombre": "Renombrado", "descripcion": "", "capacidad_maxima": 10,
+        "fecha_inicio": "2025-06-01T10:00:00", "fecha_fin": "2025-06-01T12:00:00"
+    })
+    response = api_client.get("/api/eventos/1", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["nombre"] == "Renombrado"
+
+def test_obtener_evento_no_encontrado_sin_etag(eventos_ordenables, api_client, auth_headers):
+    response = api_client.get("/api/eventos/999", headers=auth_headers)
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+def test_obtener_eventos_etag_cambia_con_la_pagina(eventos_ordenables, api_client, auth_headers):
+    url = "/api/eventos/eventos?page=1&per_page=5"
+    etag = api_client.get(url, headers=auth_headers).headers["ETag"]
+    assert api_client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    # Otra página u otros parámetros no comparten ETag
+    assert api_client.get(url + "&nombre=x", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+    api_client.post("/api/eventos/crear", headers=auth_headers, json={
+        "nombre": "Nuevo", "descripcion": "", "capacidad_maxima": 10,
+        "fecha_inicio": "2025-07-01T10:00:00", "fecha_fin": "2025-07-01T12:00:00"
+    })
+    assert api_client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+def test_obtener_eventos_304_desde_cache_sin_consultas(eventos_ordenables, api_client, auth_headers, contar_consultas):
+    url = "/api/eventos/eventos?page=2&per_page=3&nombre=a"
+    etag = api_client.get(url, headers=auth_headers).headers["ETag"]
+    contar_consultas.clear()
+    response = api_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert contar_consultas == []  # Ni COUNT(*) ni página de versiones
+
+# Pruebas de ?fields= e ?include=sesiones
+@pytest.fixture
+def eventos_con_sesiones(eventos_ordenables):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.sesiones import sesiones_table
+
+    with eventos_ordenables.app_context():
+        db.session.execute(insert(sesiones_table), [
+            {"id": i, "evento_id": 1 + i % 3, "nombre": f"Sesión {i}", "ponente": "P", "capacidad_maxima": 5,
+             "fecha_inicio": datetime(2025, 6, 1, 10 + i), "fecha_fin": datetime(2025, 6, 1, 11 + i)}
+            for i in range(1, 7)
+        ])
+        db.session.commit()
+    return eventos_ordenables
+
+def test_obtener_eventos_fields_selecciona_solo_columnas_pedidas(eventos_ordenables, contar_consultas):
+    with eventos_ordenables.test_request_context("/?fields=nombre,id&per_page=3"):
+        result, status_code = obtener_eventos_service({"id": 1})
+    assert status_code == 200
+    assert result["eventos"] == [{"id": 1, "nombre": "Evento 1"}, {"id": 2, "nombre": "Evento 2"}, {"id": 3, "nombre": "Evento 3"}]
+    assert not any("descripcion" in consulta for consulta in contar_consultas)
+
+def test_obtener_eventos_include_sesiones_una_consulta(eventos_con_sesiones, contar_consultas):
+    with eventos_con_sesiones.test_request_context("/?include=sesiones&fields=nombre&per_page=4"):
+        result, status_code = obtener_eventos_service({"id": 1})
+    assert status_code == 200
+    eventos = result["eventos"]
+    assert [e["nombre"] for e in eventos] == ["Evento 1", "Evento 2", "Evento 3", "Evento 4"]
+    assert [s["id"] for s in eventos[0]["sesiones"]] == [3, 6]
+    assert [s["id"] for s in eventos[1]["sesiones"]] == [1, 4]
+    assert eventos[3]["sesiones"] == []
+    assert "id" not in eventos[0]  # Se lee para agrupar, pero no se pidió
+    # COUNT + página de eventos + una sola consulta IN de sesiones
+    assert len(contar_consultas) == 3
+    assert sum("FROM sesiones" in consulta for consulta in contar_consultas) == 1
+
+def test_obtener_eventos_cursor_con_fields(eventos_ordenables):
+    with eventos_ordenables.test_request_context("/?cursor=&fields=nombre&per_page=2"):
+        result, status_code = obtener_eventos_service({"id": 1})
+    assert status_code == 200
+    assert all(set(e) == {"nombre"} for e in result["eventos"])
+    assert result["next_cursor"]
+
+def test_obtener_eventos_fields_invalido(eventos_ordenables):
+    with eventos_ordenables.test_request_context("/?fields=nombre,password"):
+        result, status_code = obtener_eventos_service({"id": 1})
+    assert status_code == 400
+    assert result["message"] == "Campos no válidos: password"
+
+def test_obtener_evento_include_sesiones_y_etag(eventos_con_sesiones, api_client, auth_headers):
+    from app.services.sesiones import crear_sesion_service
+
+    url = "/api/eventos/2?fields=id,nombre&include=sesiones"
+    response = api_client.get(url, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert set(data) == {"id", "nombre", "sesiones"}
+    assert [s["nombre"] for s in data["sesiones"]] == ["Sesión 1", "Sesión 4"]
+
+    etag = response.headers["ETag"]
+    assert api_client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    with eventos_con_sesiones.app_context():
+        assert crear_sesion_service({
+            "evento_id": 2, "nombre": "Nueva", "ponente": "Q", "capacidad_maxima": 5,
+            "fecha_inicio": "2025-06-05T08:00:00", "fecha_fin": "2025-06-05T09:00:00"
+        })[1] == 201
+    response = api_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()["sesiones"]) == 3
+
+def test_listado_include_sesiones_en_cache_se_refresca(eventos_con_sesiones, api_client, auth_headers):
+    from app.services.sesiones import crear_sesion_service
+
+    url = "/api/eventos/eventos?fields=nombre&include=sesiones&per_page=4"
+    response = api_client.get(url, headers=auth_headers)
+    assert response.get_json()["eventos"][3]["sesiones"] == []
+    etag = response.headers["ETag"]
+
+    with eventos_con_sesiones.app_context():
+        assert crear_sesion_service({
+            "evento_id": 4, "nombre": "Nueva", "ponente": "Q", "capacidad_maxima": 5,
+            "fecha_inicio": "2025-06-05T08:00:00", "fecha_fin": "2025-06-05T09:00:00"
+        })[1] == 201
+    response = api_client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert [s["nombre"] for s in response.get_json()["eventos"][3]["sesiones"]] == ["Nueva"]
+
+def test_obtener_evento_include_invalido(mock_db_session):
+    result, status_code = obtener_evento_service(1, include="usuarios")
+    assert status_code == 400
+    mock_db_session.execute.assert_not_called()
+
+# Pruebas de consulta de varios eventos por ID
+def test_obtener_eventos_por_ids(eventos_ordenables, api_client, auth_headers, contar_consultas):
+    response = api_client.get("/api/eventos/lote?ids=3,999,1,3&fields=nombre", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "eventos": [{"nombre": "Evento 3"}, {"nombre": "Evento 1"}],
+        "no_encontrados": [999]
+    }
+    assert len(contar_consultas) == 1
+
+def test_validar_capacidad_eventos(eventos_ordenables, api_client, auth_headers, contar_consultas):
+    from sqlalchemy import update
+    from app import db
+    from app.models.eventos import eventos_table
+
+    with eventos_ordenables.app_context():
+        db.session.execute(update(eventos_table).where(eventos_table.c.id == 2).values(asistentes_actuales=4))
+        db.session.commit()
+    contar_consultas.clear()
+    response = api_client.get("/api/eventos/validar-capacidad?ids=1,2,50", headers=auth_headers)
+    assert response.get_json() == {
+        "capacidades": [{"id": 1, "capacidad_disponible": 10}, {"id": 2, "capacidad_disponible": 6}],
+        "no_encontrados": [50]
+    }
+    assert len(contar_consultas) == 1
+
+@pytest.mark.parametrize("ids, mensaje", [
+    ("", "El parámetro 'ids' es requerido"),
+    ("1,a", "El parámetro 'ids' debe ser una lista de enteros separados por comas"),
+    (",".join(str(i) for i in range(501)), "Se admiten como máximo 500 ids por consulta"),
+])
+def test_validar_capacidad_eventos_ids_invalidos(mock_db_session, ids, mensaje):
+    from app.services.eventos import validar_capacidad_eventos_service
+
+    result, status_code = validar_capacidad_eventos_service(ids)
+    assert status_code == 400
+    assert result["message"] == mensaje
@@ -0,0 +1,70 @@
+import random
+import pytest
+from datetime import datetime, timedelta
+from app.services import horarios
+from app.services.horarios import fusionar_intervalos, huecos_libres, intervalos_solapados, solapa_fusionados
+
+def _fuerza_bruta(inicios, fines):
+    return [
+        any(inicios[i] < fines[j] and inicios[j] < fines[i] for j in range(len(inicios)) if j != i)
+        for i in range(len(inicios))
+    ]
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(horarios, "UMBRAL_NUMPY", 0)
+    else:
+        monkeypatch.setattr(horarios, "numpy", None)
+    return request.param
+
+def test_extremos_que_se_tocan_no_se_solapan(backend):
+    base = datetime(2025, 6, 1, 9)
+    inicios = [base, base + timedelta(hours=1), base + timedelta(hours=2)]
+    fines = [base + timedelta(hours=1), base + timedelta(hours=2), base + timedelta(hours=3)]
+    assert intervalos_solapados(inicios, fines) == [False, False, False]
+
+def test_intervalo_contenido_y_mismo_inicio(backend):
+    base = datetime(2025, 6, 1, 9)
+    inicios = [base, base + timedelta(minutes=10), base + timedelta(hours=5), base + timedelta(hours=5)]
+    fines = [base + timedelta(hours=3), base + timedelta(minutes=20), base + timedelta(hours=6), base + timedelta(hours=7)]
+    assert intervalos_solapados(inicios, fines) == [True, True, True, True]
+
+def test_coincide_con_fuerza_bruta(backend):
+    azar = random.Random(7)
+    base = datetime(2025, 6, 1)
+    inicios, fines = [], []
+    for _ in range(400):
+        inicio = base + timedelta(minutes=azar.randrange(0, 10000, 5))
+        inicios.append(inicio)
+        fines.append(inicio + timedelta(minutes=azar.randrange(5, 60, 5)))
+    assert intervalos_solapados(inicios, fines) == _fuerza_bruta(inicios, fines)
+
+def test_lista_vacia(backend):
+    assert intervalos_solapados([], []) == []
+
+def _h(hora, minuto=0):
+    return datetime(2025, 6, 1, hora, minuto)
+
+def test_fusionar_intervalos_une_solapados_y_contiguos():
+    intervalos = [(_h(12), _h(13)), (_h(9), _h(10)), (_h(10), _h(11)), (_h(12, 30), _h(12, 45)), (_h(15), _h(16))]
+    assert fusionar_intervalos(intervalos) == [(_h(9), _h(11)), (_h(12), _h(13)), (_h(15), _h(16))]
+
+@pytest.mark.parametrize("inicio, fin, esperado", [
+    (_h(11), _h(12), False),      # Toca ambos lados
+    (_h(8), _h(9), False),        # Antes del primero, tocándolo
+    (_h(16), _h(17), False),      # Después del último
+    (_h(10, 30), _h(11, 30), True),
+    (_h(11, 30), _h(12, 1), True),
+    (_h(8), _h(18), True),        # Contiene varios
+])
+def test_solapa_fusionados(inicio, fin, esperado):
+    fusionados = [(_h(9), _h(11)), (_h(12), _h(13)), (_h(15), _h(16))]
+    assert solapa_fusionados(fusionados, inicio, fin) is esperado
+
+def test_huecos_libres_recorta_a_la_ventana():
+    fusionados = [(_h(7), _h(9, 30)), (_h(12), _h(13)), (_h(17), _h(20))]
+    assert huecos_libres(fusionados, _h(9), _h(18)) == [(_h(9, 30), _h(12)), (_h(13), _h(17))]
+    assert huecos_libres([], _h(9), _h(18)) == [(_h(9), _h(18))]
+    assert huecos_libres([(_h(8), _h(19))], _h(9), _h(18)) == []
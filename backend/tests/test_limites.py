@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import patch
+from app.core.config import settings
+from app.core.limites import MemoriaLimitador, parsear_limite
+
+# Pruebas de parsear_limite
+@pytest.mark.parametrize("limite, esperado", [
+    ("5/minuto", (5, 60.0)),
+    ("100/hora", (100, 3600.0)),
+    ("3/segundo", (3, 1.0)),
+    ("10/30", (10, 30.0)),
+])
+def test_parsear_limite(limite, esperado):
+    assert parsear_limite(limite) == esperado
+
+# Pruebas de MemoriaLimitador
+def test_ventana_deslizante():
+    limitador = MemoriaLimitador()
+    with patch('app.core.limites.time.monotonic') as reloj:
+        for instante in (0, 10, 20):
+            reloj.return_value = instante
+            assert limitador.consumir("k", 3, 60) is None
+        reloj.return_value = 30
+        assert limitador.consumir("k", 3, 60) == 30  # La primera sale de la ventana en t=60
+        reloj.return_value = 60
+        assert limitador.consumir("k", 3, 60) is None
+        assert limitador.consumir("k", 3, 60) == 10
+        # Las peticiones rechazadas no alargan la ventana
+        reloj.return_value = 71
+        assert limitador.consumir("k", 3, 60) is None
+
+def test_claves_independientes_y_acotadas():
+    limitador = MemoriaLimitador(max_claves=2)
+    assert limitador.consumir("a", 1, 60) is None
+    assert limitador.consumir("a", 1, 60) is not None
+    assert limitador.consumir("b", 1, 60) is None
+    assert limitador.consumir("c", 1, 60) is None  # Desaloja "a", la menos usada
+    assert limitador.consumir("a", 1, 60) is None
+
+def test_reiniciar():
+    limitador = MemoriaLimitador()
+    limitador.consumir("k", 1, 60)
+    limitador.reiniciar("k")
+    assert limitador.consumir("k", 1, 60) is None
+
+# Pruebas de las rutas de autenticación
+def _login(api_client, email, ip="10.0.0.1"):
+    return api_client.post("/api/auth/login", json={"email": email, "password": "securepassword123"},
+                           environ_base={"REMOTE_ADDR": ip})
+
+def test_login_limitado_por_email_antes_del_servicio(api_client, monkeypatch):
+    monkeypatch.setitem(settings.LIMITES_PETICIONES, "auth.login", {"ip": "100/minuto", "email": "3/minuto"})
+    with patch('app.routes.auth.login_user_service', return_value=({"message": "Invalid credentials"}, 401)) as servicio:
+        for _ in range(3):
+            assert _login(api_client, "Ana@Example.com").status_code == 401
+        response = _login(api_client, "ana@example.com ", ip="10.0.0.2")  # Mismo email normalizado, otra IP
+        assert response.status_code == 429
+        assert 1 <= int(response.headers["Retry-After"]) <= 60
+        assert response.get_json()["message"] == "Demasiadas peticiones, inténtelo más tarde"
+        assert servicio.call_count == 3
+
+        # Otro email desde la misma IP sigue pasando
+        assert _login(api_client, "luis@example.com").status_code == 401
+
+def test_login_limitado_por_ip(api_client, monkeypatch):
+    monkeypatch.setitem(settings.LIMITES_PETICIONES, "auth.login", {"ip": "2/minuto", "email": "100/minuto"})
+    with patch('app.routes.auth.login_user_service', return_value=({"message": "Invalid credentials"}, 401)):
+        assert _login(api_client, "a@example.com").status_code == 401
+        assert _login(api_client, "b@example.com").status_code == 401
+        assert _login(api_client, "c@example.com").status_code == 429
+        assert _login(api_client, "c@example.com", ip="10.0.0.9").status_code == 401
+
+def test_register_limitado_por_ip(api_client, monkeypatch):
+    monkeypatch.setitem(settings.LIMITES_PETICIONES, "auth.register", {"ip": "1/minuto"})
+    with patch('app.routes.auth.register_user_service', return_value=({"message": "User created successfully"}, 201)):
+        datos = {"email": "nuevo@example.com", "password": "securepassword123"}
+        assert api_client.post("/api/auth/register", json=datos).status_code == 201
+        assert api_client.post("/api/auth/register", json=datos).status_code == 429
+
+def test_limites_desactivados(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "LIMITES_ACTIVOS", False)
+    monkeypatch.setitem(settings.LIMITES_PETICIONES, "auth.login", {"ip": "1/minuto"})
+    with patch('app.routes.auth.login_user_service', return_value=({"message": "Invalid credentials"}, 401)):
+        assert _login(api_client, "a@example.com").status_code == 401
+        assert _login(api_client, "a@example.com").status_code == 401
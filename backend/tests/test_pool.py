@@ -0,0 +1,79 @@
+import threading
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from app import db
+from app.core.config import settings
+from app.core.pool import MetricasPool, QueuePoolMedido, opciones_engine, estadisticas_pool
+
+# Pruebas para opciones_engine
+def test_opciones_engine_postgres(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    opciones = opciones_engine("postgresql+psycopg2://u:p@localhost/db")
+    assert opciones["poolclass"] is QueuePoolMedido
+    assert opciones["pool_size"] == 20
+    assert opciones["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert opciones["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+def test_opciones_engine_sin_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 0)
+    assert "connect_args" not in opciones_engine("postgresql://localhost/db")
+
+def test_opciones_engine_sqlite():
+    assert opciones_engine("sqlite:///eventos.db")["connect_args"] == {"check_same_thread": False}
+
+# Pruebas de las métricas del pool
+@pytest.fixture
+def metricas(monkeypatch):
+    metricas = MetricasPool()
+    monkeypatch.setattr('app.core.pool._metricas', metricas)
+    return metricas
+
+def test_metricas_pool_agotado(metricas):
+    metricas.registrar(0.001)
+    metricas.registrar(0.5, agotada=True)
+    assert metricas.estadisticas() == {
+        "obtenidas": 1, "agotadas": 1, "espera_media_ms": 250.5,
+        "espera_p50_ms": 500.0, "espera_p99_ms": 500.0, "espera_maxima_ms": 500.0,
+    }
+
+@pytest.fixture
+def app_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    app = Flask(__name__)
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones_engine(url)
+    db.init_app(app)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+def test_metricas_de_espera_y_saturacion(app_pool, metricas):
+    with app_pool.app_context():
+        engine = db.engine
+        conexion = engine.connect()
+        conexion.execute(text("SELECT 1"))
+        estado = estadisticas_pool(engine.pool)
+        assert (estado["en_uso"], estado["saturacion"]) == (1, 1.0)
+
+        # Con el pool lleno la siguiente petición espera a que se devuelva la conexión
+        liberar = threading.Timer(0.2, conexion.close)
+        liberar.start()
+        with engine.connect() as otra:
+            otra.execute(text("SELECT 1"))
+        liberar.join()
+
+        estado = estadisticas_pool(engine.pool)
+    assert estado["en_uso"] == 0
+    assert estado["obtenidas"] == 2
+    assert estado["agotadas"] == 0
+    assert estado["espera_maxima_ms"] >= 150
+    assert estado["espera_p99_ms"] == estado["espera_maxima_ms"]
+
+def test_estadisticas_pool_por_api(db_app, api_client, auth_headers):
+    response = api_client.get("/api/eventos/pool/estadisticas", headers=auth_headers)
+    assert response.status_code == 200
+    assert {"obtenidas", "agotadas", "espera_media_ms", "espera_p99_ms"} <= set(response.get_json())
@@ -0,0 +1,100 @@
+import gzip
+import json
+import pytest
+from datetime import datetime, date, timezone, timedelta
+from decimal import Decimal
+from uuid import UUID
+from sqlalchemy import insert
+from app import db
+from app.core.config import settings
+from app.core.representaciones import codificar_json
+from app.models.eventos import eventos_table
+from app.models.sesiones import sesiones_table
+from app.models.associations import asistentes_sesion
+from app.models.usuarios import usuarios_table
+
+DATOS = {
+    "naive": datetime(2025, 6, 1, 10, 0, 0, 123456),
+    "utc": datetime(2025, 6, 1, 10, tzinfo=timezone.utc),
+    "bogota": datetime(2025, 6, 1, 10, tzinfo=timezone(timedelta(hours=-5))),
+    "dia": date(2025, 6, 1),
+    "decimal": Decimal("1.50"),
+    "uuid": UUID("12345678-1234-5678-1234-567812345678"),
+    "texto": "Ñandú ☃",
+    "lista": [1, None, True, 2.5],
+}
+
+# Pruebas para codificar_json
+@pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+def test_codificar_json_fechas_iso(monkeypatch, backend):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(settings, "JSON_BACKEND", backend)
+    assert json.loads(codificar_json(DATOS)) == {
+        "naive": "2025-06-01T10:00:00.123456",
+        "utc": "2025-06-01T10:00:00+00:00",
+        "bogota": "2025-06-01T10:00:00-05:00",
+        "dia": "2025-06-01",
+        "decimal": "1.50",
+        "uuid": "12345678-1234-5678-1234-567812345678",
+        "texto": "Ñandú ☃",
+        "lista": [1, None, True, 2.5],
+    }
+
+def test_codificar_json_misma_salida_con_y_sin_orjson(monkeypatch):
+    pytest.importorskip("orjson")
+    rapido = codificar_json(DATOS)
+    monkeypatch.setattr(settings, "JSON_BACKEND", "stdlib")
+    assert codificar_json(DATOS) == rapido
+
+def test_codificar_json_tipo_no_soportado():
+    with pytest.raises(TypeError):
+        codificar_json({"conjunto": object()})
+
+# Pruebas de la representación JSON y la compresión en la API
+@pytest.fixture
+def sesiones_con_asistentes(db_app):
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", capacidad_maxima=500,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.execute(insert(sesiones_table), [
+            {"id": i, "evento_id": 1, "nombre": f"Sesión {i}", "descripcion": "Una descripción algo larga " * 3,
+             "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 10, i), "fecha_fin": datetime(2025, 6, 1, 11, i)}
+            for i in range(1, 41)
+        ])
+        db.session.execute(insert(usuarios_table).values(id=1, email="user1@example.com", password_hash="x"))
+        db.session.execute(insert(asistentes_sesion).values(usuario_id=1, sesion_id=1))
+        db.session.commit()
+    return db_app
+
+def test_fechas_en_iso_sin_isoformat_en_servicios(sesiones_con_asistentes, api_client, auth_headers):
+    sesion = api_client.get("/api/sesiones/sesiones", headers=auth_headers).get_json()["sesiones"][0]
+    assert sesion["fecha_inicio"] == "2025-06-01T10:01:00"
+    assert sesion["fecha_fin"] == "2025-06-01T11:01:00"
+
+    asistencias = api_client.get("/api/sesiones/asistencias", headers=auth_headers).get_json()["asistencias"]
+    assert asistencias == [{
+        "usuario_id": 1, "email": "user1@example.com", "sesion_id": 1,
+        "nombre_sesion": "Sesión 1", "fecha_inicio": "2025-06-01T10:01:00"
+    }]
+
+def test_comprime_con_gzip_sobre_el_umbral(sesiones_con_asistentes, api_client, auth_headers):
+    sin_comprimir = api_client.get("/api/sesiones/sesiones", headers=auth_headers)
+    assert "Content-Encoding" not in sin_comprimir.headers
+    assert "Accept-Encoding" in sin_comprimir.headers["Vary"]
+
+    response = api_client.get("/api/sesiones/sesiones", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.data) < len(sin_comprimir.data)
+    assert gzip.decompress(response.data) == sin_comprimir.data
+
+def test_no_comprime_bajo_el_umbral(sesiones_con_asistentes, api_client, auth_headers, monkeypatch):
+    response = api_client.get("/api/sesiones/validar_capacidad/1", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+    monkeypatch.setattr(settings, "COMPRESION_UMBRAL", 0)
+    response = api_client.get("/api/sesiones/sesiones", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
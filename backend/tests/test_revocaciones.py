@@ -0,0 +1,193 @@
+import time
+import pytest
+import jwt
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from sqlalchemy import insert, select, func
+from werkzeug.security import generate_password_hash
+from app import db
+from app.core.auth import registrar_revocacion
+from app.core.bloom import FiltroBloom
+from app.core.config import settings
+from app.models.tokens import tokens_revocados
+from app.models.usuarios import usuarios_table
+from app.services.revocaciones import token_revocado, purgar_tokens_revocados
+
+CREDENCIALES = {"email": "user1@example.com", "password": "securepassword123"}
+
+# Pruebas para FiltroBloom
+def test_filtro_bloom_sin_falsos_negativos():
+    filtro = FiltroBloom(1000)
+    valores = [f"jti-{i}" for i in range(1000)]
+    for valor in valores:
+        filtro.agregar(valor)
+    assert all(valor in filtro for valor in valores)
+
+def test_filtro_bloom_tasa_de_falsos_positivos():
+    filtro = FiltroBloom(1000, tasa_fp=0.01)
+    for i in range(1000):
+        filtro.agregar(f"jti-{i}")
+    falsos_positivos = sum(f"otro-{i}" in filtro for i in range(10000))
+    assert falsos_positivos < 300  # ~1 % esperado
+
+# Pruebas de refresco, cierre de sesión y revocación en la API
+@pytest.fixture
+def usuario(db_app, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "clave-de-pruebas-de-al-menos-32-bytes")
+    with db_app.app_context():
+        db.session.execute(insert(usuarios_table).values(
+            id=1, email=CREDENCIALES["email"], password_hash=generate_password_hash(CREDENCIALES["password"], "pbkdf2:sha256:1000")
+        ))
+        db.session.commit()
+    registrar_revocacion(token_revocado)
+    return db_app
+
+def _login(api_client):
+    response = api_client.post("/api/auth/login", json=CREDENCIALES)
+    assert response.status_code == 200
+    return response.get_json()
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def _revocados(db_app):
+    with db_app.app_context():
+        return db.session.execute(select(func.count()).select_from(tokens_revocados)).scalar()
+
+def test_login_emite_tokens_de_acceso_y_refresco(usuario, api_client):
+    tokens = _login(api_client)
+    acceso = jwt.decode(tokens["token"], options={"verify_signature": False})
+    refresco = jwt.decode(tokens["refresh_token"], options={"verify_signature": False})
+    assert acceso["tipo"] == "access" and refresco["tipo"] == "refresh"
+    assert acceso["exp"] <= time.time() + settings.ACCESS_TOKEN_MINUTOS * 60 + 1
+    assert refresco["exp"] > acceso["exp"]
+    assert acceso["jti"] != refresco["jti"]
+
+def test_refresh_token_no_sirve_para_autenticar(usuario, api_client):
+    tokens = _login(api_client)
+    response = api_client.get("/api/sesiones/mis-sesiones", headers=_bearer(tokens["refresh_token"]))
+    assert response.status_code == 403
+    assert api_client.get("/api/sesiones/mis-sesiones", headers=_bearer(tokens["token"])).status_code == 200
+
+def test_refresh_rota_los_tokens(usuario, api_client):
+    tokens = _login(api_client)
+    response = api_client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    nuevos = response.get_json()
+    assert set(nuevos) == {"token", "refresh_token"}
+    assert api_client.get("/api/sesiones/mis-sesiones", headers=_bearer(nuevos["token"])).status_code == 200
+
+    # El token de refresco usado ya no vale; el nuevo sí
+    response = api_client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    assert response.get_json() == {"message": "Refresh token has been revoked"}
+    assert api_client.post("/api/auth/refresh", json={"refresh_token": nuevos["refresh_token"]}).status_code == 200
+
+def test_refresh_rechaza_tokens_de_acceso_y_datos_invalidos(usuario, api_client):
+    tokens = _login(api_client)
+    response = api_client.post("/api/auth/refresh", json={"refresh_token": tokens["token"]})
+    assert response.status_code == 401
+    assert api_client.post("/api/auth/refresh", json={"refresh_token": "no.es.jwt"}).status_code == 401
+    assert api_client.post("/api/auth/refresh", json={}).status_code == 400
+    assert _revocados(usuario) == 0
+
+def test_logout_revoca_acceso_y_refresco(usuario, api_client):
+    tokens = _login(api_client)
+    headers = _bearer(tokens["token"])
+    assert api_client.get("/api/sesiones/mis-sesiones", headers=headers).status_code == 200  # Queda en la caché de tokens
+
+    response = api_client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 200
+    assert _revocados(usuario) == 2
+
+    response = api_client.get("/api/sesiones/mis-sesiones", headers=headers)
+    assert response.status_code == 403
+    assert response.get_json() == {"message": "Token has been revoked"}
+    assert api_client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+def test_logout_sin_cuerpo_revoca_solo_el_acceso(usuario, api_client):
+    tokens = _login(api_client)
+    assert api_client.post("/api/auth/logout", headers=_bearer(tokens["token"])).status_code == 200
+    assert _revocados(usuario) == 1
+    assert api_client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+
+def test_logout_rechaza_refresco_de_otro_usuario(usuario, api_client):
+    tokens = _login(api_client)
+    ajeno = jwt.encode(
+        {"sub": "2", "exp": datetime.now(timezone.utc) + timedelta(days=1), "jti": "ajeno", "tipo": "refresh"},
+        settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    response = api_client.post("/api/auth/logout", json={"refresh_token": ajeno}, headers=_bearer(tokens["token"]))
+    assert response.status_code == 400
+    assert _revocados(usuario) == 0
+
+# Pruebas del filtro de revocaciones frente a la base de datos
+def test_token_no_revocado_no_consulta_la_base_de_datos(usuario, revocaciones, contar_consultas):
+    with usuario.app_context():
+        assert token_revocado({"jti": "a"}) is False  # Carga inicial del filtro
+        contar_consultas.clear()
+        for i in range(100):
+            assert token_revocado({"jti": f"jti-{i}"}) is False
+    assert contar_consultas == []
+
+def test_revocaciones_de_otros_workers_se_aplican_al_sincronizar(usuario, revocaciones):
+    with usuario.app_context():
+        assert token_revocado({"jti": "otro-worker"}) is False
+        # Revocación hecha por otro proceso: solo está en la tabla
+        db.session.execute(insert(tokens_revocados).values(
+            jti="otro-worker", usuario_id=1, expira=datetime(2100, 1, 1), revocado_en=datetime(2099, 1, 1)
+        ))
+        db.session.commit()
+        assert token_revocado({"jti": "otro-worker"}) is False  # Aún dentro del intervalo de refresco
+        with patch('app.services.revocaciones.time.monotonic', return_value=10**9):
+            assert token_revocado({"jti": "otro-worker"}) is True
+
+def test_falso_positivo_se_confirma_en_la_base_de_datos(usuario, revocaciones):
+    with usuario.app_context():
+        token_revocado({"jti": "x"})
+        with patch.object(FiltroBloom, '__contains__', return_value=True):
+            assert token_revocado({"jti": "no-revocado"}) is False
+
+def test_tokens_sin_jti_no_se_consideran_revocados(usuario):
+    with usuario.app_context():
+        assert token_revocado({"sub": "1"}) is False
+
+def test_purgar_tokens_revocados(usuario):
+    with usuario.app_context():
+        db.session.execute(insert(tokens_revocados), [
+            {"jti": "expirado", "usuario_id": 1, "expira": datetime(2000, 1, 1), "revocado_en": datetime(2000, 1, 1)},
+            {"jti": "vigente", "usuario_id": 1, "expira": datetime(2100, 1, 1), "revocado_en": datetime(2099, 1, 1)},
+        ])
+        db.session.commit()
+        assert purgar_tokens_revocados() == 1
+        assert db.session.execute(select(tokens_revocados.c.jti)).scalars().all() == ["vigente"]
+
+def test_comprobacion_no_deja_transaccion_abierta_en_la_sesion(usuario, api_client, monkeypatch):
+    from app.models.eventos import eventos_table
+    from app.services.revocaciones import RevocacionesTokens
+
+    # Sincronización en cada petición y un falso positivo que obliga a confirmar en la base de datos
+    monkeypatch.setattr('app.services.revocaciones._revocaciones', RevocacionesTokens(capacidad=1000, refresco=0))
+    with usuario.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", capacidad_maxima=10,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.commit()
+    headers = _bearer(_login(api_client)["token"])
+    with patch.object(FiltroBloom, '__contains__', return_value=True):
+        response = api_client.delete("/api/eventos/1/eliminar", headers=headers)
+    assert response.status_code == 204
+
+def test_sincronizacion_no_cuenta_dos_veces_las_revocaciones(usuario, revocaciones):
+    with usuario.app_context():
+        db.session.execute(insert(tokens_revocados), [
+            {"jti": f"jti-{i}", "usuario_id": 1, "expira": datetime(2100, 1, 1), "revocado_en": datetime(2099, 1, 1)}
+            for i in range(3)
+        ])
+        db.session.commit()
+        token_revocado({"jti": "x"})
+        for i in range(1, 4):
+            with patch('app.services.revocaciones.time.monotonic', return_value=10**9 * i):
+                token_revocado({"jti": "x"})
+    assert revocaciones.elementos == 3
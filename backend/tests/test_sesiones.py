@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 from datetime import datetime, timezone
 from app.services.sesiones import (
     crear_sesion_service,
@@ -9,9 +9,9 @@ from app.services.sesiones import (
     registrar_asistente_service,
     listar_sesiones_service,
     listar_asistencias_service,
-    asignar_ponente_service
+    asignar_ponente_service,
+    registrar_asistentes_lote_service
 )
-from marshmallow import ValidationError
 
 # Fixture para datos de sesión válidos
 @pytest.fixture
@@ -32,8 +32,8 @@ def mock_evento():
     evento = MagicMock()
     evento._mapping = {
         "id": 1,
-        "fecha_inicio": datetime(2025, 6, 1, 9, 0, tzinfo=timezone.utc),
-        "fecha_fin": datetime(2025, 6, 1, 15, 0, tzinfo=timezone.utc)
+        "fecha_inicio": datetime(2025, 6, 1, 9, 0),
+        "fecha_fin": datetime(2025, 6, 1, 15, 0)
     }
     return evento
 
@@ -46,14 +46,16 @@ def mock_sesion():
         "evento_id": 1,
         "nombre": "Taller de Python",
         "descripcion": "Un taller práctico de Python",
-        "fecha_inicio": datetime(2025, 6, 1, 10, 0, tzinfo=timezone.utc),  # Rango de sesión
-        "fecha_fin": datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc),      # Rango de sesión
+        "fecha_inicio": datetime(2025, 6, 1, 10, 0),  # Rango de sesión (UTC sin zona horaria)
+        "fecha_fin": datetime(2025, 6, 1, 12, 0),      # Rango de sesión (UTC sin zona horaria)
         "capacidad_maxima": 50,
-        "ponente": "Juan Pérez"
+        "ponente": "Juan Pérez",
+        "asistentes_actuales": 30
     }
     sesion.id = 1
     sesion.evento_id = 1
     sesion.capacidad_maxima = 50
+    sesion.asistentes_actuales = 30
     return sesion
 
 # Pruebas para crear_sesion_service
@@ -62,14 +64,14 @@ def test_crear_sesion_service_success(mock_db_session, sesion_data, mock_evento)
     mock_evento_result = MagicMock()
     mock_evento_result.fetchone.return_value = mock_evento
 
-    # Simulamos el resultado de la segunda consulta: buscar sesiones existentes
-    mock_sesiones_result = MagicMock()
-    mock_sesiones_result.fetchall.return_value = []  # No hay solapamiento
+    # Simulamos el resultado de la segunda consulta: fin de la sesión anterior del evento
+    mock_solapamiento_result = MagicMock()
+    mock_solapamiento_result.scalar.return_value = None  # No hay solapamiento
 
     # Asignamos las respuestas simuladas al side_effect
     mock_db_session.execute.side_effect = [
-        mock_evento_result,    # Para buscar el evento
-        mock_sesiones_result,  # Para buscar otras sesiones
+        mock_evento_result,        # Para buscar el evento
+        mock_solapamiento_result,  # Para buscar la sesión anterior
         MagicMock()            # Para el insert
     ]
 
@@ -97,7 +99,7 @@ def test_crear_sesion_service_evento_not_found(mock_db_session, sesion_data):
     assert result["message"] == "Evento no encontrado"
 
 def test_crear_sesion_service_invalid_dates(mock_db_session, sesion_data, mock_evento):
-    mock_evento._mapping["fecha_inicio"] = datetime(2025, 6, 1, 11, 0, tzinfo=timezone.utc)  # Fecha inicio del evento después de la sesión
+    mock_evento._mapping["fecha_inicio"] = datetime(2025, 6, 1, 11, 0)  # Fecha inicio del evento después de la sesión
     result_evento = MagicMock()
     result_evento.fetchone.return_value = mock_evento
     mock_db_session.execute.return_value = result_evento
@@ -108,23 +110,29 @@ def test_crear_sesion_service_invalid_dates(mock_db_session, sesion_data, mock_e
 def test_crear_sesion_service_overlap(mock_db_session, sesion_data, mock_evento, mock_sesion):
     result_evento = MagicMock()
     result_evento.fetchone.return_value = mock_evento
-    result_sesiones = MagicMock()
-    result_sesiones.fetchall.return_value = [mock_sesion]  # Sesión existente que se solapa
+    result_solapamiento = MagicMock()
+    result_solapamiento.scalar.return_value = mock_sesion._mapping["fecha_fin"]  # Sesión existente que se solapa
     mock_db_session.execute.side_effect = [
         result_evento,
-        result_sesiones
+        result_solapamiento
     ]
     result, status_code = crear_sesion_service(sesion_data)
     assert status_code == 400
     assert result["message"] == "La sesión se solapa con otra sesión del evento"
 
 # Pruebas para actualizar_sesion_service
-def test_actualizar_sesion_service_success(mock_db_session, sesion_data, mock_sesion):
+def test_actualizar_sesion_service_success(mock_db_session, sesion_data, mock_sesion, mock_evento):
     result_sesion = MagicMock()
     result_sesion.fetchone.return_value = mock_sesion
+    result_evento = MagicMock()
+    result_evento.fetchone.return_value = mock_evento
+    result_solapamiento = MagicMock()
+    result_solapamiento.scalar.return_value = None
     result_update = MagicMock()
     mock_db_session.execute.side_effect = [
         result_sesion,
+        result_evento,
+        result_solapamiento,
         result_update
     ]
     result, status_code = actualizar_sesion_service(1, sesion_data)
@@ -173,15 +181,11 @@ def test_eliminar_sesion_service_not_found(mock_db_session):
 def test_validar_capacidad_sesion_service_success(mock_db_session, mock_sesion):
     result_sesion = MagicMock()
     result_sesion.fetchone.return_value = mock_sesion
-    result_count = MagicMock()
-    result_count.scalar.return_value = 30
-    mock_db_session.execute.side_effect = [
-        result_sesion,
-        result_count
-    ]
+    mock_db_session.execute.return_value = result_sesion
     result, status_code = validar_capacidad_sesion_service(1)
     assert status_code == 200
     assert result["capacidad_disponible"] == 20  # 50 - 30
+    mock_db_session.execute.assert_called_once()
 
 def test_validar_capacidad_sesion_service_not_found(mock_db_session):
     result_sesion = MagicMock()
@@ -201,20 +205,19 @@ def test_registrar_asistente_service_success(mock_db_session, mock_sesion, asist
     result_sesion.fetchone.return_value = mock_sesion
     result_evento = MagicMock()
     result_evento.fetchone.return_value = MagicMock()  # Usuario registrado en el evento
-    result_count = MagicMock()
-    result_count.scalar.return_value = 20  # Asistentes actuales
     result_verificar = MagicMock()
     result_verificar.fetchone.return_value = None  # No registrado en la sesión
     result_conflicto = MagicMock()
-    result_conflicto.fetchone.return_value = None  # No hay conflictos
+    result_conflicto.scalars.return_value.all.return_value = []  # No hay conflictos
     result_insert = MagicMock()
+    result_contador = MagicMock(rowcount=1)  # Incremento del contador
     mock_db_session.execute.side_effect = [
         result_sesion,
         result_evento,
-        result_count,
         result_verificar,
         result_conflicto,
-        result_insert
+        result_insert,
+        result_contador
     ]
     result, status_code = registrar_asistente_service(1, asistente_data)
     assert status_code == 201
@@ -243,34 +246,52 @@ def test_registrar_asistente_service_not_registered_event(mock_db_session, mock_
     assert result["message"] == "El usuario no está registrado en el evento"
 
 def test_registrar_asistente_service_capacity_exceeded(mock_db_session, mock_sesion, asistente_data):
+    mock_sesion._mapping["asistentes_actuales"] = 50  # Capacidad máxima alcanzada
     result_sesion = MagicMock()
     result_sesion.fetchone.return_value = mock_sesion
     result_evento = MagicMock()
     result_evento.fetchone.return_value = MagicMock()  # Registrado en el evento
-    result_count = MagicMock()
-    result_count.scalar.return_value = 50  # Capacidad máxima alcanzada
+    mock_db_session.execute.side_effect = [
+        result_sesion,
+        result_evento
+    ]
+    result, status_code = registrar_asistente_service(1, asistente_data)
+    assert status_code == 400
+    assert result["message"] == "La sesión ha alcanzado su capacidad máxima"
+
+def test_registrar_asistente_service_capacity_exceeded_concurrently(mock_db_session, mock_sesion, asistente_data):
+    result_sesion = MagicMock()
+    result_sesion.fetchone.return_value = mock_sesion
+    result_evento = MagicMock()
+    result_evento.fetchone.return_value = MagicMock()
+    result_verificar = MagicMock()
+    result_verificar.fetchone.return_value = None
+    result_conflicto = MagicMock()
+    result_conflicto.scalars.return_value.all.return_value = []
     mock_db_session.execute.side_effect = [
         result_sesion,
         result_evento,
-        result_count
+        result_verificar,
+        result_conflicto,
+        MagicMock(),             # Insert
+        MagicMock(rowcount=0)    # Otro registro ocupó el último cupo
     ]
     result, status_code = registrar_asistente_service(1, asistente_data)
     assert status_code == 400
     assert result["message"] == "La sesión ha alcanzado su capacidad máxima"
+    mock_db_session.rollback.assert_called_once()
+    mock_db_session.commit.assert_not_called()
 
 def test_registrar_asistente_service_already_registered(mock_db_session, mock_sesion, asistente_data):
     result_sesion = MagicMock()
     result_sesion.fetchone.return_value = mock_sesion
     result_evento = MagicMock()
     result_evento.fetchone.return_value = MagicMock()  # Registrado en el evento
-    result_count = MagicMock()
-    result_count.scalar.return_value = 20
     result_verificar = MagicMock()
     result_verificar.fetchone.return_value = MagicMock()  # Ya registrado en la sesión
     mock_db_session.execute.side_effect = [
         result_sesion,
         result_evento,
-        result_count,
         result_verificar
     ]
     result, status_code = registrar_asistente_service(1, asistente_data)
@@ -282,39 +303,33 @@ def test_registrar_asistente_service_conflict(mock_db_session, mock_sesion, asis
     result_sesion.fetchone.return_value = mock_sesion
     result_evento = MagicMock()
     result_evento.fetchone.return_value = MagicMock()  # Registrado en el evento
-    result_count = MagicMock()
-    result_count.scalar.return_value = 20
     result_verificar = MagicMock()
     result_verificar.fetchone.return_value = None  # No registrado en la sesión
     result_conflicto = MagicMock()
-    result_conflicto.fetchone.return_value = MagicMock()  # Conflicto con otra sesión
+    result_conflicto.scalars.return_value.all.return_value = [7]  # Conflicto con otra sesión
     mock_db_session.execute.side_effect = [
         result_sesion,
         result_evento,
-        result_count,
         result_verificar,
         result_conflicto
     ]
     result, status_code = registrar_asistente_service(1, asistente_data)
     assert status_code == 400
     assert result["message"] == "El usuario ya está registrado en otra sesión que se solapa con esta"
+    assert result["sesiones_en_conflicto"] == [7]
 
 # Pruebas para listar_sesiones_service
 def test_listar_sesiones_service_success(mock_db_session, mock_sesion):
     result_sesiones = MagicMock()
     result_sesiones.fetchall.return_value = [mock_sesion]
-    result_count = MagicMock()
-    result_count.scalar.return_value = 30
-    mock_db_session.execute.side_effect = [
-        result_sesiones,
-        result_count
-    ]
+    mock_db_session.execute.return_value = result_sesiones
     result, status_code = listar_sesiones_service()
     assert status_code == 200
     assert len(result["sesiones"]) == 1
     assert result["sesiones"][0]["id"] == 1
     assert result["sesiones"][0]["asistentes_actuales"] == 30
     assert result["sesiones"][0]["capacidad_disponible"] == 20
+    mock_db_session.execute.assert_called_once()
 
 def test_listar_sesiones_service_no_sesiones(mock_db_session):
     result_sesiones = MagicMock()
@@ -385,4 +400,586 @@ def test_asignar_ponente_service_not_found(mock_db_session):
     mock_db_session.execute.return_value = result_update
     result, status_code = asignar_ponente_service(1, data)
     assert status_code == 404
-    assert result["message"] == "Sesión no encontrada"
\ No newline at end of file
+    assert result["message"] == "Sesión no encontrada"
+# Pruebas para registrar_asistentes_lote_service
+def test_registrar_asistentes_lote_service_informe(db_app):
+    from sqlalchemy import insert, select
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+    from app.models.associations import asistentes_evento, asistentes_sesion
+    from app.services.sesiones import registrar_asistentes_lote_service
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", capacidad_maxima=100,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.execute(insert(sesiones_table), [
+            {"id": 1, "evento_id": 1, "nombre": "Keynote", "ponente": "A", "capacidad_maxima": 3,
+             "fecha_inicio": datetime(2025, 6, 1, 10), "fecha_fin": datetime(2025, 6, 1, 11)},
+            {"id": 2, "evento_id": 1, "nombre": "Taller", "ponente": "B", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 10, 30), "fecha_fin": datetime(2025, 6, 1, 12)},
+        ])
+        db.session.execute(insert(asistentes_evento), [{"usuario_id": i, "evento_id": 1} for i in range(1, 7)])
+        db.session.execute(insert(asistentes_sesion), [
+            {"usuario_id": 1, "sesion_id": 1},  # Ya registrado
+            {"usuario_id": 2, "sesion_id": 2},  # Sesión que se solapa
+        ])
+        db.session.execute(sesiones_table.update().where(sesiones_table.c.id == 1).values(asistentes_actuales=1))
+        db.session.commit()
+
+        result, status_code = registrar_asistentes_lote_service(1, {"usuario_ids": [1, 2, 3, 4, 5, 42]})
+        contador = db.session.execute(select(sesiones_table.c.asistentes_actuales).where(sesiones_table.c.id == 1)).scalar()
+
+    assert status_code == 200
+    assert result["registrados"] == 2
+    assert [r["estado"] for r in result["resultados"]] == [
+        "ya_registrado", "conflicto_horario", "registrado", "registrado", "lleno", "no_registrado_evento"
+    ]
+    assert contador == 3
+
+def test_registrar_asistentes_lote_service_not_found(mock_db_session):
+    result_lock = MagicMock()
+    result_lock.fetchone.return_value = None
+    mock_db_session.execute.return_value = result_lock
+    result, status_code = registrar_asistentes_lote_service(1, {"usuario_ids": [1, 2]})
+    assert status_code == 404
+    assert result["message"] == "Sesión no encontrada"
+
+def test_registrar_asistentes_lote_service_error_hace_rollback(mock_db_session):
+    mock_db_session.execute.side_effect = RuntimeError("conexión perdida")
+    result, status_code = registrar_asistentes_lote_service(1, {"usuario_ids": [1, 2]})
+    assert status_code == 500
+    assert "conexión perdida" in result["message"]
+    mock_db_session.rollback.assert_called_once()
+
+def test_registrar_asistentes_lote_sin_aceptados_conserva_la_version(db_app):
+    from sqlalchemy import insert, select
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+    from app.services.sesiones import registrar_asistentes_lote_service
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", capacidad_maxima=100,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.execute(insert(sesiones_table).values(
+            id=1, evento_id=1, nombre="Keynote", ponente="A", capacidad_maxima=3,
+            fecha_inicio=datetime(2025, 6, 1, 10), fecha_fin=datetime(2025, 6, 1, 11)
+        ))
+        db.session.commit()
+        version = db.session.execute(select(sesiones_table.c.version)).scalar()
+
+        result, status_code = registrar_asistentes_lote_service(1, {"usuario_ids": [7, 8]})  # Sin registro en el evento
+        assert (status_code, result["registrados"]) == (200, 0)
+        assert db.session.execute(select(sesiones_table.c.version)).scalar() == version
+
+# Pruebas del endpoint /api/sesiones/sesiones contra una base de datos real
+@pytest.fixture
+def muchas_sesiones(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table), [
+            {"id": e, "nombre": f"Evento {e}", "capacidad_maxima": 100,
+             "fecha_inicio": datetime(2025, 6, 1, 9), "fecha_fin": datetime(2025, 6, 1, 18)}
+            for e in (1, 2)
+        ])
+        db.session.execute(insert(sesiones_table), [
+            {"id": i, "evento_id": 1 if i <= 30 else 2, "nombre": f"Sesión {i}", "ponente": "P",
+             "capacidad_maxima": 10, "asistentes_actuales": i % 10,
+             "fecha_inicio": datetime(2025, 6, 1, 10), "fecha_fin": datetime(2025, 6, 1, 11)}
+            for i in range(1, 51)
+        ])
+        db.session.commit()
+    return db_app
+
+def test_listar_sesiones_endpoint_una_consulta(muchas_sesiones, api_client, auth_headers, contar_consultas):
+    response = api_client.get("/api/sesiones/sesiones", headers=auth_headers)
+    assert response.status_code == 200
+    sesiones = response.get_json()["sesiones"]
+    assert len(sesiones) == 50
+    assert sesiones[4]["asistentes_actuales"] == 5
+    assert sesiones[4]["capacidad_disponible"] == 5
+    assert len(contar_consultas) == 1
+
+def test_listar_sesiones_endpoint_filtro_y_paginacion(muchas_sesiones, api_client, auth_headers, contar_consultas):
+    response = api_client.get("/api/sesiones/sesiones?evento_id=1&page=2&per_page=20", headers=auth_headers)
+    data = response.get_json()
+    assert response.status_code == 200
+    assert [s["id"] for s in data["sesiones"]] == list(range(21, 31))
+    assert data["page"] == 2
+    assert data["per_page"] == 20
+    assert len(contar_consultas) == 1
+
+def test_listar_sesiones_service_limita_per_page(mock_db_session):
+    mock_db_session.execute.return_value.fetchall.return_value = []
+    result, status_code = listar_sesiones_service(page=1, per_page=1000000)
+    assert status_code == 200
+    assert result["per_page"] == 100
+
+# Pruebas para exportar_asistencias_service
+@pytest.fixture
+def asistencias(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+    from app.models.associations import asistentes_sesion
+    from app.models.usuarios import usuarios_table
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table), [
+            {"id": e, "nombre": f"Evento {e}", "capacidad_maxima": 100,
+             "fecha_inicio": datetime(2025, 6, 1, 9), "fecha_fin": datetime(2025, 6, 1, 18)}
+            for e in (1, 2)
+        ])
+        db.session.execute(insert(sesiones_table), [
+            {"id": 1, "evento_id": 1, "nombre": "Taller, práctico", "ponente": "A", "capacidad_maxima": 5000,
+             "fecha_inicio": datetime(2025, 6, 1, 10), "fecha_fin": datetime(2025, 6, 1, 11)},
+            {"id": 2, "evento_id": 2, "nombre": "Charla", "ponente": "B", "capacidad_maxima": 5000,
+             "fecha_inicio": datetime(2025, 6, 1, 12), "fecha_fin": datetime(2025, 6, 1, 13)},
+        ])
+        db.session.execute(insert(usuarios_table), [
+            {"id": i, "email": f"user{i}@example.com", "password_hash": "x"} for i in range(1, 2501)
+        ])
+        db.session.execute(insert(asistentes_sesion), [
+            {"usuario_id": i, "sesion_id": 1 if i <= 2000 else 2} for i in range(1, 2501)
+        ])
+        db.session.commit()
+    return db_app
+
+def test_exportar_asistencias_ndjson(asistencias, api_client, auth_headers):
+    import json
+
+    response = api_client.get("/api/sesiones/asistencias/exportar", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    lineas = response.get_data(as_text=True).splitlines()
+    assert len(lineas) == 2500
+    primera = json.loads(lineas[0])
+    assert set(primera) == {"usuario_id", "email", "sesion_id", "nombre_sesion", "fecha_inicio"}
+
+def test_exportar_asistencias_csv_con_filtros(asistencias, api_client, auth_headers):
+    import csv
+    import io
+
+    response = api_client.get("/api/sesiones/asistencias/exportar?formato=csv&evento_id=1", headers=auth_headers)
+    assert response.mimetype == "text/csv"
+    filas = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert filas[0] == ["usuario_id", "email", "sesion_id", "nombre_sesion", "fecha_inicio"]
+    assert len(filas) == 2001
+    assert {fila[3] for fila in filas[1:]} == {"Taller, práctico"}
+
+    response = api_client.get("/api/sesiones/asistencias/exportar?formato=csv&sesion_id=2", headers=auth_headers)
+    assert len(response.get_data(as_text=True).splitlines()) == 501
+
+def test_exportar_asistencias_formato_invalido(mock_db_session):
+    from app.services.sesiones import exportar_asistencias_service
+
+    result, status_code = exportar_asistencias_service(formato="xml")
+    assert status_code == 400
+    mock_db_session.execute.assert_not_called()
+
+# Pruebas de GET condicional en /api/sesiones/<evento_id>/sesiones
+def test_sesiones_evento_etag_304(muchas_sesiones, api_client, auth_headers):
+    response = api_client.get("/api/sesiones/1/sesiones")
+    etag = response.headers["ETag"]
+    assert len(response.get_json()) == 30
+    assert api_client.get("/api/sesiones/1/sesiones", headers={"If-None-Match": etag}).status_code == 304
+    assert api_client.get("/api/sesiones/2/sesiones", headers={"If-None-Match": etag}).status_code == 200
+
+    api_client.put("/api/sesiones/asignar_ponente/3", headers=auth_headers, json={"ponente": "Nuevo"})
+    response = api_client.get("/api/sesiones/1/sesiones", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()[2]["ponente"] == "Nuevo"
+
+# Pruebas de consulta de varias sesiones por ID
+def test_obtener_sesiones_por_ids(muchas_sesiones, api_client, auth_headers, contar_consultas):
+    response = api_client.get("/api/sesiones/lote?ids=5,77,1", headers=auth_headers)
+    data = response.get_json()
+    assert response.status_code == 200
+    assert [s["id"] for s in data["sesiones"]] == [5, 1]
+    assert data["sesiones"][0]["capacidad_disponible"] == 5
+    assert data["no_encontrados"] == [77]
+    assert len(contar_consultas) == 1
+
+def test_validar_capacidad_sesiones(muchas_sesiones, api_client, auth_headers, contar_consultas):
+    response = api_client.get("/api/sesiones/validar_capacidad?ids=2,9,100", headers=auth_headers)
+    assert response.get_json() == {
+        "capacidades": [{"id": 2, "capacidad_disponible": 8}, {"id": 9, "capacidad_disponible": 1}],
+        "no_encontrados": [100]
+    }
+    assert len(contar_consultas) == 1
+
+def test_validar_capacidad_sesiones_sin_ids(mock_db_session):
+    from app.services.sesiones import validar_capacidad_sesiones_service
+
+    result, status_code = validar_capacidad_sesiones_service(None)
+    assert status_code == 400
+    mock_db_session.execute.assert_not_called()
+
+# Pruebas de solapamiento contra una base de datos real
+@pytest.fixture
+def evento_con_sesiones(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=1, nombre="Congreso", capacidad_maxima=100,
+            fecha_inicio=datetime(2025, 6, 1, 9), fecha_fin=datetime(2025, 6, 1, 18)
+        ))
+        db.session.execute(insert(sesiones_table), [
+            {"id": i + 1, "evento_id": 1, "nombre": f"Sesión {i + 1}", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 9 + 2 * i), "fecha_fin": datetime(2025, 6, 1, 10 + 2 * i)}
+            for i in range(4)  # 09-10, 11-12, 13-14, 15-16
+        ])
+        db.session.commit()
+    return db_app
+
+@pytest.mark.parametrize("inicio, fin, status_code", [
+    ("2025-06-01T10:00:00", "2025-06-01T11:00:00", 201),  # Toca las sesiones anterior y siguiente
+    ("2025-06-01T09:30:00", "2025-06-01T10:30:00", 400),  # Empieza dentro de la anterior
+    ("2025-06-01T10:30:00", "2025-06-01T11:30:00", 400),  # Termina dentro de la siguiente
+    ("2025-06-01T10:00:00", "2025-06-01T17:00:00", 400),  # Contiene varias sesiones
+    ("2025-06-01T16:00:00", "2025-06-01T18:00:00", 201),  # Después de la última
+])
+def test_crear_sesion_solapamiento_en_bd(evento_con_sesiones, sesion_data, inicio, fin, status_code):
+    with evento_con_sesiones.app_context():
+        result, status = crear_sesion_service({**sesion_data, "fecha_inicio": inicio, "fecha_fin": fin})
+    assert status == status_code
+    if status_code == 400:
+        assert result["message"] == "La sesión se solapa con otra sesión del evento"
+
+def test_actualizar_sesion_rechaza_solapamiento(evento_con_sesiones, sesion_data):
+    with evento_con_sesiones.app_context():
+        # Mover la sesión 2 (11-12) sobre sí misma no es un solapamiento; sobre la sesión 3 (13-14) sí
+        result, status = actualizar_sesion_service(2, {**sesion_data, "fecha_inicio": "2025-06-01T11:00:00", "fecha_fin": "2025-06-01T12:30:00"})
+        assert status == 200
+        result, status = actualizar_sesion_service(2, {**sesion_data, "fecha_inicio": "2025-06-01T12:30:00", "fecha_fin": "2025-06-01T13:30:00"})
+        assert status == 400
+        assert result["message"] == "La sesión se solapa con otra sesión del evento"
+
+def test_crear_y_actualizar_sesion_rechazan_fechas_invertidas(evento_con_sesiones, sesion_data):
+    fechas = {"fecha_inicio": "2025-06-01T17:00:00", "fecha_fin": "2025-06-01T16:30:00"}
+    with evento_con_sesiones.app_context():
+        assert crear_sesion_service({**sesion_data, **fechas}) == (
+            {"message": "La fecha de fin debe ser posterior a la de inicio"}, 400
+        )
+        assert actualizar_sesion_service(2, {**sesion_data, **fechas})[1] == 400
+
+def test_migracion_exclusion_detecta_sesiones_invalidas(evento_con_sesiones):
+    import importlib.util
+    from pathlib import Path
+    from sqlalchemy import insert
+    from app import db
+    from app.models.sesiones import sesiones_table
+
+    ruta = Path(__file__).parents[1] / "alembic" / "versions" / "7d1f3b9e0a52_sesiones_sin_solapamiento.py"
+    spec = importlib.util.spec_from_file_location("migracion_solapamiento", ruta)
+    migracion = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migracion)
+
+    with evento_con_sesiones.app_context():
+        migracion.comprobar_sesiones_validas(db.session.connection())  # Datos válidos: no falla
+        # Datos previos a la validación del servicio (la restricción CHECK no existía)
+        db.session.execute(insert(sesiones_table).values(
+            id=9, evento_id=1, nombre="Solapada", ponente="P", capacidad_maxima=10,
+            fecha_inicio=datetime(2025, 6, 1, 9, 30), fecha_fin=datetime(2025, 6, 1, 11, 30)
+        ))
+        with pytest.raises(RuntimeError, match=r"evento 1: 1 y 9, evento 1: 2 y 9"):
+            migracion.comprobar_sesiones_validas(db.session.connection())
+
+def test_crear_sesion_normaliza_fechas_a_utc(evento_con_sesiones, sesion_data):
+    from sqlalchemy import select
+    from app import db
+    from app.models.sesiones import sesiones_table
+
+    with evento_con_sesiones.app_context():
+        # 12:00-13:00 en Bogotá son 17:00-18:00 UTC: dentro del evento y sin solapamiento
+        result, status = crear_sesion_service({**sesion_data, "fecha_inicio": "2025-06-01T12:00:00-05:00", "fecha_fin": "2025-06-01T13:00:00-05:00"})
+        assert status == 201
+        fila = db.session.execute(select(sesiones_table.c.fecha_inicio, sesiones_table.c.fecha_fin).where(sesiones_table.c.id == 5)).one()
+    assert tuple(fila) == (datetime(2025, 6, 1, 17), datetime(2025, 6, 1, 18))
+
+# Pruebas del conflicto de horario por usuario contra una base de datos real
+@pytest.fixture
+def agenda_usuario(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+    from app.models.usuarios import usuarios_table
+    from app.models.associations import asistentes_evento, asistentes_sesion
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table), [
+            {"id": e, "nombre": f"Evento {e}", "capacidad_maxima": 100,
+             "fecha_inicio": datetime(2025, 6, 1, 9), "fecha_fin": datetime(2025, 6, 1, 18)}
+            for e in (1, 2)
+        ])
+        db.session.execute(insert(sesiones_table), [
+            # Evento 1: sesiones en las que ya está el usuario
+            {"id": 1, "evento_id": 1, "nombre": "A", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 10), "fecha_fin": datetime(2025, 6, 1, 11)},
+            {"id": 2, "evento_id": 1, "nombre": "B", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 12), "fecha_fin": datetime(2025, 6, 1, 13)},
+            # Evento 2: candidatas
+            {"id": 3, "evento_id": 2, "nombre": "Toca A y B", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 11), "fecha_fin": datetime(2025, 6, 1, 12)},
+            {"id": 4, "evento_id": 2, "nombre": "Cruza A y B", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 10, 30), "fecha_fin": datetime(2025, 6, 1, 12, 30)},
+            {"id": 5, "evento_id": 2, "nombre": "Dentro de B", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1, 12, 15), "fecha_fin": datetime(2025, 6, 1, 12, 45)},
+        ])
+        db.session.execute(insert(usuarios_table).values(id=1, email="user1@example.com", password_hash="x"))
+        db.session.execute(insert(asistentes_evento), [{"usuario_id": 1, "evento_id": e} for e in (1, 2)])
+        db.session.execute(insert(asistentes_sesion), [{"usuario_id": 1, "sesion_id": s} for s in (1, 2)])
+        db.session.commit()
+    return db_app
+
+@pytest.mark.parametrize("sesion_id, status_code, conflictos", [
+    (3, 201, None),    # Los extremos que solo se tocan no son conflicto
+    (4, 400, [1, 2]),
+    (5, 400, [2]),
+])
+def test_registrar_asistente_conflicto_en_bd(agenda_usuario, sesion_id, status_code, conflictos):
+    with agenda_usuario.app_context():
+        result, status = registrar_asistente_service(sesion_id, {"usuario_id": 1})
+    assert status == status_code
+    assert result.get("sesiones_en_conflicto") == conflictos
+
+def test_conflicto_usa_la_clave_primaria_del_usuario(agenda_usuario, contar_consultas):
+    from app import db
+    from app.services.sesiones import sesiones_en_conflicto
+
+    with agenda_usuario.app_context():
+        assert sesiones_en_conflicto(1, datetime(2025, 6, 1, 9), datetime(2025, 6, 1, 18)) == [1, 2]
+        plan = db.session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + contar_consultas[-1], (1, "2025-06-01 18:00:00", "2025-06-01 09:00:00")
+        ).fetchall()
+    detalle = " ".join(fila[-1] for fila in plan)
+    assert "SEARCH asistentes_sesion USING COVERING INDEX" in detalle
+    assert "SEARCH sesiones USING INTEGER PRIMARY KEY" in detalle
+    assert "SCAN" not in detalle and "TEMP B-TREE" not in detalle
+
+# Pruebas de la agenda personal (/api/sesiones/mis-sesiones)
+@pytest.fixture
+def agenda_varios_eventos(db_app):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+    from app.models.sesiones import sesiones_table
+    from app.models.usuarios import usuarios_table
+    from app.models.associations import asistentes_evento, asistentes_sesion
+
+    with db_app.app_context():
+        db.session.execute(insert(eventos_table), [
+            {"id": e, "nombre": f"Evento {e}", "capacidad_maxima": 100,
+             "fecha_inicio": datetime(2025, 6, e, 8), "fecha_fin": datetime(2025, 6, e, 20)}
+            for e in (1, 2, 3)
+        ])
+        # Ids en orden inverso a las fechas: la agenda se ordena por inicio, no por id
+        db.session.execute(insert(sesiones_table), [
+            {"id": 10 - i, "evento_id": 1 + i // 3, "nombre": f"Sesión {10 - i}", "ponente": "P", "capacidad_maxima": 10,
+             "fecha_inicio": datetime(2025, 6, 1 + i // 3, 9 + 2 * (i % 3)), "fecha_fin": datetime(2025, 6, 1 + i // 3, 10 + 2 * (i % 3))}
+            for i in range(9)
+        ])
+        db.session.execute(insert(usuarios_table), [
+            {"id": u, "email": f"user{u}@example.com", "password_hash": "x"} for u in (1, 2)
+        ])
+        db.session.execute(insert(asistentes_evento), [{"usuario_id": u, "evento_id": e} for u in (1, 2) for e in (1, 2, 3)])
+        db.session.execute(insert(asistentes_sesion), [{"usuario_id": 1, "sesion_id": s} for s in range(2, 11)])
+        db.session.execute(insert(asistentes_sesion), [{"usuario_id": 2, "sesion_id": 10}])
+        db.session.commit()
+    return db_app
+
+def _agenda(api_client, auth_headers, **params):
+    response = api_client.get("/api/sesiones/mis-sesiones", query_string=params, headers=auth_headers)
+    return response.status_code, response.get_json()
+
+@pytest.fixture(params=[0, 60], ids=["sin_cache", "con_cache"])
+def agenda_ttl(request, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "AGENDA_CACHE_TTL", request.param)
+    return request.param
+
+def test_mis_sesiones_orden_y_paginacion(agenda_varios_eventos, api_client, auth_headers, agenda_ttl):
+    status, data = _agenda(api_client, auth_headers, per_page=4)
+    assert status == 200
+    assert [s["id"] for s in data["sesiones"]] == [10, 9, 8, 7]
+    assert data["sesiones"][0]["fecha_inicio"] == "2025-06-01T09:00:00"
+    assert data["hay_mas"] is True
+
+    status, data = _agenda(api_client, auth_headers, page=3, per_page=4)
+    assert [s["id"] for s in data["sesiones"]] == [2]
+    assert data["hay_mas"] is False
+
+def test_mis_sesiones_rango_de_fechas(agenda_varios_eventos, api_client, auth_headers, agenda_ttl):
+    # Entran las que se solapan con [10:30, 13:00) del día 1: 11-12 sí; 9-10 y 13-14 no
+    status, data = _agenda(api_client, auth_headers, desde="2025-06-01T10:30:00", hasta="2025-06-01T13:00:00")
+    assert [s["id"] for s in data["sesiones"]] == [9]
+
+    # Con zona horaria: 2025-06-02T08:00-05:00 son las 13:00 UTC
+    status, data = _agenda(api_client, auth_headers, desde="2025-06-02T08:00:00-05:00")
+    assert [s["id"] for s in data["sesiones"]] == [5, 4, 3, 2]
+
+def test_mis_sesiones_fecha_invalida(agenda_varios_eventos, api_client, auth_headers):
+    status, data = _agenda(api_client, auth_headers, desde="mañana")
+    assert status == 400
+    assert data["message"] == "El parámetro 'desde' debe ser una fecha ISO 8601"
+
+def test_mis_sesiones_una_consulta(agenda_varios_eventos, api_client, auth_headers, contar_consultas):
+    _agenda(api_client, auth_headers)
+    assert len(contar_consultas) == 1
+
+def test_agenda_cacheada_se_invalida_solo_para_el_usuario(agenda_varios_eventos, api_client, auth_headers, cache, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "AGENDA_CACHE_TTL", 60)
+    _agenda(api_client, auth_headers)
+    _, data = _agenda(api_client, auth_headers)
+    assert len(data["sesiones"]) == 9
+    assert cache.aciertos == 1
+
+    with agenda_varios_eventos.app_context():
+        # El usuario 2 se registra: la agenda del usuario 1 sigue en caché
+        assert registrar_asistente_service(9, {"usuario_id": 2})[1] == 201
+        _agenda(api_client, auth_headers)
+        assert cache.aciertos == 2
+
+        # Cambia una sesión del usuario 1: su agenda se recalcula
+        asignar_ponente_service(9, {"ponente": "Nueva ponente"})
+        _, data = _agenda(api_client, auth_headers, desde="2025-06-01T11:00:00", per_page=1)
+        assert cache.aciertos == 2
+        assert data["sesiones"][0]["ponente"] == "Nueva ponente"
+
+        # Se elimina otra: desaparece de la agenda
+        eliminar_sesion_service(10)
+        _, data = _agenda(api_client, auth_headers)
+        assert [s["id"] for s in data["sesiones"]][:2] == [9, 8]
+
+# Pruebas de la importación de sesiones
+def _sesion(inicio, fin, **extra):
+    return {"nombre": "Charla", "ponente": "P", "capacidad_maxima": 20,
+            "fecha_inicio": f"2025-06-01T{inicio}:00", "fecha_fin": f"2025-06-01T{fin}:00", **extra}
+
+def _importar(api_client, auth_headers, sesiones, todo_o_nada=False, evento_id=1):
+    response = api_client.post(f"/api/sesiones/importar/{evento_id}", json={"sesiones": sesiones, "todo_o_nada": todo_o_nada}, headers=auth_headers)
+    return response.status_code, response.get_json()
+
+def test_importar_sesiones_errores_por_fila(evento_con_sesiones, api_client, auth_headers, contar_consultas):
+    # Existentes: 09-10, 11-12, 13-14, 15-16
+    status, data = _importar(api_client, auth_headers, [
+        _sesion("10:00", "11:00"),                 # 0: entre dos existentes, tocándolas
+        _sesion("16:00", "17:00"),                 # 1: después de la última
+        _sesion("16:30", "17:30"),                 # 2: se solapa con la fila 1
+        _sesion("11:30", "12:30"),                 # 3: se solapa con una existente
+        _sesion("17:00", "19:00"),                 # 4: fuera del horario del evento
+        _sesion("14:00", "14:00"),                 # 5: sin duración
+        {"nombre": "Sin fechas"},                  # 6: errores de validación
+    ])
+    assert status == 201
+    assert data["creadas"] == 1
+    assert [(e["fila"], e.get("message")) for e in data["errores"]] == [
+        (1, "La sesión se solapa con otra sesión de la importación"),
+        (2, "La sesión se solapa con otra sesión de la importación"),
+        (3, "La sesión se solapa con otra sesión del evento"),
+        (4, "Las fechas de la sesión deben estar dentro del horario del evento"),
+        (5, "La fecha de fin debe ser posterior a la de inicio"),
+        (6, None),
+    ]
+    assert "fecha_inicio" in data["errores"][-1]["errors"]
+    # Evento, sesiones existentes y un único INSERT
+    assert sum(c.lstrip().upper().startswith("INSERT") for c in contar_consultas) == 1
+
+    with evento_con_sesiones.app_context():
+        from sqlalchemy import func, select
+        from app import db
+        from app.models.sesiones import sesiones_table
+        assert db.session.execute(select(func.count()).select_from(sesiones_table)).scalar() == 5
+
+def test_importar_sesiones_todo_o_nada(evento_con_sesiones, api_client, auth_headers):
+    status, data = _importar(api_client, auth_headers, [_sesion("10:00", "11:00"), _sesion("11:30", "12:30")], todo_o_nada=True)
+    assert status == 400
+    assert data["creadas"] == 0
+    assert [e["fila"] for e in data["errores"]] == [1]
+
+    status, data = _importar(api_client, auth_headers, [_sesion("10:00", "11:00"), _sesion("16:00", "17:00")], todo_o_nada=True)
+    assert status == 201
+    assert data == {"message": "Sesiones importadas", "creadas": 2, "errores": []}
+
+def test_importar_sesiones_csv(evento_con_sesiones, api_client, auth_headers):
+    cuerpo = (
+        "nombre,descripcion,ponente,capacidad_maxima,fecha_inicio,fecha_fin\n"
+        "Apertura,,Ana,100,2025-06-01T10:00:00,2025-06-01T11:00:00\n"
+        "Cierre,Fin del día,Luis,100,2025-06-01T16:00:00,2025-06-01T17:00:00\n"
+    )
+    response = api_client.post("/api/sesiones/importar/1?todo_o_nada=true", data=cuerpo, content_type="text/csv", headers=auth_headers)
+    assert response.status_code == 201
+    assert response.get_json()["creadas"] == 2
+
+def test_importar_sesiones_evento_inexistente(evento_con_sesiones, api_client, auth_headers):
+    status, data = _importar(api_client, auth_headers, [_sesion("10:00", "11:00")], evento_id=99)
+    assert status == 404
+
+def test_importar_sesiones_lista_obligatoria(mock_db_session):
+    from app.services.sesiones import importar_sesiones_service
+
+    result, status_code = importar_sesiones_service(1, {"sesiones": []})
+    assert status_code == 400
+    assert "sesiones" in result["errors"]
+    mock_db_session.execute.assert_not_called()
+
+# Pruebas de las sesiones disponibles para el usuario (/api/sesiones/<evento_id>/disponibles)
+def test_sesiones_disponibles(agenda_usuario, api_client, auth_headers, contar_consultas):
+    # El usuario está en 10-11 y 12-13 (evento 1); en el evento 2 solo cabe la de 11-12
+    response = api_client.get("/api/sesiones/2/disponibles", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [s["id"] for s in data["sesiones"]] == [3]
+    assert data["sesiones"][0]["capacidad_disponible"] == 10
+    assert data["huecos_libres"] == [
+        {"fecha_inicio": "2025-06-01T09:00:00", "fecha_fin": "2025-06-01T10:00:00"},
+        {"fecha_inicio": "2025-06-01T11:00:00", "fecha_fin": "2025-06-01T12:00:00"},
+        {"fecha_inicio": "2025-06-01T13:00:00", "fecha_fin": "2025-06-01T18:00:00"},
+    ]
+    assert len(contar_consultas) == 3
+
+    # Las sesiones en las que ya está registrado no se ofrecen
+    assert api_client.get("/api/sesiones/1/disponibles", headers=auth_headers).get_json()["sesiones"] == []
+
+def test_sesiones_disponibles_excluye_llenas(agenda_usuario, api_client, auth_headers):
+    from sqlalchemy import update
+    from app import db
+    from app.models.sesiones import sesiones_table
+
+    with agenda_usuario.app_context():
+        db.session.execute(update(sesiones_table).where(sesiones_table.c.id == 3).values(asistentes_actuales=10))
+        db.session.commit()
+    assert api_client.get("/api/sesiones/2/disponibles", headers=auth_headers).get_json()["sesiones"] == []
+
+@pytest.mark.parametrize("evento_id, status_code", [(99, 404), (3, 400)])
+def test_sesiones_disponibles_errores(agenda_usuario, api_client, auth_headers, evento_id, status_code):
+    from sqlalchemy import insert
+    from app import db
+    from app.models.eventos import eventos_table
+
+    with agenda_usuario.app_context():
+        db.session.execute(insert(eventos_table).values(
+            id=3, nombre="Sin registro", capacidad_maxima=10,
+            fecha_inicio=datetime(2025, 6, 2, 9), fecha_fin=datetime(2025, 6, 2, 18)
+        ))
+        db.session.commit()
+    assert api_client.get(f"/api/sesiones/{evento_id}/disponibles", headers=auth_headers).status_code == status_code
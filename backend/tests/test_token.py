@@ -77,4 +77,77 @@ def test_token_required_invalid_sub(app):
             result, status_code = dummy_route()
 
     assert status_code == 403
-    assert result["message"] == "Invalid token: user ID must be an integer"  # Cambiar el mensaje esperado
\ No newline at end of file
+    assert result["message"] == "Invalid token: user ID must be an integer"  # Cambiar el mensaje esperado
+# Pruebas de la caché de tokens verificados
+@pytest.fixture
+def token_valido(monkeypatch):
+    from datetime import datetime, timezone, timedelta
+
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "clave-de-pruebas-de-al-menos-32-bytes")
+    return jwt.encode(
+        {"sub": "1", "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+
+@token_required
+def _ruta(*args, **kwargs):
+    return {"user_id": kwargs["current_user"]["id"]}, 200
+
+def _llamar(app, token):
+    with app.test_request_context('/', headers={"Authorization": f"Bearer {token}"}):
+        return _ruta()
+
+def test_token_en_cache_no_se_verifica_de_nuevo(app, token_valido, token_cache):
+    with patch('app.core.auth.decode_jwt', wraps=decode_jwt) as mock_decode:
+        for _ in range(3):
+            assert _llamar(app, token_valido) == ({"user_id": 1}, 200)
+    assert mock_decode.call_count == 1
+    assert token_cache.estadisticas() == {"aciertos": 2, "fallos": 1, "tasa_aciertos": 0.6667, "entradas": 1}
+
+def test_token_en_cache_expira_con_exp(token_valido, token_cache):
+    exp = jwt.decode(token_valido, options={"verify_signature": False})["exp"]
+    token_cache.guardar(token_valido, {"sub": "1", "exp": exp})
+    with patch('app.core.auth.time.time', return_value=exp - 1):
+        assert token_cache.obtener(token_valido) == {"sub": "1", "exp": exp}
+    with patch('app.core.auth.time.time', return_value=exp):
+        assert token_cache.obtener(token_valido) is None
+    assert token_cache.estadisticas()["entradas"] == 0
+
+def test_token_sin_exp_no_se_guarda(app, token_cache):
+    with patch('app.core.auth.decode_jwt', return_value={"sub": "1"}) as mock_decode:
+        _llamar(app, "sin.exp")
+        _llamar(app, "sin.exp")
+    assert mock_decode.call_count == 2
+
+def test_revocacion_rechaza_tokens_en_cache(app, token_valido):
+    from app.core.auth import registrar_revocacion
+
+    revocados = set()
+    registrar_revocacion(lambda claims: claims["sub"] in revocados)
+    assert _llamar(app, token_valido)[1] == 200
+    revocados.add("1")
+    assert _llamar(app, token_valido) == ({"message": "Token has been revoked"}, 403)
+
+def test_olvidar_token(app, token_valido, token_cache):
+    from app.core.auth import olvidar_token
+
+    _llamar(app, token_valido)
+    olvidar_token(token_valido)
+    assert token_cache.estadisticas()["entradas"] == 0
+
+def test_cache_de_tokens_acotada():
+    from app.core.auth import TokenCache
+
+    cache = TokenCache(max_entradas=2)
+    for i in range(3):
+        cache.guardar(f"token{i}", {"sub": str(i), "exp": 2**40})
+    assert cache.obtener("token0") is None
+    assert cache.obtener("token2") == {"sub": "2", "exp": 2**40}
+
+def test_cache_de_tokens_desactivada(app, token_valido, token_cache, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_CACHE_MAX_ENTRADAS", 0)
+    with patch('app.core.auth.decode_jwt', wraps=decode_jwt) as mock_decode:
+        _llamar(app, token_valido)
+        _llamar(app, token_valido)
+    assert mock_decode.call_count == 2
+    assert token_cache.estadisticas()["entradas"] == 0
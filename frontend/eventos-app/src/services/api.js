@@ -8,6 +8,9 @@ const api = axios.create({
   },
 });
 
+// Rutas de autenticación: sus 401/403 no se resuelven renovando los tokens
+const RUTAS_SIN_RENOVACION = ['/auth/login', '/auth/register', '/auth/refresh', '/auth/logout'];
+
 api.interceptors.request.use(
   (config) => {
     const authStore = useAuthStore();
@@ -26,4 +29,32 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
-export default api;
\ No newline at end of file
+// El token de acceso dura pocos minutos: ante un 401/403 se renuevan los tokens con el
+// token de refresco y se repite la petición una sola vez
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const { config, response } = error;
+    const authStore = useAuthStore();
+    if (
+      !config || !response || ![401, 403].includes(response.status) || config._renovada ||
+      RUTAS_SIN_RENOVACION.includes(config.url) || !authStore.refreshToken
+    ) {
+      return Promise.reject(error);
+    }
+    config._renovada = true;
+    try {
+      const token = await authStore.refreshTokens();
+      config.headers.Authorization = `Bearer ${token}`;
+      return api(config);
+    } catch (refreshError) {
+      // Token de refresco caducado o revocado: hay que volver a iniciar sesión
+      if (refreshError.response) {
+        authStore.logout();
+      }
+      return Promise.reject(error);
+    }
+  }
+);
+
+export default api;
@@ -4,15 +4,22 @@ import { ref } from 'vue';
 
 export const useAuthStore = defineStore('auth', () => {
   const token = ref(null);
+  const refreshToken = ref(null);
   const user = ref(null);
+  // Renovación en curso: las peticiones que fallan a la vez esperan la misma
+  let refreshPromise = null;
 
-  // Restaurar token y usuario desde localStorage al inicializar
+  // Restaurar tokens y usuario desde localStorage al inicializar
   const initializeAuth = () => {
     const savedToken = localStorage.getItem('auth_token');
+    const savedRefreshToken = localStorage.getItem('auth_refresh_token');
     const savedUser = localStorage.getItem('auth_user');
     if (savedToken) {
       token.value = savedToken;
     }
+    if (savedRefreshToken) {
+      refreshToken.value = savedRefreshToken;
+    }
     if (savedUser) {
       try {
         user.value = JSON.parse(savedUser);
@@ -24,14 +31,21 @@ export const useAuthStore = defineStore('auth', () => {
 
   };
 
+  // Guardar el token de acceso y el de refresco (en memoria y en localStorage)
+  const saveTokens = (data) => {
+    token.value = data.token;
+    refreshToken.value = data.refresh_token;
+    localStorage.setItem('auth_token', token.value);
+    localStorage.setItem('auth_refresh_token', refreshToken.value);
+  };
+
   // Iniciar sesión
   const login = async (email, password) => {
     try {
       const response = await api.post('/auth/login', { email, password });
-      token.value = response.data.token;
+      saveTokens(response.data);
       user.value = response.data.user;
       // Guardar en localStorage
-      localStorage.setItem('auth_token', token.value);
       localStorage.setItem('auth_user', JSON.stringify(user.value));
 
       return { success: true };
@@ -45,11 +59,39 @@ export const useAuthStore = defineStore('auth', () => {
     }
   };
 
+  // Renovar los tokens: el servidor revoca el token de refresco usado y devuelve otro nuevo
+  const refreshTokens = () => {
+    if (!refreshPromise) {
+      refreshPromise = api
+        .post('/auth/refresh', { refresh_token: refreshToken.value })
+        .then((response) => {
+          saveTokens(response.data);
+          return token.value;
+        })
+        .finally(() => {
+          refreshPromise = null;
+        });
+    }
+    return refreshPromise;
+  };
+
   // Cerrar sesión
   const logout = () => {
+    if (token.value) {
+      // Revocar los tokens en el servidor; la sesión local se cierra aunque falle
+      api
+        .post(
+          '/auth/logout',
+          refreshToken.value ? { refresh_token: refreshToken.value } : {},
+          { headers: { Authorization: `Bearer ${token.value}` } }
+        )
+        .catch(() => {});
+    }
     token.value = null;
+    refreshToken.value = null;
     user.value = null;
     localStorage.removeItem('auth_token');
+    localStorage.removeItem('auth_refresh_token');
     localStorage.removeItem('auth_user');
   };
 
@@ -61,9 +103,11 @@ export const useAuthStore = defineStore('auth', () => {
 
   return {
     token,
+    refreshToken,
     user,
     login,
+    refreshTokens,
     logout,
     isAuthenticated,
   };
-});
\ No newline at end of file
+});